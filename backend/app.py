@@ -2,6 +2,7 @@ from app import create_app
 from app.extensions import db
 from app.models import AdminSu, Plan
 from app.services.auth_service import hash_password
+from app.services.seed_data import BASE_PLANES
 
 
 def seed_admin():
@@ -23,12 +24,7 @@ def seed_admin():
 def seed_planes():
     # Solo crea planes si no hay ninguno
     if Plan.query.count() == 0:
-        planes = [
-            {"nombre": "Básico", "precio": 50, "estado": "activo"},
-            {"nombre": "Pro", "precio": 100, "estado": "activo"},
-            {"nombre": "Premium", "precio": 200, "estado": "activo"},
-        ]
-        for p in planes:
+        for p in BASE_PLANES:
             db.session.add(Plan(**p))
         db.session.commit()
 
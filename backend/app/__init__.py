@@ -1,10 +1,19 @@
 import os
+import sys
 from dotenv import load_dotenv
 from flask import Flask
 from flask_cors import CORS
 
+from .cli import register_cli
 from .extensions import db, login_manager
 from .services.auth_service import load_user
+from .services.db_pool import default_profile, engine_options, pool_telemetry
+from .services.identity_cache import identity_cache
+from .services.mail_outbox import start_outbox_thread
+from .services.password_hasher import PasswordHasherBusy, password_hasher
+from .services.proof_thumbnails import proof_thumbnails
+from .services.sql_instrumentation import init_sql_instrumentation
+from .utils.file_delivery import DEFAULT_ACCEL_PREFIX, DELIVERY_MODES
 
 # Módulo 1
 from .controllers.auth.auth_controller import auth_bp
@@ -19,6 +28,17 @@ from .controllers.plan_controller import plan_bp
 from .controllers.onboarding_controller import onboarding_bp
 from .controllers.subscription_review_controller import subscription_review_bp
 
+# Módulo 3 (inventario)
+from .controllers.producto_controller import producto_bp
+from .controllers.venta_controller import venta_bp
+
+# Interno (telemetría)
+from .controllers.internal_controller import internal_bp
+
+# Consola super_usuario (exports, búsqueda global)
+from .controllers.export_controller import export_bp
+from .controllers.search_controller import search_bp
+
 
 def create_app():
     load_dotenv()
@@ -27,6 +47,17 @@ def create_app():
     app.config["SECRET_KEY"] = os.environ.get("SECRET_KEY", "dev-secret")
     app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DATABASE_URL")
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+
+    # Comandos `flask ...` (antes del engine: sin DB_PROFILE, sus procesos usan el perfil worker)
+    register_cli(app)
+
+    # Pool de conexiones por tipo de proceso: dev | web | worker (ver services/db_pool.py)
+    app.config["DB_PROFILE"] = os.environ.get("DB_PROFILE") or default_profile(
+        app.cli.commands, sys.argv, os.environ
+    )
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(
+        app.config["DB_PROFILE"], app.config["SQLALCHEMY_DATABASE_URI"], os.environ
+    )
     app.config["SESSION_COOKIE_SAMESITE"] = "Lax"
 
     # CORS (para cookies de sesión)
@@ -45,6 +76,10 @@ def create_app():
     app.config["UPLOAD_FOLDER"] = os.path.abspath(upload_folder)
     app.config["MAX_CONTENT_LENGTH"] = int(os.environ.get("MAX_CONTENT_LENGTH", str(10 * 1024 * 1024)))
 
+    # Importación CSV de clientes: filas con password por archivo y vida de los reportes de errores
+    app.config["CLIENTE_IMPORT_MAX_PASSWORDS"] = int(os.environ.get("CLIENTE_IMPORT_MAX_PASSWORDS", "100"))
+    app.config["IMPORT_REPORT_TTL_HOURS"] = float(os.environ.get("IMPORT_REPORT_TTL_HOURS", "24"))
+
     app.config["ONBOARDING_TOKEN_EXPIRE_MINUTES"] = int(os.environ.get("ONBOARDING_TOKEN_EXPIRE_MINUTES", "120"))
     app.config["SUBSCRIPTION_DEFAULT_DAYS"] = int(os.environ.get("SUBSCRIPTION_DEFAULT_DAYS", "30"))
 
@@ -57,9 +92,89 @@ def create_app():
     app.config["MAIL_FROM"] = os.environ.get("MAIL_FROM")
     app.config["RESET_TOKEN_EXPIRE_MINUTES"] = int(os.environ.get("RESET_TOKEN_EXPIRE_MINUTES", "15"))
 
+    # Outbox de correos: el sender corre como proceso aparte con `flask mail-worker`
+    # o, con MAIL_OUTBOX_THREAD=1, en un hilo del proceso web (arranca con el primer
+    # request: los comandos CLI, seeds y benchmarks nunca lo levantan)
+    app.config["MAIL_OUTBOX_THREAD"] = os.environ.get("MAIL_OUTBOX_THREAD", "0") == "1"
+    app.config["MAIL_OUTBOX_POLL_SECONDS"] = float(os.environ.get("MAIL_OUTBOX_POLL_SECONDS", "5"))
+    app.config["MAIL_OUTBOX_MAX_ATTEMPTS"] = int(os.environ.get("MAIL_OUTBOX_MAX_ATTEMPTS", "6"))
+    app.config["MAIL_OUTBOX_BACKOFF_SECONDS"] = int(os.environ.get("MAIL_OUTBOX_BACKOFF_SECONDS", "30"))
+    app.config["MAIL_OUTBOX_RETENTION_DAYS"] = int(os.environ.get("MAIL_OUTBOX_RETENTION_DAYS", "7"))
+
+    # Envío masivo (avisos a microempresas): conexiones SMTP reutilizadas
+    app.config["MAIL_BULK_CONNECTIONS"] = int(os.environ.get("MAIL_BULK_CONNECTIONS", "3"))
+    app.config["MAIL_BULK_MESSAGES_PER_CONNECTION"] = int(os.environ.get("MAIL_BULK_MESSAGES_PER_CONNECTION", "100"))
+
+    # Catálogo público de planes: cada cuántos segundos un worker revisa la versión en BD
+    app.config["PLAN_CATALOG_RECHECK_SECONDS"] = float(os.environ.get("PLAN_CATALOG_RECHECK_SECONDS", "5"))
+
+    # Libro de stock: los snapshots se toman con este desfase (transacciones aún abiertas)
+    app.config["STOCK_SNAPSHOT_LAG_SECONDS"] = float(os.environ.get("STOCK_SNAPSHOT_LAG_SECONDS", "300"))
+    # Feed de alertas: solo entrega alertas con este desfase (ids asignados antes del commit)
+    app.config["STOCK_ALERT_FEED_LAG_SECONDS"] = float(os.environ.get("STOCK_ALERT_FEED_LAG_SECONDS", "10"))
+
+    # Caché de identidades del user_loader (por worker)
+    app.config["IDENTITY_CACHE_SIZE"] = int(os.environ.get("IDENTITY_CACHE_SIZE", "1024"))
+    app.config["IDENTITY_CACHE_TTL"] = float(os.environ.get("IDENTITY_CACHE_TTL", "60"))
+    # ventana en que otro worker puede servir un usuario ya desactivado/editado
+    app.config["IDENTITY_CACHE_RECHECK_SECONDS"] = float(os.environ.get("IDENTITY_CACHE_RECHECK_SECONDS", "5"))
+
+    # Hash de contraseñas (scrypt): costo fijo o calibrado al arrancar
+    app.config["PASSWORD_HASH_WORKERS"] = int(os.environ.get("PASSWORD_HASH_WORKERS", str(password_hasher.workers)))
+    app.config["PASSWORD_HASH_QUEUE_TIMEOUT"] = float(os.environ.get("PASSWORD_HASH_QUEUE_TIMEOUT", "5"))
+    app.config["PASSWORD_HASH_N"] = os.environ.get("PASSWORD_HASH_N")
+    app.config["PASSWORD_HASH_TARGET_MS"] = float(os.environ.get("PASSWORD_HASH_TARGET_MS", "100"))
+    app.config["PASSWORD_HASH_MAX_LOG2_N"] = int(os.environ.get("PASSWORD_HASH_MAX_LOG2_N", "17"))
+
+    # Entrega de archivos protegidos: direct | x-sendfile | x-accel (ver utils/file_delivery.py)
+    app.config["FILE_DELIVERY"] = os.environ.get("FILE_DELIVERY", "direct")
+    if app.config["FILE_DELIVERY"] not in DELIVERY_MODES:
+        raise ValueError(f"FILE_DELIVERY inválido: {app.config['FILE_DELIVERY']} ({', '.join(DELIVERY_MODES)})")
+    app.config["FILE_DELIVERY_ACCEL_PREFIX"] = os.environ.get("FILE_DELIVERY_ACCEL_PREFIX", DEFAULT_ACCEL_PREFIX)
+    app.config["USE_X_SENDFILE"] = app.config["FILE_DELIVERY"] == "x-sendfile"
+
+    # Miniaturas de comprobantes (cola de revisión): pool de procesos por worker
+    app.config["THUMBNAIL_WORKERS"] = int(os.environ.get("THUMBNAIL_WORKERS", "2"))
+    app.config["THUMBNAIL_MAX_PX"] = int(os.environ.get("THUMBNAIL_MAX_PX", "320"))
+    app.config["THUMBNAIL_WAIT_SECONDS"] = float(os.environ.get("THUMBNAIL_WAIT_SECONDS", "5"))
+
+    # Instrumentación SQL por request (Server-Timing, N+1, presupuestos). Opt-in.
+    app.config["SQL_INSTRUMENTATION"] = os.environ.get("SQL_INSTRUMENTATION", "0") == "1"
+    app.config["SQL_QUERY_BUDGET"] = int(os.environ.get("SQL_QUERY_BUDGET", "20"))
+    app.config["SQL_TIME_BUDGET_MS"] = float(os.environ.get("SQL_TIME_BUDGET_MS", "200"))
+    app.config["SQL_REPEAT_THRESHOLD"] = int(os.environ.get("SQL_REPEAT_THRESHOLD", "5"))
+
     db.init_app(app)
+    with app.app_context():
+        pool_telemetry.attach(db.engine, app.config["DB_PROFILE"])
+        if app.config["SQL_INSTRUMENTATION"]:
+            init_sql_instrumentation(app, db.engine)
     login_manager.init_app(app)
     login_manager.user_loader(load_user)
+    identity_cache.configure(
+        max_size=app.config["IDENTITY_CACHE_SIZE"],
+        ttl=app.config["IDENTITY_CACHE_TTL"],
+        recheck=app.config["IDENTITY_CACHE_RECHECK_SECONDS"],
+    )
+
+    password_hasher.configure(
+        workers=app.config["PASSWORD_HASH_WORKERS"],
+        queue_timeout=app.config["PASSWORD_HASH_QUEUE_TIMEOUT"],
+    )
+    if app.config["PASSWORD_HASH_N"]:
+        password_hasher.configure(n=int(app.config["PASSWORD_HASH_N"]))
+    else:
+        n, elapsed_ms = password_hasher.calibrate(
+            target_ms=app.config["PASSWORD_HASH_TARGET_MS"],
+            max_log2_n=app.config["PASSWORD_HASH_MAX_LOG2_N"],
+        )
+        app.logger.info("scrypt calibrado: n=%s (%.1f ms por hash)", n, elapsed_ms)
+
+    proof_thumbnails.configure(
+        workers=app.config["THUMBNAIL_WORKERS"],
+        max_px=app.config["THUMBNAIL_MAX_PX"],
+        wait_seconds=app.config["THUMBNAIL_WAIT_SECONDS"],
+    )
 
     # Blueprints
     app.register_blueprint(auth_bp)
@@ -73,6 +188,24 @@ def create_app():
     app.register_blueprint(onboarding_bp)
     app.register_blueprint(subscription_review_bp)
 
+    app.register_blueprint(producto_bp)
+    app.register_blueprint(venta_bp)
+
+    app.register_blueprint(internal_bp)
+
+    app.register_blueprint(export_bp)
+    app.register_blueprint(search_bp)
+
+    if app.config["MAIL_OUTBOX_THREAD"]:
+
+        @app.before_request
+        def start_mail_sender():
+            start_outbox_thread(app)
+
+    @app.errorhandler(PasswordHasherBusy)
+    def password_hasher_busy(_error):
+        return {"error": "Servidor ocupado, intenta nuevamente en unos segundos"}, 503
+
     @app.get("/api/health")
     def health():
         return {"status": "ok"}
@@ -0,0 +1,206 @@
+import os
+import time
+
+import click
+from sqlalchemy import update
+
+from .extensions import db
+from .models import Cliente, Producto, SuscripcionSolicitud
+from .services.mail_outbox import run_outbox_worker
+from .services.notification_service import notify_active_tenants, notify_expiring_subscriptions
+from .services.search_index import rebuild_search_index
+from .services.seed_data import DEFAULT_BATCH_SIZE, DEFAULT_PASSWORD, seed_dataset
+from .services.stock_ledger import reconcile_stock, take_snapshot, tenants_with_movements
+from .services.storage_service import (
+    StorageError,
+    is_content_addressed,
+    proof_file,
+    purge_import_reports,
+    store_proof_stream,
+)
+
+
+def _report(results):
+    failed = [r for r in results if not r["ok"]]
+    click.echo(f"Enviados: {len(results) - len(failed)} / {len(results)}")
+    for item in failed:
+        click.echo(f"  ✗ {item['to']}: {item['error']}")
+
+
+def register_cli(app):
+    @app.cli.command("mail-worker")
+    def mail_worker():
+        """Sender dedicado del outbox de correos."""
+        run_outbox_worker(app)
+
+    @app.cli.command("notify-expiring")
+    @click.option("--days", default=7, show_default=True, help="Días hasta fecha_fin")
+    def notify_expiring(days):
+        """Avisa por correo a las microempresas cuya suscripción vence pronto."""
+        _report(notify_expiring_subscriptions(days))
+
+    @app.cli.command("notify-tenants")
+    @click.option("--subject", required=True)
+    @click.option("--body-file", type=click.File("r", encoding="utf-8"), required=True)
+    def notify_tenants(subject, body_file):
+        """Envía un aviso a todas las microempresas activas (ej. cambios de planes)."""
+        _report(notify_active_tenants(subject, body_file.read()))
+
+    @app.cli.command("stock-snapshot")
+    @click.option("--tenant", "tenant_id", type=int, help="Solo esta microempresa")
+    def stock_snapshot(tenant_id):
+        """Snapshot de stock por tenant (correr periódicamente, ej. cada noche por cron)."""
+        tenants = [tenant_id] if tenant_id else tenants_with_movements()
+        for tid in tenants:
+            filas = take_snapshot(tid)
+            db.session.commit()
+            click.echo(f"Tenant {tid}: {filas} productos")
+
+    @app.cli.command("stock-reconcile")
+    @click.option("--tenant", "tenant_id", type=int, help="Solo esta microempresa")
+    @click.option("--fix", is_flag=True, help="Corrige Producto.stock según el libro")
+    def stock_reconcile(tenant_id, fix):
+        """Compara Producto.stock contra el libro de movimientos."""
+        if tenant_id:
+            tenants = [tenant_id]
+        else:
+            tenants = [tid for (tid,) in db.session.query(Producto.tenant_id).distinct()]
+        total = 0
+        for tid in tenants:
+            diferencias = reconcile_stock(tid, fix=fix)
+            db.session.commit()
+            total += len(diferencias)
+            for item in diferencias:
+                click.echo(f"  tenant {tid} producto {item['id_producto']}: stock={item['stock']} libro={item['libro']}")
+        click.echo(f"Diferencias: {total}" + (" (corregidas)" if fix else ""))
+
+    @app.cli.command("import-reports-purge")
+    def import_reports_purge():
+        """Borra los reportes de importación vencidos (IMPORT_REPORT_TTL_HOURS); ej. por cron."""
+        click.echo(f"Reportes borrados: {purge_import_reports()}")
+
+    @app.cli.command("clientes-reindex")
+    @click.option("--batch", default=1000, show_default=True)
+    def clientes_reindex(batch):
+        """Recalcula Cliente.busqueda (filas anteriores a la búsqueda o cargadas por SQL)."""
+        total, last_id = 0, 0
+        while True:
+            rows = (
+                db.session.query(
+                    Cliente.id_cliente,
+                    Cliente.updated_at,
+                    *(getattr(Cliente, field) for field in Cliente.SEARCH_FIELDS),
+                )
+                .filter(Cliente.id_cliente > last_id)
+                .order_by(Cliente.id_cliente)
+                .limit(batch)
+                .all()
+            )
+            if not rows:
+                break
+            db.session.execute(
+                update(Cliente).execution_options(synchronize_session=False),
+                # updated_at se conserva: busqueda no sale en ninguna respuesta (no cambia el ETag)
+                [
+                    {"id_cliente": row.id_cliente, "busqueda": Cliente.search_text(row._mapping),
+                     "updated_at": row.updated_at}
+                    for row in rows
+                ],
+            )
+            db.session.commit()
+            total += len(rows)
+            last_id = rows[-1].id_cliente
+        click.echo(f"Clientes reindexados: {total}")
+
+    @app.cli.command("search-index-rebuild")
+    def search_index_rebuild():
+        """Reconstruye el índice de búsqueda global (carga inicial o tras cambios por SQL)."""
+        for tabla, total in rebuild_search_index().items():
+            click.echo(f"{tabla}: {total}")
+
+    @app.cli.command("seed")
+    @click.option("--microempresas", default=100, show_default=True)
+    @click.option("--clientes", default=50, show_default=True, help="Clientes por microempresa")
+    @click.option("--productos", default=20, show_default=True, help="Productos por microempresa")
+    @click.option("--batch", default=DEFAULT_BATCH_SIZE, show_default=True, help="Microempresas por transacción")
+    @click.option("--password", default=DEFAULT_PASSWORD, show_default=True, help="Password de todas las cuentas")
+    @click.option("--random-seed", type=int, help="Semilla para repetir la misma distribución")
+    @click.option("--proofs/--no-proofs", default=True, show_default=True, help="Escribir comprobantes en disco")
+    @click.option("--index", is_flag=True, help="Reconstruir el índice de búsqueda global al terminar")
+    def seed(microempresas, clientes, productos, batch, password, random_seed, proofs, index):
+        """Genera datos sintéticos masivos (COPY/INSERT por lotes) para reproducir problemas de escala."""
+        started = time.perf_counter()
+
+        def progress(totals):
+            elapsed = time.perf_counter() - started
+            filas = sum(totals.values())
+            click.echo(
+                f"  {totals['microempresas']}/{microempresas} microempresas, "
+                f"{filas} filas ({filas / elapsed:,.0f} filas/s)"
+            )
+
+        totals = seed_dataset(
+            microempresas,
+            clientes=clientes,
+            productos=productos,
+            proofs=proofs,
+            password=password,
+            batch_size=batch,
+            rng_seed=random_seed,
+            progress=progress,
+        )
+        for tabla, total in totals.items():
+            click.echo(f"{tabla}: {total}")
+        click.echo(f"Tiempo: {time.perf_counter() - started:.1f} s")
+
+        if index:
+            for tabla, total in rebuild_search_index().items():
+                click.echo(f"índice {tabla}: {total}")
+        else:
+            click.echo("Índice de búsqueda global sin actualizar: flask search-index-rebuild")
+
+    @app.cli.command("proofs-dedupe")
+    @click.option("--keep-legacy", is_flag=True, help="No borrar los archivos antiguos")
+    def proofs_dedupe(keep_legacy):
+        """Pasa los comprobantes antiguos (comprobantes/<tenant>/...) al almacén por hash."""
+        legacy = (
+            SuscripcionSolicitud.query.filter(SuscripcionSolicitud.comprobante_path.isnot(None))
+            .order_by(SuscripcionSolicitud.id_solicitud)
+            .all()
+        )
+        migrated, created, missing, old_files = 0, 0, 0, set()
+        for sol in legacy:
+            if is_content_addressed(sol.comprobante_path):
+                continue
+            found = proof_file(sol.comprobante_path)
+            if not found:
+                missing += 1
+                click.echo(f"  solicitud {sol.id_solicitud}: no existe {sol.comprobante_path}")
+                continue
+            try:
+                with open(found[0], "rb") as fh:
+                    stored = store_proof_stream(fh)
+            except StorageError as exc:
+                click.echo(f"  solicitud {sol.id_solicitud}: {exc} ({sol.comprobante_path})")
+                continue
+            sol.comprobante_path = stored.path
+            old_files.add(found[0])
+            migrated += 1
+            created += stored.created
+        db.session.commit()
+
+        # después del commit: ninguna fila apunta ya a los archivos antiguos
+        removed = 0
+        if not keep_legacy:
+            for path in sorted(old_files):
+                try:
+                    os.remove(path)
+                    removed += 1
+                except FileNotFoundError:
+                    # ya borrado (otra corrida, a mano): el resto se sigue limpiando
+                    click.echo(f"  ya no existe {path}")
+                except OSError as exc:
+                    click.echo(f"  no se pudo borrar {path}: {exc}")
+        click.echo(f"Comprobantes migrados: {migrated} (archivos nuevos: {created}, sin archivo: {missing})")
+        if not keep_legacy:
+            click.echo(f"Archivos antiguos borrados: {removed} / {len(old_files)}")
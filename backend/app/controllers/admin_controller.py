@@ -1,8 +1,12 @@
 from flask import Blueprint, jsonify, request
 from flask_login import current_user
+from sqlalchemy.orm import defer
 
 from ..models import AdminSu, db
 from ..services.auth_service import get_current_role, hash_password
+from ..services.identity_cache import invalidate_user
+from ..services.search_index import index_entities
+from ..utils.pagination import paginated_response
 from ..views.admin_view import admin_item
 
 admin_bp = Blueprint("admin", __name__)
@@ -22,8 +26,9 @@ def list_admins():
     if error:
         return error
 
-    admins = AdminSu.query.order_by(AdminSu.apellido_paterno, AdminSu.nombre).all()
-    return jsonify({"admins": [admin_item(admin) for admin in admins]})
+    query = AdminSu.query.options(defer(AdminSu.password))
+    columns = (AdminSu.apellido_paterno, AdminSu.nombre, AdminSu.id_su)
+    return paginated_response("admins", query, columns, admin_item, versioned=(AdminSu.updated_at,))
 
 
 @admin_bp.post("/api/admins")
@@ -54,6 +59,7 @@ def create_admin():
         estado="activo",
     )
     db.session.add(admin_user)
+    index_entities(admin_user)
     db.session.commit()
     return jsonify({"admin": admin_item(admin_user)}), 201
 
@@ -86,7 +92,10 @@ def update_admin(admin_id):
     if password:
         admin_user.password = hash_password(password)
 
+    index_entities(admin_user)
     db.session.commit()
+
+    invalidate_user(admin_user)
     return jsonify({"admin": admin_item(admin_user)})
 
 
@@ -98,7 +107,9 @@ def activate_admin(admin_id):
 
     admin_user = AdminSu.query.get_or_404(admin_id)
     admin_user.estado = "activo"
+    index_entities(admin_user)
     db.session.commit()
+    invalidate_user(admin_user)
     return jsonify({"message": "Admin activado"})
 
 
@@ -113,5 +124,7 @@ def delete_admin(admin_id):
         return jsonify({"error": "No puedes darte de baja"}), 403
 
     admin_user.estado = "inactivo"
+    index_entities(admin_user)
     db.session.commit()
+    invalidate_user(admin_user)
     return jsonify({"message": "Admin inactivado"})
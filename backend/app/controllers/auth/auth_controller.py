@@ -3,15 +3,19 @@ from flask_login import current_user, login_user, logout_user
 
 from ...models import AdminSu, Cliente, Microempresa, db
 from ...services.auth_service import (
-    get_roles_for_email,
-    get_user_for_role,
-    get_users_by_identifier,
+    VERIFIED_SESSION_KEY,
     hash_password,
-    is_active_user,
     is_valid_schedule,
     is_valid_url,
+    load_identity_user,
+    rehash_if_needed,
+    remember_verified_roles,
     serialize_user,
+    session_verified_identities,
+    verified_identities,
 )
+from ...services.identity_service import find_identities, normalize_identifier, roles_of
+from ...services.search_index import index_entities
 from ...views.auth import auth_response, guest_response
 
 
@@ -22,6 +26,10 @@ def clear_guest_session():
     session.pop("guest", None)
 
 
+def clear_verified_roles():
+    session.pop(VERIFIED_SESSION_KEY, None)
+
+
 @auth_bp.post("/api/register")
 def register():
     payload = request.get_json(silent=True) or {}
@@ -75,9 +83,10 @@ def register():
             estado="activo",
         )
         db.session.add(microempresa)
+        index_entities(microempresa)
         db.session.commit()
         login_user(microempresa)
-        available_roles = get_roles_for_email(microempresa.email, microempresa.password)
+        available_roles = remember_verified_roles(microempresa, password)
         return auth_response(microempresa.to_dict(), "microempresa", available_roles, 201)
 
     if role == "super_usuario":
@@ -105,9 +114,10 @@ def register():
             estado="activo",
         )
         db.session.add(admin_user)
+        index_entities(admin_user)
         db.session.commit()
         login_user(admin_user)
-        available_roles = get_roles_for_email(admin_user.email, admin_user.password)
+        available_roles = remember_verified_roles(admin_user, password)
         return auth_response(admin_user.to_dict(), "super_usuario", available_roles, 201)
 
     if role == "cliente":
@@ -143,9 +153,10 @@ def register():
             estado="activo",
         )
         db.session.add(cliente)
+        index_entities(cliente)
         db.session.commit()
         login_user(cliente)
-        available_roles = get_roles_for_email(cliente.email, cliente.password)
+        available_roles = remember_verified_roles(cliente, password)
         return auth_response(cliente.to_dict(), "cliente", available_roles, 201)
 
     return jsonify({"error": "Rol inválido"}), 400
@@ -161,50 +172,41 @@ def login():
     if not identifier or not password:
         return jsonify({"error": "Usuario y password son requeridos"}), 400
 
-    password_hash = hash_password(password)
     clear_guest_session()
 
-    if role:
-        user = get_user_for_role(role, identifier)
-        if (
-            not user
-            or not user.password
-            or user.password != password_hash
-            or not is_active_user(user)
-        ):
-            return jsonify({"error": "Credenciales inválidas"}), 401
-
-        login_user(user)
-        user_data, user_role = serialize_user(user)
-        available_roles = get_roles_for_email(user.email, user.password)
-        return auth_response(user_data, user_role, available_roles)
+    # una sola consulta al directorio de identidades (los 3 roles, email o nombre)
+    identities = find_identities(identifier, role=role)
+    matches = verified_identities(identities, password)
 
-    users_by_role = get_users_by_identifier(identifier)
-    available_roles = [
-        role_key
-        for role_key, user in users_by_role.items()
-        if user and user.password and user.password == password_hash and is_active_user(user)
-    ]
-
-    if not available_roles:
+    if not matches:
         return jsonify({"error": "Credenciales inválidas"}), 401
 
-    if len(available_roles) > 1:
-        return jsonify({"select_role": True, "roles": available_roles}), 200
+    if not role:
+        candidate_roles = roles_of(matches)
+        if len(candidate_roles) > 1:
+            return jsonify({"select_role": True, "roles": candidate_roles}), 200
 
-    role_key = available_roles[0]
-    user = users_by_role[role_key]
-    if not user or not is_active_user(user):
+    user = load_identity_user(matches[0])
+    if not user:
         return jsonify({"error": "Credenciales inválidas"}), 401
+
+    rehash_if_needed(user, password)
     login_user(user)
     user_data, user_role = serialize_user(user)
-    available_roles = get_roles_for_email(user.email, user.password)
+
+    key = normalize_identifier(identifier)
+    if not role and normalize_identifier(user.email) == key:
+        # el identificador era el email: el directorio ya trajo (y verificó) todos sus roles
+        available_roles = remember_verified_roles(user, password, verified=matches)
+    else:
+        available_roles = remember_verified_roles(user, password)
     return auth_response(user_data, user_role, available_roles)
 
 
 @auth_bp.post("/api/guest-login")
 def guest_login():
     logout_user()
+    clear_verified_roles()
     session["guest"] = True
     return guest_response()
 
@@ -213,6 +215,7 @@ def guest_login():
 def logout():
     logout_user()
     clear_guest_session()
+    clear_verified_roles()
     return jsonify({"message": "Logout OK"}), 200
 
 
@@ -220,7 +223,7 @@ def logout():
 def me():
     if current_user.is_authenticated:
         user_data, user_role = serialize_user(current_user)
-        available_roles = get_roles_for_email(current_user.email, current_user.password)
+        available_roles = roles_of(session_verified_identities(current_user))
         return auth_response(user_data, user_role, available_roles)
 
     if session.get("guest"):
@@ -239,17 +242,15 @@ def switch_role():
     if not role:
         return jsonify({"error": "Rol requerido"}), 400
 
-    available_roles = get_roles_for_email(current_user.email, current_user.password)
+    # roles verificados en el login (memorizados en la sesión): sin volver a hashear
+    identities = session_verified_identities(current_user)
+    available_roles = roles_of(identities)
     if role not in available_roles:
         return jsonify({"error": "Rol inválido"}), 400
 
-    user = get_user_for_role(role, current_user.email)
-    if (
-        not user
-        or not user.password
-        or user.password != current_user.password
-        or not is_active_user(user)
-    ):
+    identity = next(identity for identity in identities if identity.role == role)
+    user = load_identity_user(identity)
+    if not user:
         return jsonify({"error": "Credenciales inválidas"}), 401
 
     login_user(user)
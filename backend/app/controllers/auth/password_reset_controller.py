@@ -1,6 +1,7 @@
 from flask import Blueprint, jsonify, request, current_app
 
-from ...services.mail_service import send_email
+from ...models import db
+from ...services.mail_outbox import enqueue_email
 from ...services.password_reset_service import (
     roles_for_email,
     create_reset_token,
@@ -33,7 +34,7 @@ def forgot_password():
         if role not in roles:
             return jsonify({"error": "No existe una cuenta con ese rol para ese correo"}), 400
 
-    raw_token, _record = create_reset_token(email, role)
+    raw_token, _record = create_reset_token(email, role, commit=False)
 
     minutes = int(current_app.config.get("RESET_TOKEN_EXPIRE_MINUTES", 15))
     subject = "Recuperación de contraseña - Microempresa SaaS"
@@ -45,11 +46,9 @@ def forgot_password():
         "Si tú no pediste esto, ignora este correo.\n"
     )
 
-    try:
-        send_email(email, subject, body)
-    except Exception:
-        current_app.logger.exception("Error enviando correo de recuperación")
-        return jsonify({"error": "No se pudo enviar el correo. Revisa MAIL_USER/MAIL_PASS."}), 500
+    # ✅ token + correo en la MISMA transacción; el envío SMTP lo hace el sender del outbox
+    enqueue_email(email, subject, body)
+    db.session.commit()
 
     return jsonify({"message": "Token enviado", "role": role}), 200
 
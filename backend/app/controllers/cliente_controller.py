@@ -1,12 +1,33 @@
-from flask import Blueprint, jsonify, request
+import csv
+import io
+import os
+import re
+
+from flask import Blueprint, current_app, jsonify, request
 from flask_login import current_user
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import defer
 
 from ..models import Cliente, db
 from ..services.auth_service import get_current_role, hash_password
+from ..services.cliente_import import CsvImportError, import_clientes, write_error_report
+from ..services.cliente_search import DEFAULT_SEARCH_LIMIT, MAX_SEARCH_LIMIT, search_clientes
+from ..services.cliente_service import ClienteError, parse_cliente
+from ..services.identity_cache import invalidate_user
+from ..services.search_index import index_entities
+from ..services.storage_service import import_report_dir, import_report_expired, save_import_report
+from ..utils.conditional import apply_validators, entity_validators, is_not_modified, not_modified_response
+from ..utils.file_delivery import send_protected_file
+from ..utils.pagination import paginated_response
+from ..utils.search import BusquedaError
+from ..utils.tenant import resolve_tenant_id
 from ..views.cliente_view import cliente_detail, cliente_item
 
 cliente_bp = Blueprint("cliente", __name__)
 
+MAX_ERRORES_EN_RESPUESTA = 50
+_REPORT_TOKEN_RE = re.compile(r"^[0-9a-f]{32}$")
+
 
 def is_super_admin():
     return current_user.is_authenticated and get_current_role(current_user) == "super_usuario"
@@ -55,32 +76,58 @@ def list_clientes():
     ✅ CAMBIO
     - super_usuario: lista todos
     - microempresa: lista SOLO clientes de su tenant
+    Paginado por keyset (nombre, id_cliente): ?limit=&cursor=, o ?format=ndjson para stream.
     """
     if not current_user.is_authenticated:
         return jsonify({"error": "No autorizado"}), 403
 
     role = get_current_role(current_user)
+    columns = (Cliente.nombre, Cliente.id_cliente)
+    # el hash de password nunca sale en el listado: no lo cargamos
+    query = Cliente.query.options(defer(Cliente.password))
+    versioned = (Cliente.updated_at,)
 
     if role == "super_usuario":
-        clientes = Cliente.query.order_by(Cliente.nombre).all()
-        return jsonify({"clientes": [cliente_item(c) for c in clientes]})
+        return paginated_response("clientes", query, columns, cliente_item, versioned=versioned)
 
     if role == "microempresa":
         tenant_id = _tenant_id_backend()
         if tenant_id is None:
             return jsonify({"error": "Tenant inválido"}), 400
 
-        clientes = (
-            Cliente.query
-            .filter_by(tenant_id=tenant_id)
-            .order_by(Cliente.nombre)
-            .all()
+        return paginated_response(
+            "clientes", query.filter_by(tenant_id=tenant_id), columns, cliente_item, versioned=versioned
         )
-        return jsonify({"clientes": [cliente_item(c) for c in clientes]})
 
     return jsonify({"error": "No autorizado"}), 403
 
 
+@cliente_bp.get("/api/clientes/buscar")
+def buscar_clientes():
+    """
+    Búsqueda para typeahead dentro de un tenant: ?q=&limit= (super_usuario: ?tenant_id=).
+    Tolera errores de tipeo y tildes; resultados ordenados por relevancia.
+    """
+    tenant_id, error = resolve_tenant_id(request.args.get("tenant_id"))
+    if error:
+        return error
+
+    try:
+        limit = int(request.args.get("limit") or DEFAULT_SEARCH_LIMIT)
+    except ValueError:
+        return jsonify({"error": "limit inválido"}), 400
+    limit = max(1, min(limit, MAX_SEARCH_LIMIT))
+
+    try:
+        rows = search_clientes(tenant_id, request.args.get("q"), limit)
+    except BusquedaError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    return jsonify(
+        {"clientes": [{**cliente_item(cliente), "score": round(score, 3)} for cliente, score in rows]}
+    )
+
+
 @cliente_bp.get("/api/clientes/<int:cliente_id>")
 def get_cliente(cliente_id):
     """
@@ -93,7 +140,10 @@ def get_cliente(cliente_id):
     if not can_access_cliente_obj(cliente):
         return jsonify({"error": "No autorizado"}), 403
 
-    return jsonify({"cliente": cliente_detail(cliente)})
+    validators = entity_validators(cliente.id_cliente, cliente.updated_at)
+    if is_not_modified(*validators):
+        return not_modified_response(*validators)
+    return apply_validators(jsonify({"cliente": cliente_detail(cliente)}), *validators)
 
 
 @cliente_bp.post("/api/clientes")
@@ -127,45 +177,95 @@ def create_cliente():
         if not tenant_id:
             return jsonify({"error": "tenant_id requerido para super_usuario"}), 400
 
-    nombre = (payload.get("nombre") or "").strip()
-    apellido_paterno = (payload.get("apellido_paterno") or "").strip()
-    apellido_materno = (payload.get("apellido_materno") or "").strip()
-    razon_social = (payload.get("razon_social") or "").strip()
-    email = (payload.get("email") or "").strip()
-    password = payload.get("password") or ""
-    es_empresa = payload.get("es_empresa")
-    es_generico = payload.get("es_generico", False)
-
-    if not all([nombre, apellido_paterno, apellido_materno, email, password]):
-        return jsonify({"error": "Todos los campos son requeridos"}), 400
-    if not isinstance(es_empresa, bool):
-        return jsonify({"error": "es_empresa debe ser boolean"}), 400
-    if es_empresa and not razon_social:
-        return jsonify({"error": "Razón social requerida"}), 400
-    if es_generico is not None and not isinstance(es_generico, bool):
-        return jsonify({"error": "es_generico debe ser boolean"}), 400
+    try:
+        values = parse_cliente(payload)
+    except ClienteError as exc:
+        return jsonify({"error": str(exc)}), 400
 
     # ✅ CAMBIO: email duplicado por tenant (no global)
-    if Cliente.query.filter_by(tenant_id=tenant_id, email=email).first():
+    if Cliente.query.filter_by(tenant_id=tenant_id, email=values["email"]).first():
         return jsonify({"error": "Email ya registrado en esta microempresa"}), 409
 
-    cliente = Cliente(
-        tenant_id=tenant_id,
-        nombre=nombre,
-        apellido_paterno=apellido_paterno,
-        apellido_materno=apellido_materno,
-        razon_social=razon_social or None,
-        es_generico=bool(es_generico),
-        email=email,
-        password=hash_password(password),
-        estado="activo",
-    )
+    values["password"] = hash_password(values["password"])
+    cliente = Cliente(tenant_id=tenant_id, estado="activo", **values)
 
     db.session.add(cliente)
+    index_entities(cliente)
     db.session.commit()
     return jsonify({"cliente": cliente_detail(cliente)}), 201
 
 
+@cliente_bp.post("/api/clientes/import")
+def import_clientes_csv():
+    """
+    Importación masiva desde CSV (multipart "file" o el body como text/csv).
+    Columnas: nombre, apellido_paterno, apellido_materno, email
+              + opcionales razon_social, es_empresa, es_generico, password
+    Las filas con password cuestan un hash scrypt cada una: como mucho
+    CLIENTE_IMPORT_MAX_PASSWORDS por archivo (el resto se rechaza en el reporte).
+    ?dry_run=1 solo valida. Si hay filas rechazadas, reporte_url apunta al CSV de errores.
+    """
+    tenant_id, error = resolve_tenant_id(request.args.get("tenant_id"))
+    if error:
+        return error
+
+    dry_run = (request.args.get("dry_run") or "").strip().lower() in {"1", "true", "si", "yes"}
+    upload = request.files.get("file")
+    raw = upload.stream if upload else request.stream
+    # utf-8-sig: Excel guarda el CSV con BOM
+    text_stream = io.TextIOWrapper(raw, encoding="utf-8-sig", newline="")
+
+    try:
+        result = import_clientes(
+            tenant_id,
+            text_stream,
+            dry_run=dry_run,
+            max_passwords=current_app.config["CLIENTE_IMPORT_MAX_PASSWORDS"],
+        )
+    except CsvImportError as exc:
+        db.session.rollback()
+        return jsonify({"error": str(exc)}), 400
+    except (UnicodeDecodeError, csv.Error) as exc:
+        db.session.rollback()
+        return jsonify({"error": f"CSV inválido: {exc}"}), 400
+    except IntegrityError:
+        # un alta concurrente por la API chocó con el lote: no se importa nada
+        db.session.rollback()
+        return jsonify({"error": "Emails registrados durante la importación, vuelve a intentar"}), 409
+
+    if dry_run:
+        db.session.rollback()
+    else:
+        db.session.commit()
+
+    errores = result.pop("errores")
+    result["errores"] = errores[:MAX_ERRORES_EN_RESPUESTA]
+    result["reporte_url"] = None
+    if errores:
+        token = save_import_report(tenant_id, write_error_report(errores))
+        result["reporte_url"] = f"/api/clientes/import/reportes/{token}?tenant_id={tenant_id}"
+    return jsonify(result), 200 if dry_run else 201
+
+
+@cliente_bp.get("/api/clientes/import/reportes/<token>")
+def download_import_report(token):
+    tenant_id, error = resolve_tenant_id(request.args.get("tenant_id"))
+    if error:
+        return error
+    if not _REPORT_TOKEN_RE.match(token):
+        return jsonify({"error": "Reporte no encontrado"}), 404
+
+    path = os.path.join(import_report_dir(tenant_id), f"{token}.csv")
+    if not os.path.isfile(path) or import_report_expired(path):
+        return jsonify({"error": "Reporte no encontrado"}), 404
+    return send_protected_file(
+        path,
+        as_attachment=True,
+        download_name="errores_importacion.csv",
+        mimetype="text/csv",
+    )
+
+
 @cliente_bp.put("/api/clientes/<int:cliente_id>")
 def update_cliente(cliente_id):
     """
@@ -232,7 +332,10 @@ def update_cliente(cliente_id):
     if password:
         cliente.password = hash_password(password)
 
+    index_entities(cliente)
     db.session.commit()
+
+    invalidate_user(cliente)
     return jsonify({"cliente": cliente_detail(cliente)})
 
 
@@ -248,7 +351,9 @@ def deactivate_cliente(cliente_id):
         return jsonify({"error": "No autorizado"}), 403
 
     cliente.estado = "inactivo"
+    index_entities(cliente)
     db.session.commit()
+    invalidate_user(cliente)
     return jsonify({"message": "Cliente dado de baja"})
 
 
@@ -264,7 +369,9 @@ def activate_cliente(cliente_id):
         return jsonify({"error": "No autorizado"}), 403
 
     cliente.estado = "activo"
+    index_entities(cliente)
     db.session.commit()
+    invalidate_user(cliente)
     return jsonify({"message": "Cliente activado"})
 
 
@@ -282,5 +389,7 @@ def delete_cliente(cliente_id):
         return jsonify({"error": "No autorizado"}), 403
 
     cliente.estado = "inactivo"
+    index_entities(cliente)
     db.session.commit()
+    invalidate_user(cliente)
     return jsonify({"message": "Cliente inactivado"})
@@ -1,12 +1,20 @@
 # dashboard_controller.py
-from flask import Blueprint, jsonify, session
+from flask import Blueprint, jsonify, request, session
 from flask_login import current_user
+from sqlalchemy import func
+from sqlalchemy.orm import defer
 
-from ..models import AdminSu, Cliente, Microempresa, Producto
+from ..models import AdminSu, Cliente, Microempresa, Producto, db
 from ..services.auth_service import guest_payload, serialize_user
+from ..utils.pagination import paginated_response
+from ..views.admin_view import admin_item
+from ..views.cliente_view import cliente_dashboard_item
+from ..views.microempresa_view import microempresa_item
 
 dashboard_bp = Blueprint("dashboard", __name__)
 
+TOP_TENANTS = 10
+
 
 def resolve_identity():
     if current_user.is_authenticated:
@@ -16,62 +24,60 @@ def resolve_identity():
     return None, None
 
 
+def _count_by(column):
+    label = column.label("grupo")
+    rows = db.session.query(label, func.count()).group_by(label).all()
+    return {grupo or "": total for grupo, total in rows}
+
+
+def _top_tenants_by_clientes():
+    # agrupa sobre cliente.tenant_id (indexado) y solo después une con microempresa
+    per_tenant = (
+        db.session.query(Cliente.tenant_id, func.count().label("clientes"))
+        .group_by(Cliente.tenant_id)
+        .subquery()
+    )
+    rows = (
+        db.session.query(Microempresa.tenant_id, Microempresa.nombre, per_tenant.c.clientes)
+        .join(per_tenant, per_tenant.c.tenant_id == Microempresa.tenant_id)
+        .order_by(per_tenant.c.clientes.desc(), Microempresa.tenant_id)
+        .limit(TOP_TENANTS)
+        .all()
+    )
+    return [
+        {"tenant_id": tenant_id, "nombre": nombre, "clientes": total}
+        for tenant_id, nombre, total in rows
+    ]
+
+
 @dashboard_bp.get("/api/dashboard")
 def dashboard():
     user_data, user_role = resolve_identity()
 
     if user_role == "super_usuario":
-        microempresas = Microempresa.query.order_by(Microempresa.nombre).all()
-        clientes = Cliente.query.order_by(Cliente.nombre).all()
-        admins = AdminSu.query.order_by(AdminSu.apellido_paterno, AdminSu.nombre).all()
-
-        tenant_name = {m.tenant_id: m.nombre for m in microempresas}
+        microempresas_por_estado = _count_by(Microempresa.estado)
+        clientes_por_estado = _count_by(Cliente.estado)
+        admins_por_estado = _count_by(AdminSu.estado)
 
         return jsonify(
             {
                 "role": user_role,
                 "counts": {
-                    "microempresas": len(microempresas),
-                    "clientes": len(clientes),
+                    "microempresas": sum(microempresas_por_estado.values()),
+                    "clientes": sum(clientes_por_estado.values()),
+                    "admins": sum(admins_por_estado.values()),
+                },
+                "breakdowns": {
+                    "microempresas_por_estado": microempresas_por_estado,
+                    "microempresas_por_tipo_tienda": _count_by(Microempresa.tipo_tienda),
+                    "clientes_por_estado": clientes_por_estado,
+                    "admins_por_estado": admins_por_estado,
+                    "clientes_por_microempresa": _top_tenants_by_clientes(),
+                },
+                # los listados se piden aparte (paginados) cuando la vista los necesita
+                "lists": {
+                    name: f"/api/dashboard/{name}" for name in ("microempresas", "clientes", "admins")
                 },
-                "admins": [
-                    {
-                        "id_su": admin.id_su,
-                        "nombre": admin.nombre,
-                        "apellido_paterno": admin.apellido_paterno,
-                        "apellido_materno": admin.apellido_materno,
-                        "email": admin.email,
-                        "estado": admin.estado,
-                    }
-                    for admin in admins
-                ],
-                "microempresas": [
-                    {
-                        "tenant_id": m.tenant_id,
-                        "nombre": m.nombre,
-                        "email": m.email,
-                        "estado": m.estado,
-                        "tipo_tienda": getattr(m, "tipo_tienda", None),
-                        "direccion": m.direccion,
-                        "horario_atencion": m.horario_atencion,
-                    }
-                    for m in microempresas
-                ],
-                "clientes": [
-                    {
-                        "id": c.id_cliente,
-                        "tenant_id": c.tenant_id,
-                        "microempresa_nombre": tenant_name.get(c.tenant_id),
-                        "nombre": c.nombre,
-                        "apellido_paterno": c.apellido_paterno,
-                        "apellido_materno": c.apellido_materno,
-                        "razon_social": c.razon_social,
-                        "es_generico": c.es_generico,
-                        "email": c.email,
-                        "estado": c.estado,
-                    }
-                    for c in clientes
-                ],
             }
         )
 
@@ -81,6 +87,7 @@ def dashboard():
             return jsonify({"error": "Tenant inválido"}), 400
 
         productos_count = Producto.query.filter_by(tenant_id=tenant_id).count()
+        stock_bajo_count = Producto.query.filter(Producto.tenant_id == tenant_id, Producto.stock_bajo()).count()
         clientes_count = Cliente.query.filter_by(tenant_id=tenant_id).count()
 
         return jsonify(
@@ -89,6 +96,7 @@ def dashboard():
                 "microempresa": user_data,
                 "counts": {
                     "productos": productos_count,
+                    "stock_bajo": stock_bajo_count,
                     "clientes": clientes_count,
                 },
             }
@@ -113,3 +121,58 @@ def dashboard():
         )
 
     return jsonify({"role": None}), 401
+
+
+@dashboard_bp.get("/api/dashboard/<lista>")
+def dashboard_list(lista):
+    """
+    Listados del dashboard de super_usuario, paginados por cursor.
+    Filtros opcionales: ?estado=activo|inactivo|pendiente, ?tenant_id= (solo clientes)
+    """
+    _user_data, user_role = resolve_identity()
+    if user_role != "super_usuario":
+        return jsonify({"error": "No autorizado"}), 403
+
+    estado = (request.args.get("estado") or "").strip()
+
+    if lista == "microempresas":
+        query = Microempresa.query.options(defer(Microempresa.password))
+        if estado:
+            query = query.filter(Microempresa.estado == estado)
+        columns = (Microempresa.nombre, Microempresa.tenant_id)
+        return paginated_response(
+            "microempresas", query, columns, microempresa_item, versioned=(Microempresa.updated_at,)
+        )
+
+    if lista == "clientes":
+        query = (
+            db.session.query(Cliente, Microempresa.nombre)
+            .options(defer(Cliente.password))
+            .join(Microempresa, Microempresa.tenant_id == Cliente.tenant_id)
+        )
+        if estado:
+            query = query.filter(Cliente.estado == estado)
+        raw_tenant = (request.args.get("tenant_id") or "").strip()
+        if raw_tenant:
+            # (tenant_id, nombre, id_cliente) está indexado: el keyset sigue usando índice
+            try:
+                query = query.filter(Cliente.tenant_id == int(raw_tenant))
+            except ValueError:
+                return jsonify({"error": "tenant_id inválido"}), 400
+        return paginated_response(
+            "clientes",
+            query,
+            (Cliente.nombre, Cliente.id_cliente),
+            lambda row: cliente_dashboard_item(row[0], row[1]),
+            key=lambda row: [row[0].nombre, row[0].id_cliente],
+            versioned=(Cliente.updated_at, Microempresa.updated_at),
+        )
+
+    if lista == "admins":
+        query = AdminSu.query.options(defer(AdminSu.password))
+        if estado:
+            query = query.filter(AdminSu.estado == estado)
+        columns = (AdminSu.apellido_paterno, AdminSu.nombre, AdminSu.id_su)
+        return paginated_response("admins", query, columns, admin_item, versioned=(AdminSu.updated_at,))
+
+    return jsonify({"error": "Listado no encontrado"}), 404
@@ -0,0 +1,128 @@
+from flask import Blueprint, jsonify, request
+from flask_login import current_user
+from sqlalchemy import func
+
+from ..extensions import db
+from ..models import Cliente, Microempresa, Plan, Suscripcion
+from ..models.plan_caracteristica import PlanCaracteristica
+from ..services.auth_service import get_current_role
+from ..utils.export import ExportError, export_args, export_response
+
+export_bp = Blueprint("export", __name__)
+
+
+def require_super_admin():
+    if not current_user.is_authenticated:
+        return jsonify({"error": "No autenticado"}), 401
+    if get_current_role(current_user) != "super_usuario":
+        return jsonify({"error": "No autorizado"}), 403
+    return None
+
+
+# Solo columnas (nunca password): cada export es un SELECT de tuplas en el orden del índice
+
+
+def _microempresas_query():
+    return db.session.query(
+        Microempresa.tenant_id.label("tenant_id"),
+        Microempresa.nombre.label("nombre"),
+        Microempresa.email.label("email"),
+        Microempresa.nombre_propietario.label("nombre_propietario"),
+        Microempresa.apellido_paterno_propietario.label("apellido_paterno_propietario"),
+        Microempresa.apellido_materno_propietario.label("apellido_materno_propietario"),
+        Microempresa.direccion.label("direccion"),
+        Microempresa.horario_atencion.label("horario_atencion"),
+        Microempresa.tipo_tienda.label("tipo_tienda"),
+        Microempresa.estado.label("estado"),
+        Microempresa.updated_at.label("updated_at"),
+    ), Microempresa.estado, (Microempresa.nombre, Microempresa.tenant_id)
+
+
+def _clientes_query():
+    query = db.session.query(
+        Cliente.id_cliente.label("id_cliente"),
+        Cliente.tenant_id.label("tenant_id"),
+        Microempresa.nombre.label("microempresa"),
+        Cliente.nombre.label("nombre"),
+        Cliente.apellido_paterno.label("apellido_paterno"),
+        Cliente.apellido_materno.label("apellido_materno"),
+        Cliente.razon_social.label("razon_social"),
+        Cliente.es_generico.label("es_generico"),
+        Cliente.email.label("email"),
+        Cliente.estado.label("estado"),
+        Cliente.updated_at.label("updated_at"),
+    ).join(Microempresa, Microempresa.tenant_id == Cliente.tenant_id)
+    return query, Cliente.estado, (Cliente.id_cliente,)
+
+
+def _plans_query():
+    caracteristicas = (
+        db.session.query(func.aggregate_strings(PlanCaracteristica.texto, " | "))
+        .filter(PlanCaracteristica.id_plan == Plan.id_plan)
+        .correlate(Plan)
+        .scalar_subquery()
+    )
+    query = db.session.query(
+        Plan.id_plan.label("id_plan"),
+        Plan.nombre.label("nombre"),
+        Plan.precio.label("precio"),
+        Plan.estado.label("estado"),
+        caracteristicas.label("caracteristicas"),
+        Plan.updated_at.label("updated_at"),
+    )
+    return query, Plan.estado, (Plan.id_plan,)
+
+
+def _suscripciones_query():
+    query = (
+        db.session.query(
+            Suscripcion.id_suscripcion.label("id_suscripcion"),
+            Suscripcion.tenant_id.label("tenant_id"),
+            Microempresa.nombre.label("microempresa"),
+            Suscripcion.id_plan.label("id_plan"),
+            Plan.nombre.label("plan"),
+            Suscripcion.estado.label("estado"),
+            Suscripcion.fecha_inicio.label("fecha_inicio"),
+            Suscripcion.fecha_fin.label("fecha_fin"),
+            Suscripcion.comprobante_nombre.label("comprobante_nombre"),
+            Suscripcion.updated_at.label("updated_at"),
+        )
+        .join(Microempresa, Microempresa.tenant_id == Suscripcion.tenant_id)
+        .join(Plan, Plan.id_plan == Suscripcion.id_plan)
+    )
+    return query, Suscripcion.estado, (Suscripcion.id_suscripcion,)
+
+
+EXPORTS = {
+    "microempresas": _microempresas_query,
+    "clientes": _clientes_query,
+    "plans": _plans_query,
+    "suscripciones": _suscripciones_query,
+}
+
+
+@export_bp.get("/api/export/<recurso>")
+def export(recurso):
+    """
+    Descarga completa en stream para la consola de super_usuario.
+    ?format=csv|ndjson  ?gzip=1  ?estado=...
+    """
+    error = require_super_admin()
+    if error:
+        return error
+
+    build = EXPORTS.get(recurso)
+    if not build:
+        return jsonify({"error": "Export no encontrado"}), 404
+
+    try:
+        fmt, gzip = export_args()
+    except ExportError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    query, estado_column, order = build()
+    estado = (request.args.get("estado") or "").strip()
+    if estado:
+        query = query.filter(estado_column == estado)
+
+    return export_response(recurso, query.order_by(*order), fmt=fmt, gzip=gzip)
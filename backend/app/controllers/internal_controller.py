@@ -0,0 +1,34 @@
+from flask import Blueprint, jsonify
+from flask_login import current_user
+
+from ..services.auth_service import get_current_role
+from ..services.db_pool import pool_telemetry
+from ..services.identity_cache import identity_cache
+
+internal_bp = Blueprint("internal", __name__)
+
+
+def require_super_admin():
+    if not current_user.is_authenticated:
+        return jsonify({"error": "No autenticado"}), 401
+    if get_current_role(current_user) != "super_usuario":
+        return jsonify({"error": "No autorizado"}), 403
+    return None
+
+
+@internal_bp.get("/api/internal/identity-cache")
+def identity_cache_stats():
+    """Contadores del caché de user_loader (de ESTE worker)."""
+    error = require_super_admin()
+    if error:
+        return error
+    return jsonify({"identity_cache": identity_cache.stats()}), 200
+
+
+@internal_bp.get("/api/internal/db-pool")
+def db_pool_stats():
+    """Estado y contadores del pool de conexiones (de ESTE worker)."""
+    error = require_super_admin()
+    if error:
+        return error
+    return jsonify({"db_pool": pool_telemetry.stats()}), 200
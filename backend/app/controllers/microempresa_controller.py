@@ -1,5 +1,6 @@
 from flask import Blueprint, jsonify, request
 from flask_login import current_user
+from sqlalchemy.orm import defer
 
 from ..models import Microempresa, db
 from ..services.auth_service import (
@@ -8,6 +9,10 @@ from ..services.auth_service import (
     is_valid_schedule,
     is_valid_url,
 )
+from ..services.identity_cache import invalidate_user
+from ..services.search_index import index_entities
+from ..utils.conditional import apply_validators, entity_validators, is_not_modified, not_modified_response
+from ..utils.pagination import paginated_response
 from ..views.microempresa_view import microempresa_detail, microempresa_item
 
 microempresa_bp = Blueprint("microempresa", __name__)
@@ -61,8 +66,11 @@ def list_microempresas():
     if not is_super_admin():
         return jsonify({"error": "No autorizado"}), 403
 
-    microempresas = Microempresa.query.order_by(Microempresa.nombre).all()
-    return jsonify({"microempresas": [microempresa_item(m) for m in microempresas]})
+    query = Microempresa.query.options(defer(Microempresa.password))
+    columns = (Microempresa.nombre, Microempresa.tenant_id)
+    return paginated_response(
+        "microempresas", query, columns, microempresa_item, versioned=(Microempresa.updated_at,)
+    )
 
 
 @microempresa_bp.get("/api/microempresas/<int:tenant_id>")
@@ -71,7 +79,10 @@ def get_microempresa(tenant_id):
         return jsonify({"error": "No autorizado"}), 403
 
     microempresa = Microempresa.query.get_or_404(tenant_id)
-    return jsonify({"microempresa": microempresa_detail(microempresa)})
+    validators = entity_validators(microempresa.tenant_id, microempresa.updated_at)
+    if is_not_modified(*validators):
+        return not_modified_response(*validators)
+    return apply_validators(jsonify({"microempresa": microempresa_detail(microempresa)}), *validators)
 
 
 @microempresa_bp.post("/api/microempresas")
@@ -130,6 +141,7 @@ def create_microempresa():
         estado="activo",
     )
     db.session.add(microempresa)
+    index_entities(microempresa)
     db.session.commit()
     return jsonify({"microempresa": microempresa_detail(microempresa)}), 201
 
@@ -233,7 +245,10 @@ def update_microempresa(tenant_id):
             microempresa.direccion, microempresa.horario_atencion
         )
 
+    index_entities(microempresa)
     db.session.commit()
+
+    invalidate_user(microempresa)
     return jsonify({"microempresa": microempresa_detail(microempresa)})
 
 
@@ -244,7 +259,9 @@ def deactivate_microempresa(tenant_id):
 
     microempresa = Microempresa.query.get_or_404(tenant_id)
     microempresa.estado = "inactivo"
+    index_entities(microempresa)
     db.session.commit()
+    invalidate_user(microempresa)
     return jsonify({"message": "Microempresa dada de baja"})
 
 
@@ -255,7 +272,9 @@ def activate_microempresa(tenant_id):
 
     microempresa = Microempresa.query.get_or_404(tenant_id)
     microempresa.estado = "activo"
+    index_entities(microempresa)
     db.session.commit()
+    invalidate_user(microempresa)
     return jsonify({"message": "Microempresa activada"})
 
 
@@ -266,5 +285,7 @@ def delete_microempresa(tenant_id):
 
     microempresa = Microempresa.query.get_or_404(tenant_id)
     microempresa.estado = "inactivo"
+    index_entities(microempresa)
     db.session.commit()
+    invalidate_user(microempresa)
     return jsonify({"message": "Microempresa inactivada"})
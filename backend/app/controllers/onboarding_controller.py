@@ -1,31 +1,20 @@
-import os
-from datetime import datetime
-
-from flask import Blueprint, jsonify, request, current_app
-from werkzeug.utils import secure_filename
+from flask import Blueprint, jsonify, request
 
 from ..extensions import db
 from ..models import Microempresa, Plan, SuscripcionSolicitud
 from ..services.auth_service import hash_password, is_valid_schedule, is_valid_url
+from ..services.identity_cache import invalidate_user
+from ..services.proof_thumbnails import proof_thumbnails
+from ..services.search_index import index_entities
+from ..services.storage_service import StorageError, save_comprobante
 
 onboarding_bp = Blueprint("onboarding", __name__)
 
-ALLOWED_EXTS = {".pdf", ".png", ".jpg", ".jpeg"}
-
 # Placeholders para tienda virtual (coinciden con frontend)
 VIRTUAL_DIRECCION = "Sin tienda física (virtual)"
 VIRTUAL_HORARIO = "Atención online"
 
 
-def _get_upload_root() -> str:
-    upload_root = current_app.config.get("UPLOAD_FOLDER") or "uploads"
-    if not os.path.isabs(upload_root):
-        backend_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
-        upload_root = os.path.join(backend_root, upload_root)
-    os.makedirs(upload_root, exist_ok=True)
-    return upload_root
-
-
 def _blocked_edit_state(solicitud: SuscripcionSolicitud) -> bool:
     return (solicitud.estado or "").lower() in {"en_espera", "aprobado", "rechazado"}
 
@@ -172,7 +161,9 @@ def onboarding_start():
                 if password:
                     microempresa.password = hash_password(password)
 
+                index_entities(microempresa)
                 db.session.commit()
+                invalidate_user(microempresa)
 
                 return jsonify({
                     "message": "Datos actualizados. Ahora selecciona el plan.",
@@ -230,7 +221,9 @@ def onboarding_start():
         if password:
             existing.password = hash_password(password)
 
+        index_entities(existing)
         db.session.commit()
+        invalidate_user(existing)
 
         return jsonify({
             "message": "Registro retomado/actualizado. Ahora selecciona un plan.",
@@ -271,6 +264,7 @@ def onboarding_start():
         comprobante_path=None,
     )
     db.session.add(solicitud)
+    index_entities(microempresa)
     db.session.commit()
 
     return jsonify(
@@ -305,32 +299,25 @@ def onboarding_submit():
     if not plan or (plan.estado or "").lower() != "activo":
         return jsonify({"error": "Plan inválido"}), 400
 
-    original_name = file.filename or "comprobante"
-    filename = secure_filename(original_name)
-    ext = os.path.splitext(filename)[1].lower()
-    if ext and ext not in ALLOWED_EXTS:
-        return jsonify({"error": "Formato no permitido. Usa PDF/JPG/PNG"}), 400
-
-    upload_root = _get_upload_root()
+    # streaming a disco + SHA-256 + magic bytes; el mismo archivo se guarda una sola vez
+    try:
+        stored = save_comprobante(file)
+    except StorageError as exc:
+        return jsonify({"error": str(exc)}), 400
     tenant_id = int(solicitud.tenant_id)
 
-    folder = os.path.join(upload_root, "comprobantes", str(tenant_id))
-    os.makedirs(folder, exist_ok=True)
-
-    stamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-    final_name = f"{stamp}_{filename}" if filename else f"{stamp}_comprobante"
-    save_path = os.path.join(folder, final_name)
-    file.save(save_path)
-
     solicitud.id_plan = plan.id_plan
     solicitud.estado = "en_espera"
-    solicitud.comprobante_path = save_path
+    solicitud.comprobante_path = stored.path
 
     if not solicitud.qr_text:
         solicitud.qr_text = f"MICROEMPRESA_SAAS|SIGNUP:{solicitud.id_solicitud}|TENANT:{tenant_id}|PLAN:{plan.id_plan}"
 
     db.session.commit()
 
+    # miniatura para la cola de revisión, generada ya en segundo plano
+    proof_thumbnails.ensure(stored.path)
+
     return jsonify({"message": "Comprobante enviado. Tu cuenta queda en espera de validación."}), 200
 
 
@@ -1,3 +1,4 @@
+from datetime import datetime
 from decimal import Decimal, InvalidOperation
 
 from flask import Blueprint, jsonify, request
@@ -7,6 +8,8 @@ from ..extensions import db
 from ..models import Plan
 from ..models.plan_caracteristica import PlanCaracteristica
 from ..services.auth_service import get_current_role
+from ..services.plan_catalog import bump_catalog_version, catalog_response, invalidate_plan_catalog
+from ..utils.pagination import paginated_response
 
 plan_bp = Blueprint("plan", __name__)
 
@@ -66,6 +69,9 @@ def set_plan_features(plan, features_list):
     """
     Reemplaza características del plan (simple y estable).
     """
+    # las características viven en otra tabla: tocamos el plan para que cambie su ETag
+    plan.updated_at = datetime.utcnow()
+
     # borrar existentes
     PlanCaracteristica.query.filter_by(id_plan=plan.id_plan).delete(synchronize_session=False)
 
@@ -79,14 +85,13 @@ def set_plan_features(plan, features_list):
 # ==========================
 @plan_bp.get("/api/plans")
 def list_plans():
-    plans = Plan.query.filter_by(estado="activo").order_by(Plan.precio.asc()).all()
-    return jsonify({"plans": [p.to_dict() for p in plans]}), 200
+    # catálogo cacheado por worker (versionado) + ETag
+    return catalog_response("plans")
 
 
 @plan_bp.get("/api/planes")
 def list_planes_alias():
-    plans = Plan.query.filter_by(estado="activo").order_by(Plan.precio.asc()).all()
-    return jsonify({"planes": [p.to_dict() for p in plans]}), 200
+    return catalog_response("planes")
 
 
 # ==========================
@@ -98,8 +103,9 @@ def admin_list_plans():
     if error:
         return error
 
-    plans = Plan.query.order_by(Plan.id_plan.asc()).all()
-    return jsonify({"plans": [p.to_dict() for p in plans]}), 200
+    return paginated_response(
+        "plans", Plan.query, (Plan.id_plan,), lambda p: p.to_dict(), versioned=(Plan.updated_at,)
+    )
 
 
 @plan_bp.post("/api/admin/plans")
@@ -141,7 +147,9 @@ def admin_create_plan():
     db.session.flush()  # para tener id_plan
 
     set_plan_features(plan, features)
+    bump_catalog_version()
     db.session.commit()
+    invalidate_plan_catalog()
 
     return jsonify({"message": "Plan creado", "plan": plan.to_dict()}), 201
 
@@ -191,7 +199,9 @@ def admin_update_plan(plan_id):
     if features is not None:
         set_plan_features(plan, features)
 
+    bump_catalog_version()
     db.session.commit()
+    invalidate_plan_catalog()
     return jsonify({"message": "Plan actualizado", "plan": plan.to_dict()}), 200
 
 
@@ -203,6 +213,8 @@ def admin_delete_plan_logical(plan_id):
 
     plan = Plan.query.get_or_404(plan_id)
     plan.estado = "inactivo"
+    bump_catalog_version()
     db.session.commit()
+    invalidate_plan_catalog()
 
     return jsonify({"message": "Plan desactivado (eliminación lógica)", "plan": plan.to_dict()}), 200
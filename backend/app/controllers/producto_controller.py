@@ -0,0 +1,366 @@
+from flask import Blueprint, current_app, jsonify, request
+from flask_login import current_user
+from sqlalchemy.exc import IntegrityError
+
+from ..models import MovimientoStock, Producto, db
+from ..services.stock_alerts import DEFAULT_FEED_LIMIT, alert_feed, emit_changes
+from ..services.auth_service import get_current_role
+from ..services.inventory_service import ProductoError, bulk_upsert_productos, parse_producto
+from ..services.stock_ledger import (
+    MovimientoError,
+    apply_movement,
+    parse_fecha,
+    record_movements,
+    stock_at,
+    transfer_stock,
+)
+from ..utils.conditional import apply_validators, entity_validators, is_not_modified, not_modified_response
+from ..utils.pagination import paginated_response
+from ..utils.tenant import resolve_tenant_id
+from ..views.producto_view import producto_detail, producto_item
+
+producto_bp = Blueprint("producto", __name__)
+
+
+def _get_producto_or_error(producto_id):
+    producto = Producto.query.get_or_404(producto_id)
+    if not current_user.is_authenticated:
+        return None, (jsonify({"error": "No autorizado"}), 403)
+
+    role = get_current_role(current_user)
+    if role == "super_usuario":
+        return producto, None
+    if role == "microempresa" and producto.tenant_id == current_user.tenant_id:
+        return producto, None
+    return None, (jsonify({"error": "No autorizado"}), 403)
+
+
+def _set_estado(producto, estado):
+    """Alta/baja: un producto con stock bajo entra o sale del feed de alertas."""
+    db.session.refresh(producto, with_for_update=True)
+    antes = {producto.id_producto: (producto.stock, producto.stock_minimo, producto.estado)}
+    producto.estado = estado
+    emit_changes(antes)
+
+
+def _codigo_taken(tenant_id, codigo, exclude_id=None):
+    query = Producto.query.filter(Producto.tenant_id == tenant_id, Producto.codigo == codigo)
+    if exclude_id is not None:
+        query = query.filter(Producto.id_producto != exclude_id)
+    return db.session.query(query.exists()).scalar()
+
+
+@producto_bp.get("/api/productos")
+def list_productos():
+    """
+    Inventario del tenant, paginado por keyset (nombre, id_producto).
+    Filtro opcional: ?estado=activo|inactivo
+    """
+    tenant_id, error = resolve_tenant_id(request.args.get("tenant_id"))
+    if error:
+        return error
+
+    query = Producto.query.filter(Producto.tenant_id == tenant_id)
+    estado = (request.args.get("estado") or "").strip()
+    if estado:
+        query = query.filter(Producto.estado == estado)
+
+    return paginated_response(
+        "productos",
+        query,
+        (Producto.nombre, Producto.id_producto),
+        producto_item,
+        versioned=(Producto.updated_at,),
+    )
+
+
+@producto_bp.get("/api/productos/stock-bajo")
+def list_stock_bajo():
+    """
+    Productos activos con stock <= stock_minimo. Usa el índice parcial
+    ix_producto_stock_bajo: el costo depende de cuántos están bajos, no del catálogo.
+    """
+    tenant_id, error = resolve_tenant_id(request.args.get("tenant_id"))
+    if error:
+        return error
+
+    query = Producto.query.filter(Producto.tenant_id == tenant_id, Producto.stock_bajo())
+    return paginated_response(
+        "productos",
+        query,
+        (Producto.id_producto,),
+        producto_item,
+        versioned=(Producto.updated_at,),
+    )
+
+
+@producto_bp.get("/api/productos/alertas")
+def list_alertas():
+    """
+    Feed de alertas para polling: ?after=<ultimo id visto>&limit=
+    Responde {"alertas": [...], "ultimo": id} (ultimo = after si no hay nuevas).
+    """
+    tenant_id, error = resolve_tenant_id(request.args.get("tenant_id"))
+    if error:
+        return error
+
+    try:
+        after = int(request.args.get("after") or 0)
+        limit = int(request.args.get("limit") or DEFAULT_FEED_LIMIT)
+    except ValueError:
+        return jsonify({"error": "after/limit inválidos"}), 400
+
+    alertas, ultimo = alert_feed(
+        tenant_id, after=after, limit=limit, lag_seconds=current_app.config["STOCK_ALERT_FEED_LAG_SECONDS"]
+    )
+    return jsonify({"alertas": [a.to_dict() for a in alertas], "ultimo": ultimo})
+
+
+@producto_bp.get("/api/productos/<int:producto_id>")
+def get_producto(producto_id):
+    producto, error = _get_producto_or_error(producto_id)
+    if error:
+        return error
+
+    validators = entity_validators(producto.id_producto, producto.updated_at)
+    if is_not_modified(*validators):
+        return not_modified_response(*validators)
+    return apply_validators(jsonify({"producto": producto_detail(producto)}), *validators)
+
+
+@producto_bp.post("/api/productos")
+def create_producto():
+    payload = request.get_json(silent=True) or {}
+    tenant_id, error = resolve_tenant_id(payload.get("tenant_id"))
+    if error:
+        return error
+
+    try:
+        values = parse_producto(payload)
+    except ProductoError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    if _codigo_taken(tenant_id, values["codigo"]):
+        return jsonify({"error": "Código ya registrado en esta microempresa"}), 409
+
+    producto = Producto(tenant_id=tenant_id, **values)
+    db.session.add(producto)
+    try:
+        db.session.flush()
+        if producto.stock:
+            record_movements(
+                [{"tenant_id": tenant_id, "id_producto": producto.id_producto, "tipo": "entrada",
+                  "cantidad": producto.stock, "nota": "stock inicial"}],
+                alertas=False,
+            )
+        # también sin stock inicial: nace con stock bajo si stock_minimo > 0
+        emit_changes({producto.id_producto: None})
+        db.session.commit()
+    except IntegrityError:
+        # otro request creó el mismo código entre el chequeo y el commit
+        db.session.rollback()
+        return jsonify({"error": "Código ya registrado en esta microempresa"}), 409
+    return jsonify({"producto": producto_detail(producto)}), 201
+
+
+@producto_bp.put("/api/productos/<int:producto_id>")
+def update_producto(producto_id):
+    producto, error = _get_producto_or_error(producto_id)
+    if error:
+        return error
+
+    payload = request.get_json(silent=True) or {}
+    try:
+        values = parse_producto(payload, partial=True)
+    except ProductoError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    codigo = values.get("codigo")
+    if codigo and codigo != producto.codigo and _codigo_taken(producto.tenant_id, codigo, producto.id_producto):
+        return jsonify({"error": "Código ya registrado en esta microempresa"}), 409
+
+    nuevo_stock = values.pop("stock", None)
+    antes = None
+    if nuevo_stock is not None or "stock_minimo" in values or "estado" in values:
+        # stock absoluto -> ajuste en el libro; el bloqueo fija el delta (y el estado
+        # previo para las alertas) frente a ventas en curso
+        db.session.refresh(producto, with_for_update=True)
+        antes = {producto.id_producto: (producto.stock, producto.stock_minimo, producto.estado)}
+
+    for field, value in values.items():
+        setattr(producto, field, value)
+
+    if nuevo_stock is not None:
+        delta = nuevo_stock - producto.stock
+        if delta:
+            producto.stock = nuevo_stock
+            record_movements(
+                [{"tenant_id": producto.tenant_id, "id_producto": producto.id_producto, "tipo": "ajuste",
+                  "cantidad": delta, "nota": "edición de producto"}],
+                alertas=False,
+            )
+    if antes:
+        emit_changes(antes)
+
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({"error": "Código ya registrado en esta microempresa"}), 409
+    return jsonify({"producto": producto_detail(producto)})
+
+
+@producto_bp.post("/api/productos/bulk")
+def bulk_upsert():
+    """
+    Alta/actualización masiva por código (SKU):
+    {"productos": [{codigo, nombre, precio_unitario, stock?, stock_minimo?, descripcion?, estado?}, ...]}
+    Las filas válidas se escriben aunque otras tengan errores.
+    """
+    payload = request.get_json(silent=True) or {}
+    tenant_id, error = resolve_tenant_id(payload.get("tenant_id"))
+    if error:
+        return error
+
+    try:
+        result = bulk_upsert_productos(tenant_id, payload.get("productos"))
+    except ProductoError as exc:
+        db.session.rollback()
+        return jsonify({"error": str(exc)}), 400
+
+    db.session.commit()
+    return jsonify(result)
+
+
+@producto_bp.get("/api/productos/<int:producto_id>/movimientos")
+def list_movimientos(producto_id):
+    producto, error = _get_producto_or_error(producto_id)
+    if error:
+        return error
+
+    query = MovimientoStock.query.filter(MovimientoStock.id_producto == producto.id_producto)
+    return paginated_response(
+        "movimientos", query, (MovimientoStock.id_movimiento,), lambda m: m.to_dict(), descending=True
+    )
+
+
+@producto_bp.post("/api/productos/<int:producto_id>/movimientos")
+def create_movimiento(producto_id):
+    """
+    Movimiento manual: {"tipo": "entrada"|"salida"|"ajuste", "cantidad": n, "nota": opcional}
+    entrada/salida llevan cantidad positiva; ajuste lleva signo.
+    """
+    producto, error = _get_producto_or_error(producto_id)
+    if error:
+        return error
+
+    payload = request.get_json(silent=True) or {}
+    tipo = (payload.get("tipo") or "").strip().lower()
+    nota = (payload.get("nota") or "").strip()[:255] or None
+    try:
+        stock = apply_movement(producto.tenant_id, producto.id_producto, tipo, payload.get("cantidad"), nota=nota)
+    except MovimientoError as exc:
+        db.session.rollback()
+        return jsonify({"error": str(exc)}), 400
+
+    db.session.commit()
+    return jsonify({"id_producto": producto.id_producto, "stock": stock}), 201
+
+
+@producto_bp.post("/api/productos/transferencias")
+def create_transferencia():
+    """{"id_origen": 1, "id_destino": 2, "cantidad": n, "nota": opcional} dentro del mismo tenant."""
+    payload = request.get_json(silent=True) or {}
+    tenant_id, error = resolve_tenant_id(payload.get("tenant_id"))
+    if error:
+        return error
+
+    try:
+        id_origen, id_destino = int(payload.get("id_origen")), int(payload.get("id_destino"))
+    except (TypeError, ValueError):
+        return jsonify({"error": "id_origen e id_destino requeridos"}), 400
+
+    nota = (payload.get("nota") or "").strip()[:255] or None
+    try:
+        referencia = transfer_stock(tenant_id, id_origen, id_destino, payload.get("cantidad"), nota=nota)
+    except MovimientoError as exc:
+        db.session.rollback()
+        return jsonify({"error": str(exc)}), 400
+
+    db.session.commit()
+    return jsonify({"referencia": referencia}), 201
+
+
+@producto_bp.get("/api/productos/stock-historico")
+def stock_historico():
+    """
+    Stock de todos los productos del tenant a ?fecha= (ISO 8601, UTC).
+    Se calcula desde el snapshot más cercano + movimientos posteriores.
+    """
+    tenant_id, error = resolve_tenant_id(request.args.get("tenant_id"))
+    if error:
+        return error
+
+    try:
+        fecha = parse_fecha(request.args.get("fecha"))
+    except MovimientoError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    balances = stock_at(tenant_id, fecha)
+    return jsonify({
+        "fecha": fecha.isoformat() if fecha else None,
+        "stock": [{"id_producto": pid, "stock": stock} for pid, stock in sorted(balances.items())],
+    })
+
+
+@producto_bp.get("/api/productos/<int:producto_id>/stock-historico")
+def stock_historico_producto(producto_id):
+    producto, error = _get_producto_or_error(producto_id)
+    if error:
+        return error
+
+    try:
+        fecha = parse_fecha(request.args.get("fecha"))
+    except MovimientoError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    balances = stock_at(producto.tenant_id, fecha, id_producto=producto.id_producto)
+    return jsonify({
+        "id_producto": producto.id_producto,
+        "fecha": fecha.isoformat() if fecha else None,
+        "stock": balances.get(producto.id_producto, 0),
+    })
+
+
+@producto_bp.patch("/api/productos/<int:producto_id>/deactivate")
+def deactivate_producto(producto_id):
+    producto, error = _get_producto_or_error(producto_id)
+    if error:
+        return error
+
+    _set_estado(producto, "inactivo")
+    db.session.commit()
+    return jsonify({"message": "Producto dado de baja"})
+
+
+@producto_bp.patch("/api/productos/<int:producto_id>/activate")
+def activate_producto(producto_id):
+    producto, error = _get_producto_or_error(producto_id)
+    if error:
+        return error
+
+    _set_estado(producto, "activo")
+    db.session.commit()
+    return jsonify({"message": "Producto activado"})
+
+
+@producto_bp.delete("/api/productos/<int:producto_id>")
+def delete_producto(producto_id):
+    producto, error = _get_producto_or_error(producto_id)
+    if error:
+        return error
+
+    # soft-delete, igual que clientes y microempresas
+    _set_estado(producto, "inactivo")
+    db.session.commit()
+    return jsonify({"message": "Producto inactivado"})
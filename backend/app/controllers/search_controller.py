@@ -0,0 +1,125 @@
+from flask import Blueprint, jsonify, request
+from flask_login import current_user
+from sqlalchemy.orm import defer
+
+from ..extensions import db
+from ..models import AdminSu, Cliente, Microempresa
+from ..models.indice_busqueda import TIPOS_BUSQUEDA
+from ..services.auth_service import get_current_role
+from ..services.search_index import search_global
+from ..utils.pagination import PaginationError, decode_cursor, encode_cursor
+from ..utils.search import BusquedaError
+from ..views.admin_view import admin_item
+from ..views.cliente_view import cliente_dashboard_item
+from ..views.microempresa_view import microempresa_item
+
+search_bp = Blueprint("search", __name__)
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 50
+
+
+def require_super_admin():
+    if not current_user.is_authenticated:
+        return jsonify({"error": "No autenticado"}), 401
+    if get_current_role(current_user) != "super_usuario":
+        return jsonify({"error": "No autorizado"}), 403
+    return None
+
+
+def _items_by_ref(hits):
+    """
+    Mismo item que los listados del dashboard, para que la consola pueda editar
+    el resultado directamente (una consulta por tipo, por PK).
+    """
+    ids = {tipo: set() for tipo in TIPOS_BUSQUEDA}
+    for entry, _score in hits:
+        ids[entry.tipo].add(entry.ref_id)
+
+    items = {}
+    if ids["microempresa"]:
+        for m in Microempresa.query.options(defer(Microempresa.password)).filter(
+            Microempresa.tenant_id.in_(ids["microempresa"])
+        ):
+            items[("microempresa", m.tenant_id)] = microempresa_item(m)
+    if ids["cliente"]:
+        rows = (
+            db.session.query(Cliente, Microempresa.nombre)
+            .options(defer(Cliente.password))
+            .join(Microempresa, Microempresa.tenant_id == Cliente.tenant_id)
+            .filter(Cliente.id_cliente.in_(ids["cliente"]))
+        )
+        for c, microempresa_nombre in rows:
+            items[("cliente", c.id_cliente)] = cliente_dashboard_item(c, microempresa_nombre)
+    if ids["admin"]:
+        for a in AdminSu.query.options(defer(AdminSu.password)).filter(AdminSu.id_su.in_(ids["admin"])):
+            items[("admin", a.id_su)] = admin_item(a)
+    return items
+
+
+@search_bp.get("/api/buscar")
+def buscar():
+    """
+    Omnibox del super_usuario: microempresas, clientes y admins en un solo índice.
+    ?q=  ?tipo=microempresa,cliente,admin  ?estado=  ?tenant_id=  ?limit=&cursor=
+    """
+    error = require_super_admin()
+    if error:
+        return error
+
+    tipos = [t.strip() for t in (request.args.get("tipo") or "").split(",") if t.strip()]
+    if any(tipo not in TIPOS_BUSQUEDA for tipo in tipos):
+        return jsonify({"error": f"tipo inválido ({', '.join(TIPOS_BUSQUEDA)})"}), 400
+
+    try:
+        limit = int(request.args.get("limit") or DEFAULT_LIMIT)
+    except ValueError:
+        return jsonify({"error": "limit inválido"}), 400
+    limit = max(1, min(limit, MAX_LIMIT))
+
+    raw_tenant = (request.args.get("tenant_id") or "").strip()
+    try:
+        tenant_id = int(raw_tenant) if raw_tenant else None
+    except ValueError:
+        return jsonify({"error": "tenant_id inválido"}), 400
+
+    # ranking por relevancia: el cursor es el desplazamiento dentro del ranking
+    cursor = (request.args.get("cursor") or "").strip()
+    try:
+        offset = int(decode_cursor(cursor, 1)[0]) if cursor else 0
+    except (PaginationError, TypeError, ValueError):
+        return jsonify({"error": "Cursor inválido"}), 400
+    if offset < 0:
+        return jsonify({"error": "Cursor inválido"}), 400
+
+    try:
+        hits, has_more = search_global(
+            request.args.get("q"),
+            tipos=tipos,
+            estado=(request.args.get("estado") or "").strip() or None,
+            tenant_id=tenant_id,
+            limit=limit,
+            offset=offset,
+        )
+    except BusquedaError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    items = _items_by_ref(hits)
+    return jsonify(
+        {
+            "resultados": [
+                {
+                    "tipo": entry.tipo,
+                    "id": entry.ref_id,
+                    "tenant_id": entry.tenant_id,
+                    "titulo": entry.titulo,
+                    "email": entry.email,
+                    "estado": entry.estado,
+                    "score": round(score, 3),
+                    "item": items.get((entry.tipo, entry.ref_id)),
+                }
+                for entry, score in hits
+            ],
+            "next_cursor": encode_cursor([offset + limit]) if has_more else None,
+        }
+    )
@@ -1,15 +1,27 @@
 import os
-from datetime import datetime, timedelta
 
-from flask import Blueprint, jsonify, send_from_directory, request, current_app
+from flask import Blueprint, jsonify, request, current_app
 from flask_login import current_user
 
 from ..extensions import db
-from ..models import SuscripcionSolicitud, Microempresa, Plan, Suscripcion
+from ..models import SuscripcionSolicitud, Microempresa, Plan
 from ..services.auth_service import get_current_role
+from ..services.proof_thumbnails import proof_thumbnails
+from ..services.storage_service import proof_etag, proof_file
+from ..services.subscription_review import (
+    SIN_MICROEMPRESA,
+    RevisionError,
+    invalidate_reviewed,
+    parse_review,
+    review_signups,
+)
+from ..utils.file_delivery import send_protected_file
+from ..utils.pagination import paginated_response
 
 subscription_review_bp = Blueprint("subscription_review", __name__)
 
+PREVIEW_MAX_AGE = 365 * 24 * 3600
+
 
 def require_super_admin():
     if not current_user.is_authenticated:
@@ -19,40 +31,55 @@ def require_super_admin():
     return None
 
 
+def _preview_url(sol):
+    # la versión (hash del comprobante) hace la URL inmutable: caché de larga duración
+    # ensure() encola la miniatura si falta, para que esté lista cuando el navegador la pida
+    version = proof_thumbnails.ensure(sol.comprobante_path)
+    if version is None:
+        return None
+    return f"/api/onboarding/microempresa/preview/{sol.id_solicitud}?v={version}"
+
+
+def _pending_item(row):
+    sol, micro, plan = row
+    return {
+        "signup_id": sol.id_solicitud,
+        "tenant_id": micro.tenant_id,
+        "microempresa": {
+            "nombre": micro.nombre,
+            "email": micro.email,
+            "estado": micro.estado,
+        },
+        "plan": plan.to_dict() if plan else None,
+        "tiene_comprobante": bool(sol.comprobante_path),
+        "proof_url": f"/api/onboarding/microempresa/proof/{sol.id_solicitud}",
+        "preview_url": _preview_url(sol),
+        "creado_en": sol.creado_en.isoformat() if sol.creado_en else None,
+    }
+
+
 @subscription_review_bp.get("/api/onboarding/microempresa/pending")
 def list_pending_microempresas():
     error = require_super_admin()
     if error:
         return error
 
-    pendientes = (
+    query = (
         db.session.query(SuscripcionSolicitud, Microempresa, Plan)
         .join(Microempresa, Microempresa.tenant_id == SuscripcionSolicitud.tenant_id)
         .outerjoin(Plan, Plan.id_plan == SuscripcionSolicitud.id_plan)
         .filter(SuscripcionSolicitud.estado == "en_espera")
-        .order_by(SuscripcionSolicitud.id_solicitud.desc())
-        .all()
     )
 
-    items = []
-    for sol, micro, plan in pendientes:
-        items.append(
-            {
-                "signup_id": sol.id_solicitud,
-                "tenant_id": micro.tenant_id,
-                "microempresa": {
-                    "nombre": micro.nombre,
-                    "email": micro.email,
-                    "estado": micro.estado,
-                },
-                "plan": plan.to_dict() if plan else None,
-                "tiene_comprobante": bool(sol.comprobante_path),
-                "proof_url": f"/api/onboarding/microempresa/proof/{sol.id_solicitud}",
-                "creado_en": sol.creado_en.isoformat() if sol.creado_en else None,
-            }
-        )
-
-    return jsonify({"pendientes": items}), 200
+    return paginated_response(
+        "pendientes",
+        query,
+        (SuscripcionSolicitud.id_solicitud,),
+        _pending_item,
+        descending=True,
+        key=lambda row: [row[0].id_solicitud],
+        versioned=(SuscripcionSolicitud.updated_at, Microempresa.updated_at, Plan.updated_at),
+    )
 
 
 @subscription_review_bp.get("/api/onboarding/microempresa/proof/<int:signup_id>")
@@ -62,59 +89,77 @@ def download_proof(signup_id: int):
         return error
 
     sol = SuscripcionSolicitud.query.get_or_404(signup_id)
-    if not sol.comprobante_path or not os.path.exists(sol.comprobante_path):
+    found = proof_file(sol.comprobante_path)
+    if not found:
         return jsonify({"error": "No hay comprobante"}), 404
 
-    directory = os.path.dirname(sol.comprobante_path)
-    filename = os.path.basename(sol.comprobante_path)
-    return send_from_directory(directory, filename, as_attachment=True)
+    path, mimetype = found
+    ext = os.path.splitext(path)[1].lower()
+    # el worker solo autoriza: según FILE_DELIVERY envía el proxy o send_file con Range
+    return send_protected_file(
+        path,
+        mimetype=mimetype,
+        as_attachment=True,
+        download_name=f"comprobante_{sol.id_solicitud}{ext}",
+        # direccionado por contenido: el hash es un ETag fuerte (None -> el de Flask)
+        etag=proof_etag(sol.comprobante_path) or True,
+    )
 
 
-@subscription_review_bp.patch("/api/onboarding/microempresa/<int:tenant_id>/approve")
-def approve_microempresa(tenant_id: int):
+@subscription_review_bp.get("/api/onboarding/microempresa/preview/<int:signup_id>")
+def preview_proof(signup_id: int):
+    """Miniatura JPEG del comprobante (imagen o 1ra página del PDF), inline y cacheable."""
     error = require_super_admin()
     if error:
         return error
 
-    payload = request.get_json(silent=True) or {}
-    observacion = (payload.get("observacion") or "").strip()
+    sol = SuscripcionSolicitud.query.get_or_404(signup_id)
+    estado, path = proof_thumbnails.get(sol.comprobante_path)
+    if estado == "pending":
+        response = jsonify({"message": "Generando vista previa"})
+        response.headers["Retry-After"] = "1"
+        return response, 202
+    if estado != "ok":
+        return jsonify({"error": "Vista previa no disponible"}), 404
+
+    response = send_protected_file(path, mimetype="image/jpeg", max_age=PREVIEW_MAX_AGE)
+    # detrás de login: solo el caché del navegador, nunca uno compartido
+    response.cache_control.public = False
+    response.cache_control.private = True
+    response.cache_control.immutable = True
+    return response
+
+
+def _review(aprobar, rechazar, observacion):
+    """Revisión por conjuntos (services.subscription_review) + commit e invalidación del caché."""
+    result = review_signups(
+        aprobar,
+        rechazar,
+        revisor_id=getattr(current_user, "id_su", None),
+        observacion=observacion,
+        days=int(current_app.config.get("SUBSCRIPTION_DEFAULT_DAYS", 30)),
+    )
+    db.session.commit()
+    invalidate_reviewed(result)
+    return result
 
-    micro = Microempresa.query.get_or_404(tenant_id)
 
-    sol = (
-        SuscripcionSolicitud.query.filter_by(tenant_id=tenant_id)
-        .order_by(SuscripcionSolicitud.id_solicitud.desc())
-        .first()
-    )
-    if not sol or sol.estado != "en_espera":
-        return jsonify({"error": "No hay solicitud en espera"}), 400
-    if not sol.id_plan:
-        return jsonify({"error": "Solicitud sin plan seleccionado"}), 400
-
-    # activar microempresa
-    micro.estado = "activo"
-
-    # registrar suscripción activa
-    days = int(current_app.config.get("SUBSCRIPTION_DEFAULT_DAYS", 30))
-    now = datetime.utcnow()
-
-    sus = Suscripcion(
-        tenant_id=tenant_id,
-        id_plan=sol.id_plan,
-        estado="activa",
-        fecha_inicio=now,
-        fecha_fin=now + timedelta(days=days),
-    )
-    db.session.add(sus)
+def _review_one(tenant_id, decision, message):
+    payload = request.get_json(silent=True) or {}
+    aprobar, rechazar = ([tenant_id], []) if decision == "aprobar" else ([], [tenant_id])
+    result = _review(aprobar, rechazar, payload.get("observacion"))
+    if result["omitidas"]:
+        motivo = result["omitidas"][0]["error"]
+        return jsonify({"error": motivo}), 404 if motivo == SIN_MICROEMPRESA else 400
+    return jsonify({"message": message}), 200
 
-    # marcar solicitud
-    sol.estado = "aprobado"
-    sol.revisado_en = now
-    sol.revisado_por = getattr(current_user, "id_su", None)
-    sol.observacion = observacion or None
 
-    db.session.commit()
-    return jsonify({"message": "Microempresa aprobada"}), 200
+@subscription_review_bp.patch("/api/onboarding/microempresa/<int:tenant_id>/approve")
+def approve_microempresa(tenant_id: int):
+    error = require_super_admin()
+    if error:
+        return error
+    return _review_one(tenant_id, "aprobar", "Microempresa aprobada")
 
 
 @subscription_review_bp.patch("/api/onboarding/microempresa/<int:tenant_id>/reject")
@@ -122,26 +167,24 @@ def reject_microempresa(tenant_id: int):
     error = require_super_admin()
     if error:
         return error
+    return _review_one(tenant_id, "rechazar", "Microempresa rechazada")
 
-    payload = request.get_json(silent=True) or {}
-    observacion = (payload.get("observacion") or "").strip()
-
-    micro = Microempresa.query.get_or_404(tenant_id)
-    sol = (
-        SuscripcionSolicitud.query.filter_by(tenant_id=tenant_id)
-        .order_by(SuscripcionSolicitud.id_solicitud.desc())
-        .first()
-    )
-    if not sol or sol.estado != "en_espera":
-        return jsonify({"error": "No hay solicitud en espera"}), 400
 
-    micro.estado = "inactivo"
+@subscription_review_bp.post("/api/onboarding/microempresa/review")
+def review_microempresas():
+    """
+    Aprobación/rechazo en lote: {"aprobar": [tenant_id...], "rechazar": [...], "observacion": "..."}.
+    Los tenants que no se pueden revisar se informan en "omitidas"; el resto se aplica igual.
+    """
+    error = require_super_admin()
+    if error:
+        return error
 
-    now = datetime.utcnow()
-    sol.estado = "rechazado"
-    sol.revisado_en = now
-    sol.revisado_por = getattr(current_user, "id_su", None)
-    sol.observacion = observacion or None
+    payload = request.get_json(silent=True) or {}
+    try:
+        aprobar, rechazar = parse_review(payload)
+    except RevisionError as exc:
+        return jsonify({"error": str(exc)}), 400
 
-    db.session.commit()
-    return jsonify({"message": "Microempresa rechazada"}), 200
+    result = _review(aprobar, rechazar, payload.get("observacion"))
+    return jsonify(result), 200
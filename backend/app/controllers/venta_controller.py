@@ -0,0 +1,54 @@
+from flask import Blueprint, jsonify, request
+from flask_login import current_user
+
+from ..models import Venta, db
+from ..services.auth_service import get_current_role
+from ..services.sales_service import PedidoError, StockInsuficiente, place_order
+from ..utils.pagination import paginated_response
+from ..utils.tenant import resolve_tenant_id
+
+venta_bp = Blueprint("venta", __name__)
+
+
+@venta_bp.post("/api/ventas")
+def create_venta():
+    """
+    Venta multi-línea:
+    {"lineas": [{"id_producto": 1, "cantidad": 2}, ...], "id_cliente": opcional}
+    Todo o nada: si una línea no tiene stock -> 409 con las líneas faltantes.
+    """
+    payload = request.get_json(silent=True) or {}
+    tenant_id, error = resolve_tenant_id(payload.get("tenant_id"))
+    if error:
+        return error
+
+    try:
+        venta = place_order(tenant_id, payload.get("lineas"), id_cliente=payload.get("id_cliente"))
+    except PedidoError as exc:
+        return jsonify({"error": str(exc)}), 400
+    except StockInsuficiente as exc:
+        return jsonify({"error": "Stock insuficiente", "faltantes": exc.faltantes}), 409
+
+    return jsonify({"venta": venta.to_dict()}), 201
+
+
+@venta_bp.get("/api/ventas")
+def list_ventas():
+    tenant_id, error = resolve_tenant_id(request.args.get("tenant_id"))
+    if error:
+        return error
+
+    query = Venta.query.filter(Venta.tenant_id == tenant_id)
+    return paginated_response("ventas", query, (Venta.id_venta,), lambda v: v.to_dict(), descending=True)
+
+
+@venta_bp.get("/api/ventas/<int:venta_id>")
+def get_venta(venta_id):
+    venta = db.get_or_404(Venta, venta_id)
+    if not current_user.is_authenticated:
+        return jsonify({"error": "No autorizado"}), 403
+
+    role = get_current_role(current_user)
+    if role == "super_usuario" or (role == "microempresa" and venta.tenant_id == current_user.tenant_id):
+        return jsonify({"venta": venta.to_dict()})
+    return jsonify({"error": "No autorizado"}), 403
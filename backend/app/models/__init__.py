@@ -5,12 +5,20 @@ from .cliente import Cliente
 from .microempresa import Microempresa
 from .producto import Producto
 from .password_reset import PasswordResetToken
+from .mail_outbox import MailOutbox
+from .cache_version import CacheVersion
+from .indice_busqueda import IndiceBusqueda
 
 # ✅ módulo 2
 from .plan import Plan
 from .suscripcion import Suscripcion
 from .suscripcion_solicitud import SuscripcionSolicitud
 
+# ✅ módulo 3 (inventario)
+from .venta import Venta, VentaDetalle
+from .movimiento_stock import MovimientoStock, StockSnapshot
+from .alerta_stock import AlertaStock
+
 __all__ = [
     "db",
     "AdminSu",
@@ -18,7 +26,15 @@ __all__ = [
     "Microempresa",
     "Producto",
     "PasswordResetToken",
+    "MailOutbox",
+    "CacheVersion",
+    "IndiceBusqueda",
     "Plan",
     "Suscripcion",
     "SuscripcionSolicitud",
+    "Venta",
+    "VentaDetalle",
+    "MovimientoStock",
+    "StockSnapshot",
+    "AlertaStock",
 ]
@@ -1,9 +1,9 @@
 from flask_login import UserMixin
 
-from .base import db
+from .base import TimestampMixin, db
 
 
-class AdminSu(UserMixin, db.Model):
+class AdminSu(UserMixin, TimestampMixin, db.Model):
     __tablename__ = "admin_su"
 
     id_su = db.Column(db.BigInteger, primary_key=True)
@@ -14,6 +14,13 @@ class AdminSu(UserMixin, db.Model):
     password = db.Column(db.Text, nullable=False)
     estado = db.Column(db.String(20), nullable=False, default="activo")
 
+    # keyset del listado (apellido_paterno, nombre, id_su)
+    __table_args__ = (
+        db.Index("ix_admin_su_apellido_nombre_id", "apellido_paterno", "nombre", "id_su"),
+        # directorio de identidades: búsqueda por email sin distinguir mayúsculas
+        db.Index("ix_admin_su_email_lower", db.func.lower(email)),
+    )
+
     def get_id(self):
         return f"super_usuario:{self.id_su}"
 
@@ -0,0 +1,40 @@
+from datetime import datetime
+
+from .base import db
+
+
+class AlertaStock(db.Model):
+    """
+    Feed de alertas de stock por tenant (solo se inserta).
+    Se genera cuando un producto entra o sale de stock bajo (activo y stock <= stock_minimo),
+    sea por un movimiento, un cambio de stock_minimo o un alta/baja:
+    - stock_bajo: entró (o nació con stock bajo)
+    - repuesto:   salió (repuesto, mínimo bajado o producto dado de baja)
+    """
+
+    __tablename__ = "alerta_stock"
+
+    id_alerta = db.Column(db.BigInteger, primary_key=True)
+    tenant_id = db.Column(
+        db.BigInteger, db.ForeignKey("microempresa.tenant_id"), nullable=False
+    )
+    id_producto = db.Column(db.BigInteger, db.ForeignKey("producto.id_producto"), nullable=False)
+    tipo = db.Column(db.String(20), nullable=False)
+    stock = db.Column(db.Integer, nullable=False)
+    stock_minimo = db.Column(db.Integer, nullable=False)
+    creado_en = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        # polling: WHERE tenant_id = ? AND id_alerta > ? ORDER BY id_alerta
+        db.Index("ix_alerta_stock_tenant_id_alerta", "tenant_id", "id_alerta"),
+    )
+
+    def to_dict(self):
+        return {
+            "id_alerta": self.id_alerta,
+            "id_producto": self.id_producto,
+            "tipo": self.tipo,
+            "stock": self.stock,
+            "stock_minimo": self.stock_minimo,
+            "creado_en": self.creado_en.isoformat() if self.creado_en else None,
+        }
@@ -1,4 +1,30 @@
+from datetime import datetime
+
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import DDL, event
 
 
 db = SQLAlchemy()
+
+# búsqueda difusa (índices trigram). btree_gin: tenant_id dentro del mismo índice GIN
+for _extension in ("pg_trgm", "btree_gin"):
+    event.listen(
+        db.metadata,
+        "before_create",
+        DDL(f"CREATE EXTENSION IF NOT EXISTS {_extension}").execute_if(dialect="postgresql"),
+    )
+
+
+class TimestampMixin:
+    """
+    updated_at mantenido por SQLAlchemy en cada UPDATE (ORM o Core).
+    Sirve para ETag/Last-Modified baratos: max(updated_at) + count(*).
+    """
+
+    updated_at = db.Column(
+        db.DateTime,
+        nullable=False,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+        index=True,
+    )
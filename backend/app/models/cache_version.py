@@ -0,0 +1,14 @@
+from .base import db
+
+
+class CacheVersion(db.Model):
+    """
+    Contador de versión por recurso cacheado (ej. "plan_catalog").
+    Los endpoints que modifican el recurso lo incrementan en su misma transacción;
+    los workers comparan su copia local contra este número.
+    """
+
+    __tablename__ = "cache_version"
+
+    nombre = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
@@ -1,8 +1,11 @@
 from flask_login import UserMixin
-from .base import db
+from sqlalchemy import event
 
+from ..utils.search import normalize_search
+from .base import TimestampMixin, db
 
-class Cliente(UserMixin, db.Model):
+
+class Cliente(UserMixin, TimestampMixin, db.Model):
     __tablename__ = "cliente"
 
     id_cliente = db.Column(db.BigInteger, primary_key=True)
@@ -28,13 +31,37 @@ class Cliente(UserMixin, db.Model):
 
     estado = db.Column(db.String(20), nullable=False, default="activo")
 
+    # texto normalizado para /api/clientes/buscar (ver search_text)
+    busqueda = db.Column(db.Text, nullable=False, default="")
+
     microempresa = db.relationship("Microempresa", back_populates="clientes")
 
     # recomendado: email único por tenant, no global
     __table_args__ = (
         db.UniqueConstraint("tenant_id", "email", name="uq_cliente_tenant_email"),
+        # keyset de los listados (global y por tenant)
+        db.Index("ix_cliente_nombre_id", "nombre", "id_cliente"),
+        db.Index("ix_cliente_tenant_nombre_id", "tenant_id", "nombre", "id_cliente"),
+        # ETag/Last-Modified del listado por tenant: max(updated_at) sin leer filas
+        db.Index("ix_cliente_tenant_updated", "tenant_id", "updated_at"),
+        # directorio de identidades: búsqueda por email sin distinguir mayúsculas
+        db.Index("ix_cliente_email_lower", db.func.lower(email)),
+        # búsqueda difusa por tenant: trigramas (LIKE '%..%' y similitud con errores de tipeo)
+        db.Index(
+            "ix_cliente_tenant_busqueda_trgm",
+            "tenant_id",
+            "busqueda",
+            postgresql_using="gin",
+            postgresql_ops={"busqueda": "gin_trgm_ops"},
+        ),
     )
 
+    SEARCH_FIELDS = ("nombre", "apellido_paterno", "apellido_materno", "razon_social", "email")
+
+    @classmethod
+    def search_text(cls, values) -> str:
+        return normalize_search(*(values.get(field) for field in cls.SEARCH_FIELDS))
+
     def get_id(self):
         return f"cliente:{self.id_cliente}"
 
@@ -50,3 +77,10 @@ class Cliente(UserMixin, db.Model):
             "email": self.email,
             "estado": self.estado,
         }
+
+
+@event.listens_for(Cliente, "before_insert")
+@event.listens_for(Cliente, "before_update")
+def _refresh_busqueda(_mapper, _connection, target):
+    # altas/ediciones por el ORM; los INSERT masivos (importación CSV) la calculan ellos
+    target.busqueda = Cliente.search_text({field: getattr(target, field) for field in Cliente.SEARCH_FIELDS})
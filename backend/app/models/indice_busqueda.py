@@ -0,0 +1,35 @@
+from .base import TimestampMixin, db
+
+TIPOS_BUSQUEDA = ("microempresa", "cliente", "admin")
+
+
+class IndiceBusqueda(TimestampMixin, db.Model):
+    """
+    Índice de búsqueda global del super_usuario: una fila por microempresa, cliente y admin.
+    Lo mantienen los controladores al crear/editar (services/search_index.py).
+    """
+
+    __tablename__ = "indice_busqueda"
+
+    id_indice = db.Column(db.BigInteger, primary_key=True)
+    tipo = db.Column(db.String(20), nullable=False)
+    # tenant_id (microempresa), id_cliente o id_su según tipo
+    ref_id = db.Column(db.BigInteger, nullable=False)
+    tenant_id = db.Column(db.BigInteger)
+
+    titulo = db.Column(db.String(255), nullable=False)
+    email = db.Column(db.String(150))
+    estado = db.Column(db.String(30))
+    # normalizado (utils.search.normalize_search)
+    busqueda = db.Column(db.Text, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint("tipo", "ref_id", name="uq_indice_busqueda_tipo_ref"),
+        db.Index(
+            "ix_indice_busqueda_trgm",
+            "tipo",
+            "busqueda",
+            postgresql_using="gin",
+            postgresql_ops={"busqueda": "gin_trgm_ops"},
+        ),
+    )
@@ -0,0 +1,25 @@
+from datetime import datetime
+from .base import db
+
+
+class MailOutbox(db.Model):
+    __tablename__ = "mail_outbox"
+
+    id_mail = db.Column(db.BigInteger, primary_key=True)
+    to_email = db.Column(db.String(150), nullable=False)
+    subject = db.Column(db.String(255), nullable=False)
+    body = db.Column(db.Text, nullable=False)
+
+    # pendiente -> enviado / fallido (tras agotar reintentos)
+    estado = db.Column(db.String(20), nullable=False, default="pendiente")
+    intentos = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_error = db.Column(db.Text, nullable=True)
+
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+    # el sender solo mira pendientes vencidos
+    __table_args__ = (
+        db.Index("ix_mail_outbox_estado_next", "estado", "next_attempt_at"),
+    )
@@ -1,11 +1,13 @@
 import re
 from flask_login import UserMixin
-from .base import db
+from sqlalchemy.ext.hybrid import hybrid_property
+from .base import TimestampMixin, db
 
-_TIME_RANGE_RE = re.compile(r"^\s*\d{2}:\d{2}\s*-\s*\d{2}:\d{2}\s*$")
+_TIME_RANGE_PATTERN = r"^\s*\d{2}:\d{2}\s*-\s*\d{2}:\d{2}\s*$"
+_TIME_RANGE_RE = re.compile(_TIME_RANGE_PATTERN)
 
 
-class Microempresa(UserMixin, db.Model):
+class Microempresa(UserMixin, TimestampMixin, db.Model):
     __tablename__ = "microempresa"
 
     tenant_id = db.Column(db.BigInteger, primary_key=True)
@@ -31,14 +33,31 @@ class Microempresa(UserMixin, db.Model):
         lazy="dynamic",
     )
 
+    # keyset del listado (nombre, tenant_id)
+    __table_args__ = (
+        db.Index("ix_microempresa_nombre_tenant", "nombre", "tenant_id"),
+        # directorio de identidades: login por email o por nombre
+        db.Index("ix_microempresa_email_lower", db.func.lower(email)),
+        db.Index("ix_microempresa_nombre_lower", db.func.lower(nombre)),
+    )
+
     def get_id(self):
         return f"microempresa:{self.tenant_id}"
 
-    @property
+    @hybrid_property
     def tipo_tienda(self) -> str:
         h = (self.horario_atencion or "").strip()
         return "fisica" if _TIME_RANGE_RE.match(h) else "virtual"
 
+    @tipo_tienda.inplace.expression
+    @classmethod
+    def _tipo_tienda_expression(cls):
+        # misma regla que arriba, pero evaluada en SQL (para GROUP BY en el dashboard)
+        return db.case(
+            (cls.horario_atencion.regexp_match(_TIME_RANGE_PATTERN), "fisica"),
+            else_="virtual",
+        )
+
     def to_dict(self):
         return {
             "tenant_id": self.tenant_id,
@@ -0,0 +1,66 @@
+from datetime import datetime
+
+from .base import db
+
+TIPOS_MOVIMIENTO = ("entrada", "salida", "ajuste", "transferencia")
+
+
+class MovimientoStock(db.Model):
+    """
+    Libro de movimientos de stock (solo se inserta, nunca se edita).
+    cantidad es el delta con signo: entradas > 0, salidas < 0.
+    Producto.stock == último snapshot + suma de movimientos posteriores.
+    """
+
+    __tablename__ = "movimiento_stock"
+
+    id_movimiento = db.Column(db.BigInteger, primary_key=True)
+    tenant_id = db.Column(
+        db.BigInteger, db.ForeignKey("microempresa.tenant_id"), nullable=False
+    )
+    id_producto = db.Column(db.BigInteger, db.ForeignKey("producto.id_producto"), nullable=False)
+    tipo = db.Column(db.String(20), nullable=False)
+    cantidad = db.Column(db.Integer, nullable=False)
+    id_venta = db.Column(db.BigInteger, db.ForeignKey("venta.id_venta"))
+    # agrupa las dos patas de una transferencia
+    referencia = db.Column(db.String(64))
+    nota = db.Column(db.String(255))
+    creado_en = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        # historial de un producto y rango (snapshot, fecha] del cálculo histórico
+        db.Index("ix_movimiento_producto_creado", "id_producto", "creado_en"),
+        # rango por tenant al tomar snapshots
+        db.Index("ix_movimiento_tenant_creado", "tenant_id", "creado_en"),
+    )
+
+    def to_dict(self):
+        return {
+            "id_movimiento": self.id_movimiento,
+            "id_producto": self.id_producto,
+            "tipo": self.tipo,
+            "cantidad": self.cantidad,
+            "id_venta": self.id_venta,
+            "referencia": self.referencia,
+            "nota": self.nota,
+            "creado_en": self.creado_en.isoformat() if self.creado_en else None,
+        }
+
+
+class StockSnapshot(db.Model):
+    """Stock por producto al corte `tomado_en` (incluye movimientos con creado_en <= corte)."""
+
+    __tablename__ = "stock_snapshot"
+
+    id_snapshot = db.Column(db.BigInteger, primary_key=True)
+    tenant_id = db.Column(
+        db.BigInteger, db.ForeignKey("microempresa.tenant_id"), nullable=False
+    )
+    id_producto = db.Column(db.BigInteger, db.ForeignKey("producto.id_producto"), nullable=False)
+    tomado_en = db.Column(db.DateTime, nullable=False)
+    stock = db.Column(db.Integer, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint("tenant_id", "tomado_en", "id_producto", name="uq_stock_snapshot_tenant_corte"),
+        db.Index("ix_stock_snapshot_producto_corte", "id_producto", "tomado_en"),
+    )
@@ -1,8 +1,8 @@
-from .base import db
+from .base import TimestampMixin, db
 from .plan_caracteristica import PlanCaracteristica
 
 
-class Plan(db.Model):
+class Plan(TimestampMixin, db.Model):
     __tablename__ = "plan"
 
     id_plan = db.Column(db.BigInteger, primary_key=True)
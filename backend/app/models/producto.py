@@ -1,16 +1,54 @@
-from .base import db
+from .base import TimestampMixin, db
 
+LOW_STOCK_PREDICATE = "estado = 'activo' AND stock <= stock_minimo"
 
-class Producto(db.Model):
+
+class Producto(TimestampMixin, db.Model):
     __tablename__ = "producto"
 
     id_producto = db.Column(db.BigInteger, primary_key=True)
     tenant_id = db.Column(
         db.BigInteger, db.ForeignKey("microempresa.tenant_id"), nullable=False
     )
+    # clave natural por tenant (SKU): la usa el upsert masivo
+    codigo = db.Column(db.String(64), nullable=False)
     nombre = db.Column(db.String(150), nullable=False)
     descripcion = db.Column(db.Text)
     precio_unitario = db.Column(db.Numeric(10, 2), nullable=False)
     stock = db.Column(db.Integer, nullable=False, default=0)
     stock_minimo = db.Column(db.Integer, nullable=False, default=0)
     estado = db.Column(db.String(20), nullable=False, default="activo")
+
+    __table_args__ = (
+        # árbitro del INSERT ... ON CONFLICT (tenant_id, codigo)
+        db.UniqueConstraint("tenant_id", "codigo", name="uq_producto_tenant_codigo"),
+        # keyset del listado por tenant
+        db.Index("ix_producto_tenant_nombre_id", "tenant_id", "nombre", "id_producto"),
+        # índice parcial: solo contiene los productos con stock bajo, así la consulta
+        # (y el polling de las tiendas) cuesta O(productos en stock bajo)
+        db.Index(
+            "ix_producto_stock_bajo",
+            "tenant_id",
+            "id_producto",
+            postgresql_where=db.text(LOW_STOCK_PREDICATE),
+            sqlite_where=db.text(LOW_STOCK_PREDICATE),
+        ),
+    )
+
+    @classmethod
+    def stock_bajo(cls):
+        # debe implicar el predicado del índice parcial para que el planner lo use
+        return db.and_(cls.estado == "activo", cls.stock <= cls.stock_minimo)
+
+    def to_dict(self):
+        return {
+            "id_producto": self.id_producto,
+            "tenant_id": self.tenant_id,
+            "codigo": self.codigo,
+            "nombre": self.nombre,
+            "descripcion": self.descripcion,
+            "precio_unitario": float(self.precio_unitario or 0),
+            "stock": self.stock,
+            "stock_minimo": self.stock_minimo,
+            "estado": self.estado,
+        }
@@ -1,7 +1,7 @@
-from .base import db
+from .base import TimestampMixin, db
 
 
-class Suscripcion(db.Model):
+class Suscripcion(TimestampMixin, db.Model):
     __tablename__ = "suscripcion"
 
     id_suscripcion = db.Column(db.BigInteger, primary_key=True)
@@ -3,10 +3,10 @@ import secrets
 from datetime import datetime, timedelta
 
 from flask import current_app
-from .base import db
+from .base import TimestampMixin, db
 
 
-class SuscripcionSolicitud(db.Model):
+class SuscripcionSolicitud(TimestampMixin, db.Model):
     __tablename__ = "suscripcion_solicitud"
 
     id_solicitud = db.Column(db.BigInteger, primary_key=True)
@@ -28,6 +28,11 @@ class SuscripcionSolicitud(db.Model):
     revisado_por = db.Column(db.BigInteger, db.ForeignKey("admin_su.id_su"), nullable=True)
     observacion = db.Column(db.Text, nullable=True)
 
+    __table_args__ = (
+        # cola de revisión: WHERE estado = 'en_espera' ORDER BY id_solicitud (keyset), sin recorrer el historial
+        db.Index("ix_suscripcion_solicitud_estado_id", "estado", "id_solicitud"),
+    )
+
     @staticmethod
     def generate_onboarding_token():
         raw = secrets.token_urlsafe(24)
@@ -0,0 +1,57 @@
+from datetime import datetime
+
+from .base import db
+
+
+class Venta(db.Model):
+    __tablename__ = "venta"
+
+    id_venta = db.Column(db.BigInteger, primary_key=True)
+    tenant_id = db.Column(
+        db.BigInteger, db.ForeignKey("microempresa.tenant_id"), nullable=False
+    )
+    id_cliente = db.Column(db.BigInteger, db.ForeignKey("cliente.id_cliente"))
+    total = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+    creado_en = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    detalles = db.relationship(
+        "VentaDetalle",
+        backref="venta",
+        cascade="all, delete-orphan",
+        lazy="selectin",
+    )
+
+    __table_args__ = (
+        # listado por tenant, más recientes primero (keyset)
+        db.Index("ix_venta_tenant_id_venta", "tenant_id", "id_venta"),
+    )
+
+    def to_dict(self):
+        return {
+            "id_venta": self.id_venta,
+            "tenant_id": self.tenant_id,
+            "id_cliente": self.id_cliente,
+            "total": float(self.total or 0),
+            "creado_en": self.creado_en.isoformat() if self.creado_en else None,
+            "lineas": [d.to_dict() for d in (self.detalles or [])],
+        }
+
+
+class VentaDetalle(db.Model):
+    __tablename__ = "venta_detalle"
+
+    id_detalle = db.Column(db.BigInteger, primary_key=True)
+    id_venta = db.Column(
+        db.BigInteger, db.ForeignKey("venta.id_venta", ondelete="CASCADE"), nullable=False, index=True
+    )
+    id_producto = db.Column(db.BigInteger, db.ForeignKey("producto.id_producto"), nullable=False)
+    cantidad = db.Column(db.Integer, nullable=False)
+    # precio al momento de la venta (el del producto puede cambiar después)
+    precio_unitario = db.Column(db.Numeric(10, 2), nullable=False)
+
+    def to_dict(self):
+        return {
+            "id_producto": self.id_producto,
+            "cantidad": self.cantidad,
+            "precio_unitario": float(self.precio_unitario or 0),
+        }
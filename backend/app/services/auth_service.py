@@ -2,9 +2,18 @@ import hashlib
 from datetime import datetime
 from urllib.parse import urlparse
 
+from flask import session
+from sqlalchemy.orm import make_transient_to_detached
+
 from ..models import AdminSu, Cliente, Microempresa
 from ..models.auth import ROLE_TYPES
 from ..models.base import db
+from .identity_cache import identity_cache, invalidate_user
+from .identity_service import find_identities, is_active_identity, normalize_identifier
+from .password_hasher import password_hasher
+
+# roles verificados con la contraseña en el login: [[rol, id, huella_del_hash], ...]
+VERIFIED_SESSION_KEY = "verified_identities"
 
 ROLE_MODELS = {
     "super_usuario": AdminSu,
@@ -14,7 +23,38 @@ ROLE_MODELS = {
 
 
 def hash_password(password):
-    return hashlib.sha256(password.encode("utf-8")).hexdigest()
+    return password_hasher.hash(password)
+
+
+def verify_password(password, stored_hash):
+    return password_hasher.verify(password, stored_hash)
+
+
+def verified_identities(identities, password):
+    """
+    Filtra las identidades activas cuya contraseña coincide.
+    Hashes idénticos (mismo string guardado) se verifican una sola vez.
+    """
+    results = {}
+    verified = []
+    for identity in identities:
+        if not identity.password or not is_active_identity(identity):
+            continue
+        if identity.password not in results:
+            results[identity.password] = verify_password(password, identity.password)
+        if results[identity.password]:
+            verified.append(identity)
+    return verified
+
+
+def rehash_if_needed(user, password):
+    """Migra hashes SHA-256 (o de costo menor) al KDF actual tras un login válido."""
+    if not password_hasher.needs_rehash(user.password):
+        return False
+    user.password = hash_password(password)
+    db.session.commit()
+    invalidate_user(user)
+    return True
 
 
 def serialize_user(user):
@@ -28,7 +68,29 @@ def serialize_user(user):
 
 
 def get_current_role(user):
-    return serialize_user(user)[1]
+    # sin serializar: solo importa el tipo del usuario
+    for role, model in ROLE_MODELS.items():
+        if isinstance(user, model):
+            return role
+    return None
+
+
+def _snapshot_user(user):
+    mapper = db.inspect(user).mapper
+    return {attr.key: getattr(user, attr.key) for attr in mapper.column_attrs}
+
+
+def _restore_user(model, snapshot):
+    # reconstruye la instancia como si viniera de la BD y la asocia a la sesión sin SQL
+    user = model(**snapshot)
+    make_transient_to_detached(user)
+    return db.session.merge(user, load=False)
+
+
+def _updated_at(model, pk):
+    # solo la columna, por PK: verificar un snapshot cuesta menos que recargar la fila
+    pk_column = db.inspect(model).primary_key[0]
+    return db.session.query(model.updated_at).filter(pk_column == pk).scalar()
 
 
 def load_user(user_id):
@@ -41,7 +103,25 @@ def load_user(user_id):
     model = ROLE_MODELS.get(role)
     if not model:
         return None
-    return db.session.get(model, int(raw_id))
+    try:
+        pk = int(raw_id)
+    except ValueError:
+        return None
+
+    key = f"{role}:{pk}"
+    cached = identity_cache.get(key)
+    if cached is not None:
+        snapshot, revalidate = cached
+        if not revalidate:
+            return _restore_user(model, snapshot)
+        if _updated_at(model, pk) == snapshot.get("updated_at"):
+            identity_cache.confirm(key)
+            return _restore_user(model, snapshot)
+
+    user = db.session.get(model, pk)
+    if user is not None:
+        identity_cache.set(key, _snapshot_user(user))
+    return user
 
 
 def is_valid_url(value):
@@ -61,41 +141,84 @@ def is_valid_schedule(value):
     return start < end
 
 
-def get_user_for_role(role, identifier):
-    if role == "microempresa":
-        user = Microempresa.query.filter_by(email=identifier).first()
-        if not user:
-            user = Microempresa.query.filter_by(nombre=identifier).first()
-        return user
-    model = ROLE_MODELS.get(role)
+def load_identity_user(identity):
+    model = ROLE_MODELS.get(identity.role)
     if not model:
         return None
-    return model.query.filter_by(email=identifier).first()
+    return db.session.get(model, identity.id)
 
 
-def get_users_by_identifier(identifier):
-    return {
-        role_key: get_user_for_role(role_key, identifier)
-        for role_key in ROLE_TYPES
-    }
+def get_user_for_role(role, identifier):
+    identities = find_identities(identifier, role=role)
+    if not identities:
+        return None
+    return load_identity_user(identities[0])
 
 
 def is_active_user(user):
     return getattr(user, "estado", "activo") == "activo"
 
 
-def get_roles_for_email(email, password_hash):
-    roles = []
-    for role_key, model in ROLE_MODELS.items():
-        user = model.query.filter_by(email=email).first()
+def _hash_fingerprint(stored_hash):
+    # huella corta del hash guardado: si la contraseña cambia, la verificación memorizada caduca
+    return hashlib.sha256((stored_hash or "").encode("utf-8")).hexdigest()[:16]
+
+
+def _identity_key(user):
+    role, raw_id = user.get_id().split(":", 1)
+    return role, int(raw_id)
+
+
+def remember_verified_roles(user, password, verified=None):
+    """
+    Guarda en la sesión qué cuentas con el mismo email comparten la contraseña,
+    para que /api/me y /api/switch-role no tengan que volver a hashear.
+    - verified: identidades ya verificadas en este request (evita re-hashear)
+    """
+    own_key = _identity_key(user)
+    email_key = normalize_identifier(user.email)
+    if verified is None:
+        candidates = [
+            identity
+            for identity in find_identities(user.email, by_name=False)
+            if (identity.role, identity.id) != own_key
+        ]
+        verified = verified_identities(candidates, password)
+
+    entries = {own_key: user.password}
+    for identity in verified:
+        key = (identity.role, identity.id)
+        if key != own_key and normalize_identifier(identity.email) == email_key:
+            entries[key] = identity.password
+
+    session[VERIFIED_SESSION_KEY] = [
+        [role, pk, _hash_fingerprint(stored)] for (role, pk), stored in entries.items()
+    ]
+    return sorted({role for role, _pk in entries}, key=ROLE_TYPES.index)
+
+
+def session_verified_identities(user):
+    """
+    Identidades (mismo email) verificadas en el login de esta sesión, que siguen
+    activas y con la misma contraseña. Una consulta, sin hashing.
+    """
+    memo = {
+        (role, pk): fingerprint
+        for role, pk, fingerprint in session.get(VERIFIED_SESSION_KEY) or []
+    }
+    own_key = _identity_key(user)
+    identities = []
+    for identity in find_identities(user.email, by_name=False):
+        key = (identity.role, identity.id)
+        if key == own_key:
+            identities.append(identity)
+            continue
         if (
-            user
-            and user.password
-            and user.password == password_hash
-            and is_active_user(user)
+            memo.get(key) == _hash_fingerprint(identity.password)
+            and is_active_identity(identity)
         ):
-            roles.append(role_key)
-    return roles
+            identities.append(identity)
+    return identities
 
 
 def guest_payload():
@@ -0,0 +1,166 @@
+import csv
+from datetime import datetime
+
+from ..models import Cliente, db
+from ..utils.bulk import bulk_insert
+from .auth_service import hash_password
+from .cliente_service import ClienteError, parse_cliente
+from .search_index import index_clientes
+
+REQUIRED_COLUMNS = ("nombre", "apellido_paterno", "apellido_materno", "email")
+DEFAULT_BATCH_SIZE = 1000
+# ~100 ms de scrypt por password en el hilo del request: acota la duración del import
+# y cuánto ocupa el pool de hashes que comparten los logins
+DEFAULT_MAX_PASSWORDS = 100
+
+# sin password en el CSV: la cuenta no puede iniciar sesión hasta recuperar contraseña
+UNUSABLE_PASSWORD = "!"
+
+_TRUE = {"1", "true", "t", "si", "sí", "s", "yes", "y", "x"}
+_FALSE = {"0", "false", "f", "no", "n", ""}
+
+COPY_COLUMNS = (
+    "tenant_id",
+    "nombre",
+    "apellido_paterno",
+    "apellido_materno",
+    "razon_social",
+    "es_generico",
+    "email",
+    "password",
+    "estado",
+    "busqueda",
+    "updated_at",
+)
+
+
+class CsvImportError(ValueError):
+    """Error del archivo completo (no de una fila)."""
+
+
+def _csv_bool(raw):
+    value = (raw or "").strip().lower()
+    if value in _TRUE:
+        return True
+    if value in _FALSE:
+        return False
+    return raw  # parse_cliente lo rechaza con el mismo mensaje de la API
+
+
+def _row_payload(row) -> dict:
+    payload = {key: (row.get(key) or "").strip() for key in (*REQUIRED_COLUMNS, "razon_social", "password")}
+    # es_empresa es opcional en el CSV: si no viene, se deduce de razon_social
+    if (row.get("es_empresa") or "").strip():
+        payload["es_empresa"] = _csv_bool(row["es_empresa"])
+    else:
+        payload["es_empresa"] = bool(payload["razon_social"])
+    payload["es_generico"] = _csv_bool(row.get("es_generico"))
+    return payload
+
+
+def _insert_batch(tenant_id, rows) -> None:
+    if not rows:
+        return
+    bulk_insert(Cliente, COPY_COLUMNS, rows)
+    # índice global del super_usuario (COPY no devuelve ids: se buscan por email)
+    index_clientes(tenant_id, [row["email"] for row in rows])
+
+
+def import_clientes(
+    tenant_id, text_stream, *, dry_run=False, batch_size=DEFAULT_BATCH_SIZE, max_passwords=DEFAULT_MAX_PASSWORDS
+) -> dict:
+    """
+    Importa clientes desde un CSV leído como stream (sin commit).
+    - valida cada fila con las mismas reglas que create_cliente (password opcional)
+    - deduplica emails (exactos, como uq_cliente_tenant_email) contra los del tenant
+      (precargados en un set) y dentro del archivo
+    - inserta en lotes: COPY en Postgres, executemany en otras bases
+    - como mucho max_passwords filas con password (cada una es un hash scrypt);
+      las siguientes se rechazan: esas cuentas se crean sin password o en otro archivo
+    - dry_run: solo valida
+    Devuelve {"resumen": {...}, "errores": [{"fila", "email", "error"}]}.
+    """
+    reader = csv.DictReader(text_stream)
+    columns = {(name or "").strip().lower() for name in (reader.fieldnames or [])}
+    missing = [col for col in REQUIRED_COLUMNS if col not in columns]
+    if missing:
+        raise CsvImportError(f"Faltan columnas: {', '.join(missing)}")
+    reader.fieldnames = [(name or "").strip().lower() for name in reader.fieldnames]
+
+    # una sola consulta en vez de un SELECT por fila; misma regla que create_cliente y
+    # uq_cliente_tenant_email (email exacto, sin pasar a minúsculas)
+    seen = {email for (email,) in db.session.query(Cliente.email).filter(Cliente.tenant_id == tenant_id)}
+
+    now = datetime.utcnow()
+    errores, batch = [], []
+    filas = insertadas = con_password = 0
+    # fila 1 = encabezado
+    for fila, row in enumerate(reader, start=2):
+        filas += 1
+        email = (row.get("email") or "").strip()
+        try:
+            values = parse_cliente(_row_payload(row), require_password=False)
+        except ClienteError as exc:
+            errores.append({"fila": fila, "email": email, "error": str(exc)})
+            continue
+
+        key = values["email"]
+        if key in seen:
+            errores.append({"fila": fila, "email": email, "error": "Email ya registrado en esta microempresa"})
+            continue
+        if values["password"]:
+            if con_password >= max_passwords:
+                errores.append(
+                    {"fila": fila, "email": email, "error": f"Máximo {max_passwords} filas con password por archivo"}
+                )
+                continue
+            con_password += 1
+        seen.add(key)
+
+        if dry_run:
+            insertadas += 1
+            continue
+
+        password = values.pop("password")
+        batch.append(
+            {
+                **values,
+                "tenant_id": tenant_id,
+                # scrypt es caro a propósito: solo se paga por las filas que traen password
+                "password": hash_password(password) if password else UNUSABLE_PASSWORD,
+                "estado": "activo",
+                # COPY/executemany no pasan por los eventos del ORM
+                "busqueda": Cliente.search_text(values),
+                "updated_at": now,
+            }
+        )
+        if len(batch) >= batch_size:
+            _insert_batch(tenant_id, batch)
+            insertadas += len(batch)
+            batch = []
+
+    _insert_batch(tenant_id, batch)
+    insertadas += len(batch)
+
+    return {
+        "resumen": {
+            "filas": filas,
+            "validas": insertadas,
+            "insertadas": 0 if dry_run else insertadas,
+            "errores": len(errores),
+            "dry_run": dry_run,
+        },
+        "errores": errores,
+    }
+
+
+def write_error_report(errores):
+    """Escritor para save_import_report: una línea por fila rechazada."""
+
+    def write(fh):
+        writer = csv.writer(fh)
+        writer.writerow(["fila", "email", "error"])
+        for item in errores:
+            writer.writerow([item["fila"], item["email"], item["error"]])
+
+    return write
@@ -0,0 +1,29 @@
+from sqlalchemy.orm import defer
+
+from ..models import Cliente, db
+from ..utils.search import match_conditions, parse_query, rank_columns
+
+DEFAULT_SEARCH_LIMIT = 10
+MAX_SEARCH_LIMIT = 50
+
+
+def search_clientes(tenant_id, q, limit=DEFAULT_SEARCH_LIMIT) -> list[tuple]:
+    """
+    Búsqueda difusa dentro de un tenant sobre nombre, apellidos, razón social y email
+    (índice GIN (tenant_id, busqueda gin_trgm_ops)).
+    Orden: coincidencia al inicio de una palabra, similitud, nombre.
+    Devuelve [(cliente, score)].
+    """
+    term, tokens = parse_query(q)
+    fuzzy = db.session.get_bind().dialect.name == "postgresql"
+    prefix, score = rank_columns(Cliente.busqueda, term, fuzzy=fuzzy)
+
+    rows = (
+        db.session.query(Cliente, score.label("score"))
+        .options(defer(Cliente.password), defer(Cliente.busqueda))
+        .filter(Cliente.tenant_id == tenant_id, *match_conditions(Cliente.busqueda, tokens, fuzzy=fuzzy))
+        .order_by(prefix.desc(), score.desc(), Cliente.nombre, Cliente.id_cliente)
+        .limit(limit)
+        .all()
+    )
+    return [(cliente, float(score or 0)) for cliente, score in rows]
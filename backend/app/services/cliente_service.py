@@ -0,0 +1,39 @@
+class ClienteError(ValueError):
+    pass
+
+
+def parse_cliente(payload, *, require_password=True) -> dict:
+    """
+    Reglas de alta de cliente (las mismas para la API y para la importación CSV).
+    Devuelve los campos normalizados; password queda en claro (None si no vino).
+    """
+    nombre = (payload.get("nombre") or "").strip()
+    apellido_paterno = (payload.get("apellido_paterno") or "").strip()
+    apellido_materno = (payload.get("apellido_materno") or "").strip()
+    razon_social = (payload.get("razon_social") or "").strip()
+    email = (payload.get("email") or "").strip()
+    password = payload.get("password") or ""
+    es_empresa = payload.get("es_empresa")
+    es_generico = payload.get("es_generico", False)
+
+    required = [nombre, apellido_paterno, apellido_materno, email]
+    if require_password:
+        required.append(password)
+    if not all(required):
+        raise ClienteError("Todos los campos son requeridos")
+    if not isinstance(es_empresa, bool):
+        raise ClienteError("es_empresa debe ser boolean")
+    if es_empresa and not razon_social:
+        raise ClienteError("Razón social requerida")
+    if es_generico is not None and not isinstance(es_generico, bool):
+        raise ClienteError("es_generico debe ser boolean")
+
+    return {
+        "nombre": nombre,
+        "apellido_paterno": apellido_paterno,
+        "apellido_materno": apellido_materno,
+        "razon_social": razon_social or None,
+        "es_generico": bool(es_generico),
+        "email": email,
+        "password": password or None,
+    }
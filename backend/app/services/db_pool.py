@@ -0,0 +1,216 @@
+import threading
+import time
+from collections import deque
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+DEFAULT_PROFILE = "web"
+WAIT_SAMPLES = 1000
+
+# Perfiles de engine por tipo de proceso (DB_PROFILE; sin él, ver default_profile).
+# Cualquier valor se puede sobreescribir por variable de entorno (ver engine_options).
+ENGINE_PROFILES = {
+    # servidor de desarrollo: pocas conexiones
+    "dev": {
+        "pool_size": 2,
+        "max_overflow": 2,
+        "pool_timeout": 10,
+        "pool_recycle": 1800,
+        "pool_pre_ping": True,
+    },
+    # worker web (gunicorn): ráfagas cortas, falla rápido si el pool se agota
+    # LIFO: las conexiones sobrantes quedan ociosas y el recycle las cierra
+    "web": {
+        "pool_size": 5,
+        "max_overflow": 10,
+        "pool_timeout": 5,
+        "pool_recycle": 1800,
+        "pool_pre_ping": True,
+        "pool_use_lifo": True,
+    },
+    # procesos de fondo (mail-worker, CLI): pocas conexiones largas, sin overflow
+    "worker": {
+        "pool_size": 2,
+        "max_overflow": 0,
+        "pool_timeout": 30,
+        "pool_recycle": 3600,
+        "pool_pre_ping": True,
+    },
+}
+
+# variable de entorno -> (opción, conversión)
+_ENV_OVERRIDES = {
+    "DB_POOL_SIZE": ("pool_size", int),
+    "DB_MAX_OVERFLOW": ("max_overflow", int),
+    "DB_POOL_TIMEOUT": ("pool_timeout", float),
+    "DB_POOL_RECYCLE": ("pool_recycle", int),
+    "DB_POOL_PRE_PING": ("pool_pre_ping", lambda v: v == "1"),
+}
+
+# opciones que solo entiende QueuePool (SQLite en memoria usa otro pool)
+_QUEUE_POOL_ONLY = ("pool_size", "max_overflow", "pool_timeout", "pool_use_lifo")
+
+
+def default_profile(commands, argv, environ) -> str:
+    """
+    Perfil cuando DB_PROFILE no viene del entorno: los comandos `flask <comando>` de la
+    app (mail-worker, seed, reindexados...) corren como worker; gunicorn, `flask run`
+    y `flask shell` como web.
+    """
+    # la CLI de flask marca el entorno antes de cargar la app
+    if environ.get("FLASK_RUN_FROM_CLI") == "true" and set(commands) & set(argv[1:]):
+        return "worker"
+    return DEFAULT_PROFILE
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool que mide cuánto espera cada checkout por una conexión libre."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            pool_telemetry.record_timeout()
+            raise
+        finally:
+            pool_telemetry.record_wait(time.perf_counter() - start)
+
+
+def engine_options(profile, database_uri, environ) -> dict:
+    """SQLALCHEMY_ENGINE_OPTIONS para el perfil (+ overrides DB_* del entorno)."""
+    if profile not in ENGINE_PROFILES:
+        raise ValueError(f"DB_PROFILE inválido: {profile} ({', '.join(ENGINE_PROFILES)})")
+    options = dict(ENGINE_PROFILES[profile])
+    for env_name, (option, convert) in _ENV_OVERRIDES.items():
+        raw = environ.get(env_name)
+        if raw not in (None, ""):
+            options[option] = convert(raw)
+
+    url = make_url(database_uri) if database_uri else None
+    if url is not None and url.get_backend_name() == "sqlite":
+        # SQLite (tests/benchmarks locales): tamaño de pool por defecto del dialecto
+        for option in _QUEUE_POOL_ONLY:
+            options.pop(option, None)
+        if url.database in (None, "", ":memory:"):
+            return options  # en memoria: SingletonThreadPool, no QueuePool
+
+    options["poolclass"] = TimedQueuePool
+    return options
+
+
+class PoolTelemetry:
+    """
+    Contadores del pool de ESTE worker, alimentados por eventos del pool de SQLAlchemy.
+    Los gauges (en uso, overflow) se leen del pool al pedir stats().
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._engine = None
+        self.profile = None
+        self._reset()
+
+    def _reset(self):
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.soft_invalidations = 0
+        self.timeouts = 0
+        self.wait_max = 0.0
+        self._waits = deque(maxlen=WAIT_SAMPLES)
+
+    def attach(self, engine, profile=None):
+        """Registra los listeners en el pool del engine (una vez por proceso)."""
+        with self._lock:
+            if self._engine is engine:
+                return
+            self._engine = engine
+            self.profile = profile
+            self._reset()
+        pool = engine.pool
+        event.listen(pool, "connect", self._on_connect)
+        event.listen(pool, "checkout", self._on_checkout)
+        event.listen(pool, "checkin", self._on_checkin)
+        event.listen(pool, "invalidate", self._on_invalidate)
+        event.listen(pool, "soft_invalidate", self._on_soft_invalidate)
+
+    def _on_connect(self, _dbapi_connection, _record):
+        with self._lock:
+            self.connects += 1
+
+    def _on_checkout(self, _dbapi_connection, _record, _proxy):
+        with self._lock:
+            self.checkouts += 1
+
+    def _on_checkin(self, _dbapi_connection, _record):
+        with self._lock:
+            self.checkins += 1
+
+    def _on_invalidate(self, _dbapi_connection, _record, _exception):
+        # pre-ping que encontró la conexión muerta, o error de desconexión
+        with self._lock:
+            self.invalidations += 1
+
+    def _on_soft_invalidate(self, _dbapi_connection, _record, _exception):
+        with self._lock:
+            self.soft_invalidations += 1
+
+    def record_wait(self, seconds):
+        with self._lock:
+            self.wait_max = max(self.wait_max, seconds)
+            self._waits.append(seconds)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def _gauges(self):
+        pool = self._engine.pool if self._engine is not None else None
+        if not isinstance(pool, QueuePool):
+            return {"pool_class": type(pool).__name__ if pool is not None else None}
+        return {
+            "pool_class": type(pool).__name__,
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            # negativo mientras el pool aún no abrió pool_size conexiones
+            "overflow": pool.overflow(),
+            "max_overflow": pool._max_overflow,
+            "timeout_seconds": pool.timeout(),
+        }
+
+    def stats(self):
+        gauges = self._gauges()
+        with self._lock:
+            waits = sorted(self._waits)
+            measured = len(waits)
+
+            def pct(p):
+                return round(waits[min(measured - 1, int(p * measured))] * 1000, 3) if measured else None
+
+            return {
+                "profile": self.profile,
+                **gauges,
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "soft_invalidations": self.soft_invalidations,
+                "timeouts": self.timeouts,
+                "checkout_wait_ms": {
+                    "samples": measured,
+                    "avg": round(sum(waits) / measured * 1000, 3) if measured else None,
+                    "p50": pct(0.50),
+                    "p95": pct(0.95),
+                    "p99": pct(0.99),
+                    "max": round(self.wait_max * 1000, 3),
+                },
+            }
+
+
+pool_telemetry = PoolTelemetry()
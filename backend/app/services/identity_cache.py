@@ -0,0 +1,110 @@
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_MAX_SIZE = 1024
+DEFAULT_TTL_SECONDS = 60
+DEFAULT_RECHECK_SECONDS = 5
+
+
+class IdentityCache:
+    """
+    Caché LRU + TTL por worker para el user_loader de Flask-Login.
+    - clave: el id de sesión "rol:id" (ej. "cliente:42")
+    - valor: snapshot de columnas del usuario (no la instancia ORM)
+    Cada worker tiene su propia copia y invalidate() solo limpia la de este worker.
+    Por eso una entrada con más de `recheck` segundos se revalida contra el
+    updated_at de la fila (1 lectura por PK): en otro worker, un usuario desactivado
+    o editado deja de servirse del caché en a lo sumo `recheck` segundos.
+    """
+
+    def __init__(self, max_size=DEFAULT_MAX_SIZE, ttl=DEFAULT_TTL_SECONDS, recheck=DEFAULT_RECHECK_SECONDS):
+        self._lock = threading.Lock()
+        self._items = OrderedDict()
+        self.max_size = max_size
+        self.ttl = ttl
+        self.recheck = recheck
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.revalidations = 0
+
+    def configure(self, max_size=None, ttl=None, recheck=None):
+        with self._lock:
+            if max_size is not None:
+                self.max_size = max(0, int(max_size))
+            if ttl is not None:
+                self.ttl = max(0, float(ttl))
+            if recheck is not None:
+                self.recheck = max(0, float(recheck))
+            self._items.clear()
+
+    def get(self, key):
+        """(snapshot, revalidar) o None; revalidar=True si pasó `recheck` desde la última verificación."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._items[key]
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return entry[2], now - entry[1] >= self.recheck
+
+    def confirm(self, key):
+        """El snapshot sigue vigente (mismo updated_at que la fila): no revalidar por `recheck` segundos."""
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is not None:
+                entry[1] = time.monotonic()
+                self.revalidations += 1
+
+    def set(self, key, value):
+        if self.max_size <= 0 or self.ttl <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            # [vence_en, verificado_en, snapshot]
+            self._items[key] = [now + self.ttl, now, value]
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            if self._items.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._items),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "recheck_seconds": self.recheck,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "revalidations": self.revalidations,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+identity_cache = IdentityCache()
+
+
+def invalidate_user(user):
+    """
+    Se llama tras cambiar password, estado o datos de perfil de un usuario.
+    Los demás workers lo ven al revalidar (updated_at cambió con el mismo UPDATE).
+    """
+    if user is None:
+        return
+    identity_cache.invalidate(user.get_id())
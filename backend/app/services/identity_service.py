@@ -0,0 +1,77 @@
+from sqlalchemy import func, literal, or_, select, union_all
+
+from ..models import AdminSu, Cliente, Microempresa
+from ..models.auth import ROLE_TYPES
+from ..models.base import db
+
+
+def normalize_identifier(value) -> str:
+    return (value or "").strip().lower()
+
+
+def _identity_select(role, model, id_column, match):
+    return select(
+        literal(role, db.String).label("role"),
+        id_column.label("id"),
+        model.email.label("email"),
+        model.password.label("password"),
+        model.estado.label("estado"),
+    ).where(match)
+
+
+def find_identities(identifier, *, by_name=True, role=None):
+    """
+    Directorio unificado de identidades: resuelve un identificador (email, o nombre
+    de microempresa) contra los tres roles en UNA sola consulta UNION ALL, usando
+    los índices lower(email) / lower(nombre).
+
+    Devuelve filas (role, id, email, password, estado) ordenadas por rol (ROLE_TYPES)
+    y, dentro de microempresa, primero la coincidencia por email.
+    """
+    key = normalize_identifier(identifier)
+    if not key:
+        return []
+
+    micro_match = func.lower(Microempresa.email) == key
+    if by_name:
+        micro_match = or_(micro_match, func.lower(Microempresa.nombre) == key)
+
+    selects = {
+        "super_usuario": _identity_select(
+            "super_usuario", AdminSu, AdminSu.id_su, func.lower(AdminSu.email) == key
+        ),
+        "microempresa": _identity_select(
+            "microempresa", Microempresa, Microempresa.tenant_id, micro_match
+        ),
+        "cliente": _identity_select(
+            "cliente", Cliente, Cliente.id_cliente, func.lower(Cliente.email) == key
+        ),
+    }
+    if role:
+        if role not in selects:
+            return []
+        stmt = selects[role]
+    else:
+        stmt = union_all(*selects.values())
+
+    rows = db.session.execute(stmt).all()
+    return sorted(
+        rows,
+        key=lambda row: (
+            ROLE_TYPES.index(row.role),
+            normalize_identifier(row.email) != key,
+            row.id,
+        ),
+    )
+
+
+def is_active_identity(identity) -> bool:
+    return (identity.estado or "activo") == "activo"
+
+
+def roles_of(identities) -> list[str]:
+    roles = []
+    for identity in identities:
+        if identity.role not in roles:
+            roles.append(identity.role)
+    return roles
@@ -0,0 +1,245 @@
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from sqlalchemy import Boolean, literal_column
+from sqlalchemy.dialects import postgresql, sqlite
+
+from ..models import Producto, db
+from .stock_alerts import emit_changes
+from .stock_ledger import record_movements
+
+ESTADOS_PRODUCTO = {"activo", "inactivo"}
+MAX_BULK_ROWS = 5000
+UPSERT_CHUNK_SIZE = 1000
+UPSERT_ATTEMPTS = 3
+
+# campos opcionales: en el upsert solo se sobrescriben si vienen en la fila
+OPTIONAL_FIELDS = ("descripcion", "stock", "stock_minimo", "estado")
+DEFAULTS = {"descripcion": None, "stock": 0, "stock_minimo": 0, "estado": "activo"}
+
+
+class ProductoError(ValueError):
+    pass
+
+
+def _text(payload, field, max_len, required):
+    value = payload.get(field)
+    if value is None:
+        if required:
+            raise ProductoError(f"{field} requerido")
+        return None
+    value = str(value).strip()
+    if required and not value:
+        raise ProductoError(f"{field} requerido")
+    if len(value) > max_len:
+        raise ProductoError(f"{field} demasiado largo")
+    return value
+
+
+def _price(value):
+    try:
+        price = Decimal(str(value))
+    except (InvalidOperation, ValueError):
+        raise ProductoError("precio_unitario inválido")
+    if not price.is_finite() or price < 0:
+        raise ProductoError("precio_unitario inválido")
+    return price.quantize(Decimal("0.01"))
+
+
+def _quantity(field, value):
+    # bool es int en Python; 2.5 no es una cantidad
+    if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+        raise ProductoError(f"{field} inválido")
+    try:
+        quantity = int(value.strip()) if isinstance(value, str) else int(value)
+    except (TypeError, ValueError):
+        raise ProductoError(f"{field} inválido")
+    if quantity < 0:
+        raise ProductoError(f"{field} inválido")
+    return quantity
+
+
+def parse_producto(payload, *, partial=False) -> dict:
+    """
+    Valida un producto del payload y devuelve solo los campos presentes.
+    - partial=False (alta / upsert): codigo, nombre y precio_unitario requeridos
+    - partial=True (PUT): todo opcional, pero lo que venga debe ser válido
+    """
+    if not isinstance(payload, dict):
+        raise ProductoError("Producto inválido")
+
+    values = {}
+    for field, max_len in (("codigo", 64), ("nombre", 150)):
+        if not partial or field in payload:
+            values[field] = _text(payload, field, max_len, required=True)
+
+    if "descripcion" in payload:
+        descripcion = payload["descripcion"]
+        values["descripcion"] = (str(descripcion).strip() or None) if descripcion is not None else None
+
+    if "precio_unitario" in payload or not partial:
+        if payload.get("precio_unitario") in (None, ""):
+            raise ProductoError("precio_unitario requerido")
+        values["precio_unitario"] = _price(payload["precio_unitario"])
+
+    for field in ("stock", "stock_minimo"):
+        if field in payload:
+            values[field] = _quantity(field, payload[field])
+
+    if "estado" in payload:
+        estado = str(payload["estado"] or "").strip().lower()
+        if estado not in ESTADOS_PRODUCTO:
+            raise ProductoError("estado inválido")
+        values["estado"] = estado
+
+    return values
+
+
+def _insert_for_dialect():
+    name = db.session.get_bind().dialect.name
+    if name == "postgresql":
+        return postgresql.insert
+    if name == "sqlite":
+        return sqlite.insert
+    raise ProductoError("Upsert masivo no soportado en esta base de datos")
+
+
+def _existing_rows(tenant_id, codigos, fields) -> dict:
+    """{codigo: (stock, stock_minimo, estado)} de los productos que ya existen en el chunk."""
+    existing_q = db.session.query(Producto.codigo, Producto.stock, Producto.stock_minimo, Producto.estado).filter(
+        Producto.tenant_id == tenant_id, Producto.codigo.in_(codigos)
+    )
+    if {"stock", "stock_minimo", "estado"} & set(fields):
+        # el estado anterior fija el delta del libro y las alertas: nadie lo cambia hasta el commit
+        existing_q = existing_q.with_for_update()
+    return {row.codigo: (row.stock, row.stock_minimo, row.estado) for row in existing_q}
+
+
+def _upsert_chunk(insert, tenant_id, entries, fields):
+    """
+    Un solo INSERT ... ON CONFLICT (tenant_id, codigo) DO UPDATE por chunk.
+    `fields` son los opcionales presentes en estas filas (el resto no se pisa).
+    Devuelve {codigo: (id_producto, creado)}.
+    """
+    codigos = [values["codigo"] for _fila, values in entries]
+    postgres = db.session.get_bind().dialect.name == "postgresql"
+
+    now = datetime.utcnow()
+    rows = [
+        {**DEFAULTS, **values, "tenant_id": tenant_id, "updated_at": now}
+        for _fila, values in entries
+    ]
+
+    stmt = insert(Producto).values(rows)
+    update_columns = ("nombre", "precio_unitario") + tuple(fields)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Producto.tenant_id, Producto.codigo],
+        set_={**{col: stmt.excluded[col] for col in update_columns}, "updated_at": now},
+    )
+    if postgres:
+        # xmax = 0 solo en las filas que esta sentencia insertó (no en las del DO UPDATE)
+        stmt = stmt.returning(
+            Producto.id_producto, Producto.codigo, literal_column("xmax = 0", Boolean).label("insertado")
+        )
+    else:
+        stmt = stmt.returning(Producto.id_producto, Producto.codigo)
+
+    for _attempt in range(UPSERT_ATTEMPTS):
+        savepoint = db.session.begin_nested() if postgres else None
+        existing = _existing_rows(tenant_id, codigos, fields)
+        if postgres:
+            written = {
+                codigo: (id_producto, insertado)
+                for id_producto, codigo, insertado in db.session.execute(stmt)
+            }
+        else:
+            # SQLite serializa las escrituras: el SELECT previo basta
+            written = {
+                codigo: (id_producto, codigo not in existing)
+                for id_producto, codigo in db.session.execute(stmt)
+            }
+        # un "actualizado" que no salió en el SELECT lo insertó otra transacción en medio:
+        # su stock anterior no se conoce, se deshace el chunk y se repite con esa fila bloqueada
+        if all(creado or codigo in existing for codigo, (_id, creado) in written.items()):
+            break
+        savepoint.rollback()
+    else:
+        raise ProductoError("Productos modificados en paralelo; reintenta la carga")
+    if savepoint is not None:
+        savepoint.commit()
+
+    # libro de stock: alta con stock inicial o cambio absoluto de stock
+    movimientos = []
+    for _fila, values in entries:
+        id_producto, creado = written[values["codigo"]]
+        nuevo = values.get("stock", 0) if creado else values.get("stock")
+        if nuevo is None:
+            continue
+        delta = nuevo - (0 if creado else existing[values["codigo"]][0])
+        if delta:
+            movimientos.append(
+                {"tenant_id": tenant_id, "id_producto": id_producto, "tipo": "entrada" if creado else "ajuste",
+                 "cantidad": delta, "nota": "stock inicial" if creado else "carga masiva"}
+            )
+    record_movements(movimientos, alertas=False)
+    # alertas por stock, stock_minimo o estado (None = alta: solo si nace con stock bajo)
+    emit_changes({
+        id_producto: None if creado else existing[codigo] for codigo, (id_producto, creado) in written.items()
+    })
+    return written
+
+
+def bulk_upsert_productos(tenant_id, items) -> dict:
+    """
+    Upsert masivo por clave natural (tenant_id, codigo), set-based y sin commit.
+    Devuelve un resultado compacto por fila:
+    - resultados: [fila, codigo, id_producto, "creado" | "actualizado"]
+    - errores: {"fila", "codigo", "error"} (esas filas no se escriben)
+    """
+    if not isinstance(items, list) or not items:
+        raise ProductoError("productos debe ser una lista no vacía")
+    if len(items) > MAX_BULK_ROWS:
+        raise ProductoError(f"Máximo {MAX_BULK_ROWS} productos por request")
+
+    insert = _insert_for_dialect()
+
+    errores = []
+    seen = set()
+    groups = {}
+    for fila, payload in enumerate(items):
+        try:
+            values = parse_producto(payload)
+        except ProductoError as exc:
+            codigo = payload.get("codigo") if isinstance(payload, dict) else None
+            errores.append({"fila": fila, "codigo": codigo, "error": str(exc)})
+            continue
+        # Postgres no deja que un mismo INSERT toque dos veces la misma fila
+        if values["codigo"] in seen:
+            errores.append({"fila": fila, "codigo": values["codigo"], "error": "codigo repetido en el lote"})
+            continue
+        seen.add(values["codigo"])
+        # filas con los mismos campos opcionales comparten sentencia
+        fields = tuple(field for field in OPTIONAL_FIELDS if field in values)
+        groups.setdefault(fields, []).append((fila, values))
+
+    resultados = []
+    for fields, entries in groups.items():
+        for start in range(0, len(entries), UPSERT_CHUNK_SIZE):
+            chunk = entries[start:start + UPSERT_CHUNK_SIZE]
+            written = _upsert_chunk(insert, tenant_id, chunk, fields)
+            for fila, values in chunk:
+                id_producto, creado = written[values["codigo"]]
+                resultados.append([fila, values["codigo"], id_producto, "creado" if creado else "actualizado"])
+
+    resultados.sort(key=lambda item: item[0])
+    creados = sum(1 for item in resultados if item[3] == "creado")
+    return {
+        "resumen": {
+            "recibidos": len(items),
+            "creados": creados,
+            "actualizados": len(resultados) - creados,
+            "errores": len(errores),
+        },
+        "resultados": resultados,
+        "errores": errores,
+    }
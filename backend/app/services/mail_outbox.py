@@ -0,0 +1,159 @@
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import delete
+
+from ..models import MailOutbox, db
+from .mail_service import send_email
+
+DEFAULT_MAX_ATTEMPTS = 6
+DEFAULT_BACKOFF_SECONDS = 30
+MAX_BACKOFF_SECONDS = 3600
+DEFAULT_BATCH_SIZE = 20
+DEFAULT_RETENTION_DAYS = 7
+PURGE_EVERY_SECONDS = 3600
+
+_thread_lock = threading.Lock()
+# {"stop": Event} del sender embebido de este proceso
+_thread = {}
+
+
+def enqueue_email(to_email: str, subject: str, text_body: str) -> MailOutbox:
+    """
+    Agrega el correo al outbox en la transacción ACTUAL (no hace commit):
+    si el request hace rollback, el correo tampoco se envía.
+    """
+    mail = MailOutbox(to_email=to_email, subject=subject, body=text_body)
+    db.session.add(mail)
+    return mail
+
+
+def _backoff(attempts: int) -> timedelta:
+    base = int(current_app.config.get("MAIL_OUTBOX_BACKOFF_SECONDS", DEFAULT_BACKOFF_SECONDS))
+    delay = min(base * (2 ** max(attempts - 1, 0)), MAX_BACKOFF_SECONDS)
+    # jitter para que los reintentos de una caída del relay no lleguen todos juntos
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+def _claim_next(now):
+    # FOR UPDATE SKIP LOCKED (Postgres): varios senders pueden correr a la vez
+    # sin tomar la misma fila; el lock dura hasta el commit de ESE correo
+    return (
+        MailOutbox.query
+        .filter(MailOutbox.estado == "pendiente", MailOutbox.next_attempt_at <= now)
+        .order_by(MailOutbox.next_attempt_at, MailOutbox.id_mail)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .first()
+    )
+
+
+def _finish(mail, estado):
+    mail.estado = estado
+    # el cuerpo puede llevar secretos (token de recuperación): no queda guardado
+    # una vez que el correo ya no se va a reenviar
+    mail.body = ""
+
+
+def drain_outbox(batch_size=DEFAULT_BATCH_SIZE, send=send_email) -> dict:
+    """
+    Envía hasta batch_size correos pendientes y vencidos, uno por transacción:
+    cada correo se marca y se hace commit apenas sale por SMTP, así un commit
+    fallido reenvía a lo sumo ese correo y no el lote entero.
+    """
+    max_attempts = int(current_app.config.get("MAIL_OUTBOX_MAX_ATTEMPTS", DEFAULT_MAX_ATTEMPTS))
+
+    result = {"enviados": 0, "reintentos": 0, "fallidos": 0}
+    for _ in range(batch_size):
+        mail = _claim_next(datetime.utcnow())
+        if mail is None:
+            db.session.rollback()
+            break
+
+        mail.intentos += 1
+        try:
+            send(mail.to_email, mail.subject, mail.body)
+        except Exception as exc:
+            mail.last_error = str(exc)[:1000]
+            if mail.intentos >= max_attempts:
+                _finish(mail, "fallido")
+                result["fallidos"] += 1
+                current_app.logger.error("Correo %s descartado tras %s intentos", mail.id_mail, mail.intentos)
+            else:
+                mail.next_attempt_at = datetime.utcnow() + _backoff(mail.intentos)
+                result["reintentos"] += 1
+        else:
+            _finish(mail, "enviado")
+            mail.sent_at = datetime.utcnow()
+            mail.last_error = None
+            result["enviados"] += 1
+        db.session.commit()
+
+    return result
+
+
+def purge_outbox(retention_days=DEFAULT_RETENTION_DAYS) -> int:
+    """Borra los correos enviados/fallidos más viejos que retention_days (sin commit)."""
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    return db.session.execute(
+        delete(MailOutbox)
+        .where(MailOutbox.estado.in_(("enviado", "fallido")), MailOutbox.created_at < cutoff)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+
+def run_outbox_worker(app, poll_interval=None, stop_event=None, initial_delay=0):
+    """Bucle del sender: drena hasta vaciar y luego espera poll_interval segundos."""
+    interval = float(poll_interval or app.config.get("MAIL_OUTBOX_POLL_SECONDS", 5))
+    stop_event = stop_event or threading.Event()
+    # el hilo embebido espera un poco: create_app() suele ir antes de db.create_all()
+    stop_event.wait(initial_delay)
+    retention = int(app.config.get("MAIL_OUTBOX_RETENTION_DAYS", DEFAULT_RETENTION_DAYS))
+    next_purge = 0.0
+    while not stop_event.is_set():
+        try:
+            with app.app_context():
+                result = drain_outbox()
+                if time.monotonic() >= next_purge:
+                    purged = purge_outbox(retention)
+                    db.session.commit()
+                    next_purge = time.monotonic() + PURGE_EVERY_SECONDS
+                    if purged:
+                        app.logger.info("Outbox: %s correos viejos borrados", purged)
+        except Exception:
+            app.logger.exception("Error drenando el outbox de correos")
+            result = None
+        # si el lote vino lleno, seguimos sin esperar
+        if result and sum(result.values()) >= DEFAULT_BATCH_SIZE:
+            continue
+        stop_event.wait(interval)
+
+
+def start_outbox_thread(app) -> threading.Event:
+    """Arranca el sender embebido una sola vez por proceso (se llama en cada request)."""
+    if "stop" in _thread:
+        return _thread["stop"]
+    with _thread_lock:
+        if "stop" not in _thread:
+            _thread["stop"] = _start_thread(app)
+        return _thread["stop"]
+
+
+def _start_thread(app) -> threading.Event:
+    stop_event = threading.Event()
+    thread = threading.Thread(
+        target=run_outbox_worker,
+        args=(app,),
+        kwargs={
+            "stop_event": stop_event,
+            "initial_delay": app.config.get("MAIL_OUTBOX_POLL_SECONDS", 5),
+        },
+        name="mail-outbox",
+        daemon=True,
+    )
+    thread.start()
+    return stop_event
+
@@ -1,29 +1,152 @@
 import smtplib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from email.message import EmailMessage
 from flask import current_app
 
+DEFAULT_BULK_CONNECTIONS = 3
+DEFAULT_MESSAGES_PER_CONNECTION = 100
 
-def send_email(to_email: str, subject: str, text_body: str) -> None:
-    host = current_app.config.get("MAIL_HOST")
-    port = int(current_app.config.get("MAIL_PORT", 587))
-    use_tls = str(current_app.config.get("MAIL_USE_TLS", "1")).lower() in ("1", "true", "yes")
+
+def smtp_settings() -> dict:
+    """Lee la config de correo UNA vez (los hilos del envío masivo no tienen app context)."""
     user = current_app.config.get("MAIL_USER")
-    password = current_app.config.get("MAIL_PASS")
-    mail_from = current_app.config.get("MAIL_FROM") or user
+    return {
+        "host": current_app.config.get("MAIL_HOST"),
+        "port": int(current_app.config.get("MAIL_PORT", 587)),
+        "use_tls": str(current_app.config.get("MAIL_USE_TLS", "1")).lower() in ("1", "true", "yes"),
+        "user": user,
+        "password": current_app.config.get("MAIL_PASS"),
+        "mail_from": current_app.config.get("MAIL_FROM") or user or "no-reply@localhost",
+    }
 
-    if not host or not user or not password:
+
+def _open_connection(settings: dict) -> smtplib.SMTP:
+    if not settings["host"]:
         raise RuntimeError("Configuración de correo incompleta. Revisa MAIL_HOST/MAIL_USER/MAIL_PASS")
 
+    server = smtplib.SMTP(settings["host"], settings["port"], timeout=30)
+    try:
+        server.ehlo()
+        if settings["use_tls"]:
+            server.starttls()
+            server.ehlo()
+        # relays locales (ej. un sink aiosmtpd en pruebas) no piden autenticación
+        if settings["user"] and settings["password"]:
+            server.login(settings["user"], settings["password"])
+    except Exception:
+        server.close()
+        raise
+    return server
+
+
+def _build_message(settings: dict, to_email: str, subject: str, text_body: str) -> EmailMessage:
     msg = EmailMessage()
     msg["Subject"] = subject
-    msg["From"] = mail_from
+    msg["From"] = settings["mail_from"]
     msg["To"] = to_email
     msg.set_content(text_body)
+    return msg
 
-    with smtplib.SMTP(host, port) as server:
-        server.ehlo()
-        if use_tls:
-            server.starttls()
-            server.ehlo()
-        server.login(user, password)
-        server.send_message(msg)
+
+def send_email(to_email: str, subject: str, text_body: str) -> None:
+    settings = smtp_settings()
+    server = _open_connection(settings)
+    with server:
+        server.send_message(_build_message(settings, to_email, subject, text_body))
+
+
+class SMTPConnectionPool:
+    """
+    Pool pequeño de conexiones SMTP ya autenticadas.
+    - Cada conexión se reutiliza para muchos mensajes (un solo connect/STARTTLS/login)
+    - Se recicla tras `max_messages` envíos (los relays suelen cortar sesiones largas)
+    """
+
+    def __init__(self, settings: dict, size=DEFAULT_BULK_CONNECTIONS, max_messages=DEFAULT_MESSAGES_PER_CONNECTION):
+        self.settings = settings
+        self.size = max(1, int(size))
+        self.max_messages = max(1, int(max_messages))
+        self._idle = []
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+
+    def acquire(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        server = _open_connection(self.settings)
+        with self._lock:
+            self.connections_opened += 1
+        return [server, 0]
+
+    def release(self, conn):
+        if conn[1] >= self.max_messages:
+            self.discard(conn)
+            return
+        with self._lock:
+            self._idle.append(conn)
+
+    def discard(self, conn):
+        try:
+            conn[0].quit()
+        except (smtplib.SMTPException, OSError):
+            conn[0].close()
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            self.discard(conn)
+
+
+def _send_pooled(pool: SMTPConnectionPool, to_email: str, subject: str, text_body: str) -> dict:
+    msg = _build_message(pool.settings, to_email, subject, text_body)
+    # un reintento con conexión nueva si el relay cortó la sesión
+    for attempt in range(2):
+        try:
+            conn = pool.acquire()
+        except (smtplib.SMTPException, OSError) as exc:
+            if attempt:
+                return {"to": to_email, "ok": False, "error": str(exc)}
+            continue
+        try:
+            conn[0].send_message(msg)
+        except smtplib.SMTPRecipientsRefused as exc:
+            # error del destinatario: la conexión sigue sirviendo
+            pool.release(conn)
+            return {"to": to_email, "ok": False, "error": str(exc.recipients.get(to_email, exc))}
+        except (smtplib.SMTPServerDisconnected, smtplib.SMTPException, OSError) as exc:
+            pool.discard(conn)
+            if attempt:
+                return {"to": to_email, "ok": False, "error": str(exc)}
+            continue
+        conn[1] += 1
+        pool.release(conn)
+        return {"to": to_email, "ok": True, "error": None}
+    return {"to": to_email, "ok": False, "error": "No se pudo enviar"}
+
+
+def send_bulk(messages, connections=None, messages_per_connection=None) -> list[dict]:
+    """
+    Envío masivo: messages es una lista de (to_email, subject, text_body).
+    Reparte los mensajes entre `connections` conexiones SMTP reutilizables y
+    devuelve un resultado por destinatario ({"to", "ok", "error"}), en el mismo orden.
+    """
+    settings = smtp_settings()
+    size = int(connections or current_app.config.get("MAIL_BULK_CONNECTIONS", DEFAULT_BULK_CONNECTIONS))
+    per_conn = int(
+        messages_per_connection
+        or current_app.config.get("MAIL_BULK_MESSAGES_PER_CONNECTION", DEFAULT_MESSAGES_PER_CONNECTION)
+    )
+
+    pool = SMTPConnectionPool(settings, size=size, max_messages=per_conn)
+    try:
+        with ThreadPoolExecutor(max_workers=pool.size, thread_name_prefix="smtp-bulk") as executor:
+            futures = [
+                executor.submit(_send_pooled, pool, to_email, subject, body)
+                for to_email, subject, body in messages
+            ]
+            return [future.result() for future in futures]
+    finally:
+        pool.close()
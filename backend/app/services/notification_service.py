@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import aliased
+
+from ..models import Microempresa, Plan, Suscripcion, db
+from .mail_service import send_bulk
+
+
+def expiring_subscription_messages(days: int) -> list[tuple[str, str, str]]:
+    now = datetime.utcnow()
+    limit = now + timedelta(days=days)
+
+    # solo la última suscripción activa de cada tenant: si ya renovó (otra activa que
+    # vence después) no se le avisa, y con varias activas recibe un solo correo
+    later = aliased(Suscripcion)
+    renewed = (
+        db.session.query(later.id_suscripcion)
+        .filter(
+            later.tenant_id == Suscripcion.tenant_id,
+            later.estado == "activa",
+            or_(
+                later.fecha_fin > Suscripcion.fecha_fin,
+                and_(
+                    later.fecha_fin == Suscripcion.fecha_fin,
+                    later.id_suscripcion > Suscripcion.id_suscripcion,
+                ),
+            ),
+        )
+        .exists()
+    )
+
+    rows = (
+        db.session.query(Microempresa.email, Microempresa.nombre, Plan.nombre, Suscripcion.fecha_fin)
+        .join(Suscripcion, Suscripcion.tenant_id == Microempresa.tenant_id)
+        .join(Plan, Plan.id_plan == Suscripcion.id_plan)
+        .filter(
+            Microempresa.estado == "activo",
+            Suscripcion.estado == "activa",
+            Suscripcion.fecha_fin >= now,
+            Suscripcion.fecha_fin <= limit,
+            ~renewed,
+        )
+        .order_by(Suscripcion.fecha_fin)
+        .yield_per(500)
+    )
+
+    subject = "Tu suscripción está por vencer - Microempresa SaaS"
+    return [
+        (
+            email,
+            subject,
+            (
+                f"Hola {nombre},\n\n"
+                f"Tu plan {plan_nombre} vence el {fecha_fin:%d/%m/%Y}.\n"
+                "Renueva a tiempo para no perder el acceso.\n\n"
+                "Equipo Microempresa SaaS"
+            ),
+        )
+        for email, nombre, plan_nombre, fecha_fin in rows
+    ]
+
+
+def active_tenant_messages(subject: str, body: str) -> list[tuple[str, str, str]]:
+    rows = (
+        db.session.query(Microempresa.email)
+        .filter(Microempresa.estado == "activo")
+        .order_by(Microempresa.tenant_id)
+        .yield_per(500)
+    )
+    return [(email, subject, body) for (email,) in rows]
+
+
+def notify_expiring_subscriptions(days: int = 7) -> list[dict]:
+    return send_bulk(expiring_subscription_messages(days))
+
+
+def notify_active_tenants(subject: str, body: str) -> list[dict]:
+    return send_bulk(active_tenant_messages(subject, body))
@@ -0,0 +1,159 @@
+import base64
+import hashlib
+import hmac
+import os
+import re
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+SCHEME = "scrypt"
+SALT_BYTES = 16
+KEY_BYTES = 32
+
+DEFAULT_LOG2_N = 14
+DEFAULT_R = 8
+DEFAULT_P = 1
+DEFAULT_TARGET_MS = 100
+DEFAULT_MAX_LOG2_N = 17
+DEFAULT_QUEUE_TIMEOUT = 5.0
+
+# hashes previos: SHA-256 sin sal en hex
+_LEGACY_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+class PasswordHasherBusy(RuntimeError):
+    pass
+
+
+def _b64(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _unb64(value: str) -> bytes:
+    return base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+
+
+def _scrypt(password: bytes, salt: bytes, n: int, r: int, p: int) -> bytes:
+    # maxmem holgado: scrypt usa ~128 * r * n bytes
+    return hashlib.scrypt(
+        password, salt=salt, n=n, r=r, p=p, maxmem=256 * r * n, dklen=KEY_BYTES
+    )
+
+
+def is_legacy_hash(stored) -> bool:
+    return bool(stored) and bool(_LEGACY_RE.match(stored))
+
+
+def _parse(stored):
+    try:
+        scheme, n, r, p, salt, digest = stored.split("$")
+        if scheme != SCHEME:
+            return None
+        return int(n), int(r), int(p), _unb64(salt), _unb64(digest)
+    except (AttributeError, ValueError):
+        return None
+
+
+class PasswordHasher:
+    """
+    Hash de contraseñas con scrypt (memory-hard) ejecutado en un pool acotado:
+    - como mucho `workers` hashes a la vez por worker del servidor
+    - si la cola no avanza en `queue_timeout` segundos -> PasswordHasherBusy (503)
+    El costo (n) se fija por configuración o con calibrate() al arrancar.
+    """
+
+    def __init__(self):
+        self.n = 1 << DEFAULT_LOG2_N
+        self.r = DEFAULT_R
+        self.p = DEFAULT_P
+        self.queue_timeout = DEFAULT_QUEUE_TIMEOUT
+        self._lock = threading.Lock()
+        self._executor = None
+        self._slots = None
+        self.workers = 0
+        self.configure(workers=min(4, os.cpu_count() or 1))
+
+    def configure(self, *, n=None, r=None, p=None, workers=None, queue_timeout=None):
+        with self._lock:
+            if n is not None:
+                self.n = int(n)
+            if r is not None:
+                self.r = int(r)
+            if p is not None:
+                self.p = int(p)
+            if queue_timeout is not None:
+                self.queue_timeout = float(queue_timeout)
+            if workers is not None and int(workers) != self.workers:
+                old = self._executor
+                self.workers = max(1, int(workers))
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="password-hasher"
+                )
+                # en ejecución + en espera: como mucho 4 por hilo
+                self._slots = threading.BoundedSemaphore(self.workers * 4)
+                if old is not None:
+                    old.shutdown(wait=False)
+
+    def calibrate(self, target_ms=DEFAULT_TARGET_MS, max_log2_n=DEFAULT_MAX_LOG2_N):
+        """
+        Sube n (potencias de 2) hasta que un hash tarde al menos target_ms en esta
+        máquina, sin pasar de 2**max_log2_n. Devuelve (n, ms del último intento).
+        """
+        salt = secrets.token_bytes(SALT_BYTES)
+        elapsed_ms = 0.0
+        n = 1 << DEFAULT_LOG2_N
+        for log2_n in range(DEFAULT_LOG2_N, max_log2_n + 1):
+            n = 1 << log2_n
+            start = time.perf_counter()
+            _scrypt(b"calibration", salt, n, self.r, self.p)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            if elapsed_ms >= target_ms:
+                break
+        self.configure(n=n)
+        return n, elapsed_ms
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise PasswordHasherBusy("Demasiados hashes de contraseña en curso")
+        try:
+            future = self._executor.submit(fn, *args)
+            return future.result()
+        finally:
+            self._slots.release()
+
+    def _hash_sync(self, password: str) -> str:
+        salt = secrets.token_bytes(SALT_BYTES)
+        digest = _scrypt(password.encode("utf-8"), salt, self.n, self.r, self.p)
+        return f"{SCHEME}${self.n}${self.r}${self.p}${_b64(salt)}${_b64(digest)}"
+
+    def hash(self, password: str) -> str:
+        return self._run(self._hash_sync, password)
+
+    def verify(self, password: str, stored) -> bool:
+        if not stored or password is None:
+            return False
+        if is_legacy_hash(stored):
+            legacy = hashlib.sha256(password.encode("utf-8")).hexdigest()
+            return hmac.compare_digest(legacy, stored)
+
+        parsed = _parse(stored)
+        if not parsed:
+            return False
+        n, r, p, salt, digest = parsed
+        computed = self._run(_scrypt, password.encode("utf-8"), salt, n, r, p)
+        return hmac.compare_digest(computed, digest)
+
+    def needs_rehash(self, stored) -> bool:
+        if is_legacy_hash(stored):
+            return True
+        parsed = _parse(stored)
+        if not parsed:
+            return False
+        n, r, p, _salt, _digest = parsed
+        # solo se "sube" el costo: workers calibrados distinto no se re-hashean entre sí
+        return n < self.n or r < self.r or p < self.p
+
+
+password_hasher = PasswordHasher()
@@ -7,6 +7,8 @@ from flask import current_app
 from ..models import AdminSu, Cliente, Microempresa, db
 from ..models.password_reset import PasswordResetToken
 from .auth_service import hash_password
+from .identity_cache import invalidate_user
+from .identity_service import find_identities, roles_of
 
 ROLE_MODELS = {
     "super_usuario": AdminSu,
@@ -21,14 +23,10 @@ def _hash_token(raw_token: str) -> str:
 
 
 def roles_for_email(email: str) -> list[str]:
-    roles = []
-    for role, model in ROLE_MODELS.items():
-        if model.query.filter_by(email=email).first():
-            roles.append(role)
-    return roles
+    return roles_of(find_identities(email, by_name=False))
 
 
-def create_reset_token(email: str, role: str) -> tuple[str, PasswordResetToken]:
+def create_reset_token(email: str, role: str, commit: bool = True) -> tuple[str, PasswordResetToken]:
     raw_token = secrets.token_urlsafe(24)
     token_hash = _hash_token(raw_token)
 
@@ -42,7 +40,8 @@ def create_reset_token(email: str, role: str) -> tuple[str, PasswordResetToken]:
         expires_at=expires_at,
     )
     db.session.add(record)
-    db.session.commit()
+    if commit:
+        db.session.commit()
     return raw_token, record
 
 
@@ -66,7 +65,8 @@ def reset_password(email: str, role: str, raw_token: str, new_password: str) ->
     if not model:
         return False, "Rol inválido", 400
 
-    user = model.query.filter_by(email=email).first()
+    identities = find_identities(email, by_name=False, role=role)
+    user = db.session.get(model, identities[0].id) if identities else None
     if not user:
         return False, "No existe ninguna cuenta con ese correo", 404
 
@@ -77,4 +77,5 @@ def reset_password(email: str, role: str, raw_token: str, new_password: str) ->
     user.password = hash_password(new_password)
     record.used_at = datetime.utcnow()
     db.session.commit()
+    invalidate_user(user)
     return True, "Contraseña actualizada correctamente", 200
@@ -0,0 +1,91 @@
+import hashlib
+import threading
+import time
+
+from flask import Response, current_app, request
+from sqlalchemy import update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from ..models import CacheVersion, Plan, db
+
+CATALOG_NAME = "plan_catalog"
+DEFAULT_RECHECK_SECONDS = 5
+
+_lock = threading.Lock()
+# {"version": int, "checked_at": float, "bodies": {key: (bytes, etag)}}
+_cache = {}
+
+
+def bump_catalog_version():
+    """Llamar dentro de la transacción que modifica planes (antes del commit)."""
+    name = db.session.get_bind().dialect.name
+    if name in ("postgresql", "sqlite"):
+        # upsert atómico: dos primeras escrituras concurrentes no chocan en la PK
+        dialect_insert = postgresql.insert if name == "postgresql" else sqlite.insert
+        stmt = dialect_insert(CacheVersion).values(nombre=CATALOG_NAME, version=1)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[CacheVersion.nombre],
+            set_={"version": CacheVersion.version + 1},
+        )
+        db.session.execute(stmt)
+        return
+
+    updated = db.session.execute(
+        update(CacheVersion)
+        .where(CacheVersion.nombre == CATALOG_NAME)
+        .values(version=CacheVersion.version + 1)
+    ).rowcount
+    if not updated:
+        db.session.add(CacheVersion(nombre=CATALOG_NAME, version=1))
+
+
+def invalidate_plan_catalog():
+    """Llamar después del commit: este worker reconstruye en el próximo request."""
+    with _lock:
+        _cache.clear()
+
+
+def _current_version() -> int:
+    row = db.session.get(CacheVersion, CATALOG_NAME)
+    return row.version if row else 0
+
+
+def _build(version: int) -> dict:
+    plans = Plan.query.filter_by(estado="activo").order_by(Plan.precio.asc()).all()
+    items = [p.to_dict() for p in plans]
+    bodies = {}
+    for key in ("plans", "planes"):
+        body = current_app.json.dumps({key: items}).encode("utf-8")
+        digest = hashlib.sha256(body).hexdigest()[:16]
+        bodies[key] = (body, f"{CATALOG_NAME}-v{version}-{digest}")
+    return bodies
+
+
+def _catalog_bodies() -> dict:
+    recheck = float(current_app.config.get("PLAN_CATALOG_RECHECK_SECONDS", DEFAULT_RECHECK_SECONDS))
+    now = time.monotonic()
+
+    with _lock:
+        if _cache and now - _cache["checked_at"] < recheck:
+            return _cache["bodies"]
+
+    # cada `recheck` segundos: 1 lectura por PK para ver si otro worker cambió el catálogo
+    version = _current_version()
+    with _lock:
+        if _cache and _cache["version"] == version:
+            _cache["checked_at"] = now
+            return _cache["bodies"]
+
+    bodies = _build(version)
+    with _lock:
+        _cache.update(version=version, checked_at=now, bodies=bodies)
+    return bodies
+
+
+def catalog_response(key: str) -> Response:
+    """Respuesta del catálogo público con ETag fuerte; If-None-Match -> 304."""
+    body, etag = _catalog_bodies()[key]
+    response = Response(body, mimetype="application/json")
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "public, no-cache"
+    return response.make_conditional(request)
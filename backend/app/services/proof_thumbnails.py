@@ -0,0 +1,200 @@
+import hashlib
+import importlib.util
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from flask import current_app
+
+from .storage_service import proof_etag, proof_file
+
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_PX = 320
+DEFAULT_WAIT_SECONDS = 5.0
+JPEG_QUALITY = 75
+MAX_FAILED = 1024
+
+THUMB_DIR = "comprobantes/thumbs"
+
+# dependencias opcionales: sin Pillow no hay miniaturas; sin pypdfium2, no de PDFs
+HAS_PIL = importlib.util.find_spec("PIL") is not None
+HAS_PDFIUM = importlib.util.find_spec("pypdfium2") is not None
+
+logger = logging.getLogger(__name__)
+
+
+def _render_thumbnail(src, dest, max_px):
+    """Corre en el proceso hijo: miniatura JPEG de una imagen o de la 1ra página de un PDF."""
+    from PIL import Image, ImageOps
+
+    if src.lower().endswith(".pdf"):
+        import pypdfium2 as pdfium
+
+        pdf = pdfium.PdfDocument(src)
+        try:
+            page = pdf[0]
+            # render a la escala justa (1.0 = 72 dpi) en vez de rasterizar la página completa
+            scale = min(2.0, max_px / max(page.get_size()))
+            image = page.render(scale=scale).to_pil()
+        finally:
+            pdf.close()
+    else:
+        image = Image.open(src)
+        # JPEG: el decoder ya entrega la imagen reducida (mucho menos memoria y CPU)
+        image.draft("RGB", (max_px, max_px))
+        image = ImageOps.exif_transpose(image)
+
+    image.thumbnail((max_px, max_px))
+    if image.mode != "RGB":
+        # PNG con transparencia: fondo blanco en vez de negro
+        background = Image.new("RGB", image.size, "white")
+        rgba = image.convert("RGBA")
+        background.paste(rgba, mask=rgba.getchannel("A"))
+        image = background
+
+    tmp = f"{dest}.{os.getpid()}.part"
+    image.save(tmp, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+    os.replace(tmp, dest)
+    return dest
+
+
+class ProofThumbnails:
+    """
+    Miniaturas de comprobantes para la cola de revisión.
+    - se generan una sola vez, en un pool de procesos (fuera del hilo del request)
+    - quedan en disco junto a los comprobantes, nombradas por el hash del comprobante
+    - las generaciones en curso se comparten: el mismo comprobante no se procesa dos veces
+    """
+
+    def __init__(self):
+        # reentrante: add_done_callback corre el callback en el acto si el future ya terminó
+        self._lock = threading.RLock()
+        self._executor = None
+        self._pending = {}
+        self._failed = set()
+        self.workers = DEFAULT_WORKERS
+        self.max_px = DEFAULT_MAX_PX
+        self.wait_seconds = DEFAULT_WAIT_SECONDS
+
+    def configure(self, *, workers=None, max_px=None, wait_seconds=None):
+        with self._lock:
+            if workers is not None and int(workers) != self.workers:
+                self.workers = max(1, int(workers))
+                self._shutdown_locked()
+            if max_px is not None:
+                self.max_px = int(max_px)
+            if wait_seconds is not None:
+                self.wait_seconds = float(wait_seconds)
+
+    def _shutdown_locked(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._pending.clear()
+
+    def _executor_locked(self):
+        if self._executor is None:
+            # spawn: el hijo no hereda conexiones de BD ni hilos del worker web
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def _target(self, stored_path):
+        """(clave, origen, destino) o None si ese comprobante no admite vista previa."""
+        if not HAS_PIL:
+            return None
+        found = proof_file(stored_path)
+        if not found:
+            return None
+        src, mimetype = found
+        if mimetype == "application/pdf" and not HAS_PDFIUM:
+            return None
+        if mimetype not in ("application/pdf", "image/png", "image/jpeg"):
+            return None
+
+        key = proof_etag(stored_path)
+        if key is None:
+            # comprobante antiguo (ruta absoluta): ruta + mtime identifican el contenido
+            stat = os.stat(src)
+            key = hashlib.sha256(f"{src}:{stat.st_mtime_ns}:{stat.st_size}".encode()).hexdigest()
+        key = f"{key}_{self.max_px}"
+        dest = os.path.join(current_app.config["UPLOAD_FOLDER"], THUMB_DIR, key[:2], f"{key}.jpg")
+        return key, src, dest
+
+    def _on_done(self, key, future):
+        with self._lock:
+            if self._pending.get(key) is future:
+                del self._pending[key]
+            if future.cancelled():
+                return
+            error = future.exception()
+            if error is not None:
+                if isinstance(error, BrokenProcessPool):
+                    self._executor = None  # se recrea en el próximo submit
+                elif len(self._failed) < MAX_FAILED:
+                    self._failed.add(key)
+                logger.warning("No se pudo generar la miniatura %s: %s", key, error)
+
+    def _submit_locked(self, src, dest):
+        try:
+            return self._executor_locked().submit(_render_thumbnail, src, dest, self.max_px)
+        except BrokenProcessPool:
+            # un hijo murió (p. ej. OOM): pool nuevo y un reintento
+            self._executor = None
+            return self._executor_locked().submit(_render_thumbnail, src, dest, self.max_px)
+
+    def _ensure(self, stored_path):
+        target = self._target(stored_path)
+        if target is None:
+            return None
+        key, src, dest = target
+        if os.path.exists(dest):
+            return target
+        with self._lock:
+            if key in self._failed:
+                return None
+            if key not in self._pending:
+                os.makedirs(os.path.dirname(dest), exist_ok=True)
+                future = self._submit_locked(src, dest)
+                self._pending[key] = future
+                future.add_done_callback(lambda done, key=key: self._on_done(key, done))
+        return target
+
+    def ensure(self, stored_path):
+        """
+        Encola la miniatura si falta (no bloquea). Devuelve su clave (versión para la URL)
+        o None si no hay vista previa posible.
+        """
+        target = self._ensure(stored_path)
+        return target[0] if target else None
+
+    def get(self, stored_path, timeout=None):
+        """
+        (estado, ruta) de la miniatura: ("ok", ruta), ("pending", None) si no terminó en
+        `timeout` segundos, o ("unavailable", None).
+        """
+        target = self._ensure(stored_path)
+        if target is None:
+            return "unavailable", None
+        key, _src, dest = target
+        if os.path.exists(dest):
+            return "ok", dest
+
+        with self._lock:
+            future = self._pending.get(key)
+        if future is not None:
+            try:
+                future.result(timeout=self.wait_seconds if timeout is None else timeout)
+            except FutureTimeoutError:
+                return "pending", None
+            except Exception:  # noqa: BLE001 - ya registrado en _on_done
+                return "unavailable", None
+        return ("ok", dest) if os.path.exists(dest) else ("unavailable", None)
+
+
+proof_thumbnails = ProofThumbnails()
@@ -0,0 +1,179 @@
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import update
+from sqlalchemy.exc import DBAPIError
+
+from ..models import Cliente, Producto, Venta, VentaDetalle, db
+from .stock_ledger import record_movements
+
+MAX_ORDER_LINES = 200
+DEADLOCK_RETRIES = 3
+
+# deadlock_detected / serialization_failure (Postgres)
+_RETRYABLE_SQLSTATES = {"40P01", "40001"}
+
+
+class PedidoError(ValueError):
+    pass
+
+
+class StockInsuficiente(Exception):
+    def __init__(self, faltantes):
+        super().__init__("Stock insuficiente")
+        self.faltantes = faltantes
+
+
+def parse_lineas(lineas) -> dict:
+    """
+    Normaliza las líneas del pedido a {id_producto: cantidad}.
+    Las líneas repetidas del mismo producto se suman (un UPDATE no puede tocar
+    dos veces la misma fila).
+    """
+    if not isinstance(lineas, list) or not lineas:
+        raise PedidoError("lineas debe ser una lista no vacía")
+    if len(lineas) > MAX_ORDER_LINES:
+        raise PedidoError(f"Máximo {MAX_ORDER_LINES} líneas por pedido")
+
+    cantidades = {}
+    for linea in lineas:
+        if not isinstance(linea, dict):
+            raise PedidoError("Línea inválida")
+        id_producto, cantidad = linea.get("id_producto"), linea.get("cantidad")
+        if isinstance(id_producto, bool) or isinstance(cantidad, bool):
+            raise PedidoError("Línea inválida")
+        try:
+            id_producto, cantidad = int(id_producto), int(cantidad)
+        except (TypeError, ValueError):
+            raise PedidoError("Línea inválida")
+        if cantidad < 1:
+            raise PedidoError("cantidad debe ser mayor a 0")
+        cantidades[id_producto] = cantidades.get(id_producto, 0) + cantidad
+    return cantidades
+
+
+def decrement_stock(tenant_id, cantidades) -> dict:
+    """
+    Descuenta el stock de TODAS las líneas en un solo round trip:
+
+        UPDATE producto SET stock = stock - CASE id_producto WHEN .. THEN .. END
+        WHERE tenant_id = :t AND estado = 'activo' AND id_producto IN (..)
+          AND stock >= CASE id_producto WHEN .. THEN .. END
+        RETURNING id_producto, stock, precio_unitario
+
+    La condición va en el WHERE: sin leer-modificar-escribir en Python, así dos
+    ventas concurrentes del mismo SKU nunca pierden un descuento ni venden de más.
+    Devuelve {id_producto: fila} solo de las líneas que alcanzaron stock.
+    """
+    cantidad = db.case(cantidades, value=Producto.id_producto)
+    stmt = (
+        update(Producto)
+        .where(
+            Producto.tenant_id == tenant_id,
+            Producto.estado == "activo",
+            Producto.id_producto.in_(sorted(cantidades)),
+            Producto.stock >= cantidad,
+        )
+        .values(stock=Producto.stock - cantidad, updated_at=datetime.utcnow())
+        .returning(Producto.id_producto, Producto.stock, Producto.precio_unitario)
+        .execution_options(synchronize_session=False)
+    )
+    return {row.id_producto: row for row in db.session.execute(stmt)}
+
+
+def _faltantes(tenant_id, cantidades, descontados) -> list[dict]:
+    pendientes = [pid for pid in cantidades if pid not in descontados]
+    disponibles = dict(
+        db.session.query(Producto.id_producto, Producto.stock)
+        .filter(
+            Producto.tenant_id == tenant_id,
+            Producto.estado == "activo",
+            Producto.id_producto.in_(pendientes),
+        )
+        .all()
+    )
+    return [
+        {
+            "id_producto": pid,
+            "solicitado": cantidades[pid],
+            # None: no existe, es de otro tenant o está inactivo
+            "disponible": disponibles.get(pid),
+        }
+        for pid in pendientes
+    ]
+
+
+def _is_retryable(exc: DBAPIError) -> bool:
+    orig = getattr(exc, "orig", None)
+    code = getattr(orig, "pgcode", None) or getattr(orig, "sqlstate", None)
+    return code in _RETRYABLE_SQLSTATES
+
+
+def _check_cliente(tenant_id, id_cliente):
+    """id_cliente opcional del payload: entero y de ESTE tenant (si no, PedidoError)."""
+    if id_cliente is None:
+        return None
+    if isinstance(id_cliente, bool):
+        raise PedidoError("id_cliente inválido")
+    try:
+        id_cliente = int(id_cliente)
+    except (TypeError, ValueError):
+        raise PedidoError("id_cliente inválido")
+
+    exists = (
+        db.session.query(Cliente.id_cliente)
+        .filter(Cliente.id_cliente == id_cliente, Cliente.tenant_id == tenant_id)
+        .first()
+    )
+    if exists is None:
+        raise PedidoError("Cliente no encontrado")
+    return id_cliente
+
+
+def _place_order_once(tenant_id, cantidades, id_cliente):
+    descontados = decrement_stock(tenant_id, cantidades)
+    if len(descontados) < len(cantidades):
+        # todo o nada: deshacer lo que sí se descontó
+        db.session.rollback()
+        raise StockInsuficiente(_faltantes(tenant_id, cantidades, descontados))
+
+    venta = Venta(tenant_id=tenant_id, id_cliente=id_cliente)
+    total = Decimal("0")
+    for id_producto in sorted(cantidades):
+        precio = descontados[id_producto].precio_unitario
+        total += precio * cantidades[id_producto]
+        venta.detalles.append(
+            VentaDetalle(id_producto=id_producto, cantidad=cantidades[id_producto], precio_unitario=precio)
+        )
+    venta.total = total
+    db.session.add(venta)
+    db.session.flush()
+
+    # libro de stock: una salida por línea, en la misma transacción que el descuento
+    record_movements(
+        [
+            {"tenant_id": tenant_id, "id_producto": id_producto, "tipo": "salida",
+             "cantidad": -cantidades[id_producto], "id_venta": venta.id_venta}
+            for id_producto in sorted(cantidades)
+        ]
+    )
+    db.session.commit()
+    return venta
+
+
+def place_order(tenant_id, lineas, id_cliente=None) -> Venta:
+    """
+    Registra una venta multi-línea y descuenta stock de forma atómica.
+    - StockInsuficiente(faltantes) si alguna línea no alcanza (no se descuenta nada)
+    - reintenta si Postgres aborta por deadlock entre pedidos que comparten productos
+    """
+    cantidades = parse_lineas(lineas)
+    id_cliente = _check_cliente(tenant_id, id_cliente)
+
+    for attempt in range(DEADLOCK_RETRIES):
+        try:
+            return _place_order_once(tenant_id, cantidades, id_cliente)
+        except DBAPIError as exc:
+            db.session.rollback()
+            if not _is_retryable(exc) or attempt == DEADLOCK_RETRIES - 1:
+                raise
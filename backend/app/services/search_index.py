@@ -0,0 +1,166 @@
+from datetime import datetime
+
+from sqlalchemy import delete, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import defer
+
+from ..models import AdminSu, Cliente, IndiceBusqueda, Microempresa, db
+from ..utils.search import match_conditions, normalize_search, parse_query, rank_columns
+
+REBUILD_BATCH_SIZE = 1000
+
+
+def _full_name(*parts) -> str:
+    return " ".join(part for part in parts if part)
+
+
+def _microempresa_entry(m) -> dict:
+    propietario = _full_name(m.nombre_propietario, m.apellido_paterno_propietario, m.apellido_materno_propietario)
+    return {
+        "tipo": "microempresa",
+        "ref_id": m.tenant_id,
+        "tenant_id": m.tenant_id,
+        "titulo": m.nombre,
+        "email": m.email,
+        "estado": m.estado,
+        "busqueda": normalize_search(m.nombre, propietario, m.email),
+    }
+
+
+def _cliente_entry(c) -> dict:
+    return {
+        "tipo": "cliente",
+        "ref_id": c.id_cliente,
+        "tenant_id": c.tenant_id,
+        "titulo": _full_name(c.nombre, c.apellido_paterno, c.apellido_materno),
+        "email": c.email,
+        "estado": c.estado,
+        "busqueda": Cliente.search_text({field: getattr(c, field) for field in Cliente.SEARCH_FIELDS}),
+    }
+
+
+def _admin_entry(a) -> dict:
+    return {
+        "tipo": "admin",
+        "ref_id": a.id_su,
+        "tenant_id": None,
+        "titulo": _full_name(a.nombre, a.apellido_paterno, a.apellido_materno),
+        "email": a.email,
+        "estado": a.estado,
+        "busqueda": normalize_search(a.nombre, a.apellido_paterno, a.apellido_materno, a.email),
+    }
+
+
+_ENTRY_BUILDERS = {
+    Microempresa: _microempresa_entry,
+    Cliente: _cliente_entry,
+    AdminSu: _admin_entry,
+}
+
+
+def _upsert_entries(entries) -> None:
+    if not entries:
+        return
+    now = datetime.utcnow()
+    rows = [{**entry, "updated_at": now} for entry in entries]
+
+    name = db.session.get_bind().dialect.name
+    if name in ("postgresql", "sqlite"):
+        dialect_insert = postgresql.insert if name == "postgresql" else sqlite.insert
+        stmt = dialect_insert(IndiceBusqueda).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[IndiceBusqueda.tipo, IndiceBusqueda.ref_id],
+            set_={
+                col: stmt.excluded[col]
+                for col in ("tenant_id", "titulo", "email", "estado", "busqueda", "updated_at")
+            },
+        )
+        db.session.execute(stmt)
+        return
+
+    for tipo in {row["tipo"] for row in rows}:
+        db.session.execute(
+            delete(IndiceBusqueda).where(
+                IndiceBusqueda.tipo == tipo,
+                IndiceBusqueda.ref_id.in_([row["ref_id"] for row in rows if row["tipo"] == tipo]),
+            )
+        )
+    db.session.execute(insert(IndiceBusqueda), rows)
+
+
+def index_entities(*objs) -> None:
+    """
+    Actualiza el índice global con microempresas, clientes o admins recién creados
+    o editados (sin commit: va en la misma transacción que el cambio).
+    """
+    if any(obj in db.session.new for obj in objs):
+        db.session.flush()  # los nuevos necesitan su id
+    _upsert_entries([_ENTRY_BUILDERS[type(obj)](obj) for obj in objs])
+
+
+def index_clientes(tenant_id, emails) -> None:
+    """Indexa clientes insertados sin el ORM (importación CSV), por su email."""
+    if not emails:
+        return
+    rows = (
+        db.session.query(Cliente)
+        .options(defer(Cliente.password))
+        .filter(Cliente.tenant_id == tenant_id, Cliente.email.in_(emails))
+        .all()
+    )
+    _upsert_entries([_cliente_entry(c) for c in rows])
+
+
+def rebuild_search_index(batch_size=REBUILD_BATCH_SIZE) -> dict:
+    """Reconstruye el índice completo por lotes (commit por lote). Para la carga inicial."""
+    totals = {}
+    sources = ((Microempresa, Microempresa.tenant_id), (Cliente, Cliente.id_cliente), (AdminSu, AdminSu.id_su))
+    for model, pk in sources:
+        build = _ENTRY_BUILDERS[model]
+        total, last_id = 0, 0
+        while True:
+            objs = (
+                model.query.options(defer(model.password))
+                .filter(pk > last_id)
+                .order_by(pk)
+                .limit(batch_size)
+                .all()
+            )
+            if not objs:
+                break
+            _upsert_entries([build(obj) for obj in objs])
+            last_id = getattr(objs[-1], pk.key)
+            db.session.commit()
+            total += len(objs)
+        totals[model.__tablename__] = total
+    return totals
+
+
+def search_global(q, *, tipos=None, estado=None, tenant_id=None, limit=20, offset=0) -> tuple[list, bool]:
+    """
+    Búsqueda del super_usuario sobre el índice (índice GIN (tipo, busqueda gin_trgm_ops)).
+    tenant_id acota a una microempresa (ella misma y sus clientes) antes de rankear y paginar.
+    Devuelve ([(entrada, score)], hay_mas).
+    """
+    term, tokens = parse_query(q)
+    fuzzy = db.session.get_bind().dialect.name == "postgresql"
+    prefix, score = rank_columns(IndiceBusqueda.busqueda, term, fuzzy=fuzzy)
+
+    query = db.session.query(IndiceBusqueda, score.label("score")).filter(
+        *match_conditions(IndiceBusqueda.busqueda, tokens, fuzzy=fuzzy)
+    )
+    if tipos:
+        query = query.filter(IndiceBusqueda.tipo.in_(tipos))
+    if estado:
+        query = query.filter(IndiceBusqueda.estado == estado)
+    if tenant_id is not None:
+        query = query.filter(IndiceBusqueda.tenant_id == tenant_id)
+
+    rows = (
+        query.order_by(prefix.desc(), score.desc(), IndiceBusqueda.titulo, IndiceBusqueda.id_indice)
+        .offset(offset)
+        .limit(limit + 1)
+        .all()
+    )
+    return [(entry, float(score or 0)) for entry, score in rows[:limit]], len(rows) > limit
+
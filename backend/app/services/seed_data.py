@@ -0,0 +1,368 @@
+import io
+import random
+import unicodedata
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import insert
+
+from ..models import (
+    AlertaStock,
+    Cliente,
+    Microempresa,
+    MovimientoStock,
+    Plan,
+    Producto,
+    Suscripcion,
+    SuscripcionSolicitud,
+    db,
+)
+from ..utils.bulk import bulk_insert
+from .auth_service import hash_password
+from .plan_catalog import bump_catalog_version, invalidate_plan_catalog
+from .storage_service import store_proof_stream
+
+DEFAULT_BATCH_SIZE = 1000  # microempresas por lote (cada lote = una transacción)
+DEFAULT_PASSWORD = "seed1234"
+PROOF_VARIANTS = 200  # comprobantes distintos por plan
+
+BASE_PLANES = (
+    {"nombre": "Básico", "precio": 50, "estado": "activo"},
+    {"nombre": "Pro", "precio": 100, "estado": "activo"},
+    {"nombre": "Premium", "precio": 200, "estado": "activo"},
+)
+
+# mezcla aproximada de producción: (valor, peso)
+ESTADOS_MICROEMPRESA = (("activo", 70), ("pendiente", 18), ("inactivo", 12))
+TIPOS_TIENDA = (("fisica", 60), ("virtual", 40))
+ESTADOS_CLIENTE = (("activo", 92), ("inactivo", 8))
+
+# mismos valores por defecto que el onboarding de una tienda virtual
+VIRTUAL_DIRECCION = "Sin tienda física (virtual)"
+VIRTUAL_HORARIO = "Atención online"
+HORARIOS = ("08:00 - 18:00", "09:00 - 19:00", "07:30 - 13:00", "10:00 - 22:00")
+
+NOMBRES = (
+    "Ana", "Luis", "María", "José", "Carmen", "Jorge", "Rosa", "Carlos", "Lucía", "Miguel",
+    "Sofía", "Juan", "Valeria", "Diego", "Elena", "Andrés", "Paola", "Raúl", "Gabriela", "Fernando",
+)
+APELLIDOS = (
+    "Quispe", "Mamani", "Flores", "Rojas", "Gutiérrez", "Vargas", "Choque", "Torrez", "López",
+    "Fernández", "Pérez", "Condori", "Gonzales", "Medina", "Castillo", "Ramírez", "Núñez", "Ortiz",
+)
+RUBROS = ("Ferretería", "Librería", "Tienda", "Farmacia", "Panadería", "Boutique", "Minimarket", "Bazar")
+CALLES = ("Av. Blanco Galindo", "Calle Sucre", "Av. América", "Calle Jordán", "Av. Ayacucho", "Calle Baptista")
+PRODUCTOS = (
+    "Arroz", "Azúcar", "Aceite", "Fideo", "Cuaderno", "Bolígrafo", "Martillo", "Clavos", "Pan",
+    "Leche", "Jabón", "Detergente", "Polera", "Gorra", "Paracetamol", "Alcohol", "Galletas", "Café",
+)
+
+CLIENTE_COLUMNS = (
+    "tenant_id",
+    "nombre",
+    "apellido_paterno",
+    "apellido_materno",
+    "razon_social",
+    "es_generico",
+    "email",
+    "password",
+    "estado",
+    "busqueda",
+    "updated_at",
+)
+PRODUCTO_COLUMNS = (
+    "tenant_id",
+    "codigo",
+    "nombre",
+    "descripcion",
+    "precio_unitario",
+    "stock",
+    "stock_minimo",
+    "estado",
+    "updated_at",
+)
+MOVIMIENTO_COLUMNS = ("tenant_id", "id_producto", "tipo", "cantidad", "nota", "creado_en")
+ALERTA_COLUMNS = ("tenant_id", "id_producto", "tipo", "stock", "stock_minimo", "creado_en")
+SUSCRIPCION_COLUMNS = ("tenant_id", "id_plan", "fecha_inicio", "fecha_fin", "estado", "updated_at")
+SOLICITUD_COLUMNS = (
+    "tenant_id",
+    "id_plan",
+    "estado",
+    "onboarding_token_hash",
+    "onboarding_expires_at",
+    "qr_text",
+    "comprobante_path",
+    "creado_en",
+    "revisado_en",
+    "observacion",
+    "updated_at",
+)
+
+
+def ensure_base_plans() -> list:
+    """Crea los planes base si no hay ninguno (sin commit). Devuelve los id_plan activos."""
+    if not db.session.query(Plan.id_plan).first():
+        for values in BASE_PLANES:
+            db.session.add(Plan(**values))
+        bump_catalog_version()
+        db.session.flush()
+    return [id_plan for (id_plan,) in db.session.query(Plan.id_plan).filter(Plan.estado == "activo")]
+
+
+def _pick(rng, weighted):
+    values, weights = zip(*weighted)
+    return rng.choices(values, weights)[0]
+
+
+def _ascii(text) -> str:
+    return unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+
+
+def _proof_bytes(id_plan, variant) -> bytes:
+    # PDF mínimo válido: basta para la vista previa y la descarga de la revisión
+    text = f"Comprobante de pago - plan {id_plan} - transferencia {variant}"
+    stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode("latin-1")
+    return (
+        b"%PDF-1.4\n1 0 obj<</Type/Catalog/Pages 2 0 R>>endobj\n"
+        b"2 0 obj<</Type/Pages/Kids[3 0 R]/Count 1>>endobj\n"
+        b"3 0 obj<</Type/Page/Parent 2 0 R/MediaBox[0 0 612 792]/Contents 4 0 R"
+        b"/Resources<</Font<</F1<</Type/Font/Subtype/Type1/BaseFont/Helvetica>>>>>>>>endobj\n"
+        + f"4 0 obj<</Length {len(stream)}>>stream\n".encode()
+        + stream
+        + b"\nendstream endobj\ntrailer<</Root 1 0 R>>\n%%EOF\n"
+    )
+
+
+def _store_proof(id_plan, variant) -> str:
+    # pocas variantes por plan: muchas microempresas suben la misma captura
+    return store_proof_stream(io.BytesIO(_proof_bytes(id_plan, variant))).path
+
+
+class _Generator:
+    def __init__(self, rng, run, password, plan_ids, proofs, now):
+        self.rng = rng
+        self.run = run
+        self.password = password
+        self.plan_ids = plan_ids
+        self.proofs = proofs
+        self.now = now
+
+    def microempresa(self, index) -> dict:
+        rng = self.rng
+        apellido = rng.choice(APELLIDOS)
+        virtual = _pick(rng, TIPOS_TIENDA) == "virtual"
+        return {
+            "nombre": f"{rng.choice(RUBROS)} {apellido} {self.run}-{index}",
+            "logo_url": None,
+            "direccion": VIRTUAL_DIRECCION if virtual else f"{rng.choice(CALLES)} #{rng.randint(1, 2000)}",
+            "horario_atencion": VIRTUAL_HORARIO if virtual else rng.choice(HORARIOS),
+            "nombre_propietario": rng.choice(NOMBRES),
+            "apellido_paterno_propietario": apellido,
+            "apellido_materno_propietario": rng.choice(APELLIDOS),
+            "email": f"tienda{index}.{self.run}@seed.example.com",
+            "password": self.password,
+            "estado": _pick(rng, ESTADOS_MICROEMPRESA),
+            "updated_at": self.now,
+        }
+
+    def clientes(self, tenant_id, count) -> list:
+        rng = self.rng
+        rows = []
+        for n in range(count):
+            nombre, paterno, materno = rng.choice(NOMBRES), rng.choice(APELLIDOS), rng.choice(APELLIDOS)
+            empresa = rng.random() < 0.1
+            values = {
+                "nombre": nombre,
+                "apellido_paterno": paterno,
+                "apellido_materno": materno,
+                "razon_social": f"{paterno} {materno} S.R.L." if empresa else None,
+                "email": _ascii(f"{nombre}.{paterno}{n}@correo.example.com").lower(),
+            }
+            rows.append(
+                {
+                    **values,
+                    "tenant_id": tenant_id,
+                    "es_generico": n == 0,
+                    "password": self.password,
+                    "estado": _pick(rng, ESTADOS_CLIENTE),
+                    "busqueda": Cliente.search_text(values),
+                    "updated_at": self.now,
+                }
+            )
+        return rows
+
+    def productos(self, tenant_id, count) -> list:
+        rng = self.rng
+        rows = []
+        for n in range(count):
+            stock_minimo = rng.randint(0, 20)
+            # ~10% en stock bajo (alimenta la vista y las alertas de stock bajo)
+            stock = rng.randint(0, stock_minimo) if rng.random() < 0.1 else rng.randint(stock_minimo + 1, 500)
+            rows.append(
+                {
+                    "tenant_id": tenant_id,
+                    "codigo": f"SKU-{n + 1:05d}",
+                    "nombre": f"{rng.choice(PRODUCTOS)} {n + 1}",
+                    "descripcion": None,
+                    "precio_unitario": Decimal(f"{rng.uniform(1, 500):.2f}"),
+                    "stock": stock,
+                    "stock_minimo": stock_minimo,
+                    "estado": "activo" if rng.random() < 0.95 else "inactivo",
+                    "updated_at": self.now,
+                }
+            )
+        return rows
+
+    def stock_inicial(self, tenant_ids) -> tuple:
+        """
+        Libro y alertas de los productos recién copiados (COPY no devuelve ids: se leen por tenant):
+        una entrada "stock inicial" por producto con stock, como un alta por la API, y una
+        alerta stock_bajo por cada producto activo que nace con stock <= stock_minimo.
+        """
+        productos = db.session.query(
+            Producto.id_producto, Producto.tenant_id, Producto.stock, Producto.stock_minimo, Producto.estado
+        ).filter(Producto.tenant_id.in_(tenant_ids))
+
+        movimientos, alertas = [], []
+        for row in productos:
+            if row.stock:
+                movimientos.append(
+                    {"tenant_id": row.tenant_id, "id_producto": row.id_producto, "tipo": "entrada",
+                     "cantidad": row.stock, "nota": "stock inicial", "creado_en": self.now}
+                )
+            if row.estado == "activo" and row.stock <= row.stock_minimo:
+                alertas.append(
+                    {"tenant_id": row.tenant_id, "id_producto": row.id_producto, "tipo": "stock_bajo",
+                     "stock": row.stock, "stock_minimo": row.stock_minimo, "creado_en": self.now}
+                )
+        return movimientos, alertas
+
+    def suscripcion_y_solicitud(self, tenant_id, estado) -> tuple:
+        """
+        Historial coherente con el estado de la microempresa:
+        activo -> solicitud aprobada + suscripción activa; pendiente -> borrador o en espera;
+        inactivo -> solicitud rechazada.
+        """
+        rng = self.rng
+        id_plan = rng.choice(self.plan_ids)
+        creado = self.now - timedelta(days=rng.randint(0, 365), minutes=rng.randint(0, 1440))
+        if estado == "pendiente":
+            sol_estado = rng.choice(("borrador", "en_espera", "en_espera"))
+        else:
+            sol_estado = "aprobado" if estado == "activo" else "rechazado"
+        con_comprobante = sol_estado != "borrador"
+
+        path = None
+        if con_comprobante and self.proofs:
+            path = _store_proof(id_plan, rng.randint(1, PROOF_VARIANTS))
+        revisado = creado + timedelta(hours=rng.randint(1, 72)) if sol_estado in ("aprobado", "rechazado") else None
+        solicitud = {
+            "tenant_id": tenant_id,
+            "id_plan": id_plan if con_comprobante else None,
+            "estado": sol_estado,
+            "onboarding_token_hash": f"{rng.getrandbits(256):064x}",
+            "onboarding_expires_at": creado + timedelta(hours=2),
+            "qr_text": f"MICROEMPRESA_SAAS|SEED|TENANT:{tenant_id}|PLAN:{id_plan}" if con_comprobante else None,
+            "comprobante_path": path,
+            "creado_en": creado,
+            "revisado_en": revisado,
+            "observacion": "Comprobante ilegible" if sol_estado == "rechazado" else None,
+            "updated_at": revisado or creado,
+        }
+
+        suscripcion = None
+        if sol_estado == "aprobado":
+            suscripcion = {
+                "tenant_id": tenant_id,
+                "id_plan": id_plan,
+                "fecha_inicio": revisado,
+                "fecha_fin": revisado + timedelta(days=30 * rng.choice((1, 1, 3, 12))),
+                "estado": "activa",
+                "updated_at": revisado,
+            }
+        return suscripcion, solicitud
+
+
+def seed_dataset(
+    microempresas,
+    *,
+    clientes=50,
+    productos=20,
+    proofs=True,
+    password=DEFAULT_PASSWORD,
+    batch_size=DEFAULT_BATCH_SIZE,
+    rng_seed=None,
+    progress=None,
+) -> dict:
+    """
+    Genera datos sintéticos por lotes de microempresas (commit por lote):
+    microempresas (mezcla de estado y tipo_tienda), clientes y productos por tenant
+    (con su stock inicial en el libro y las alertas de los que nacen con stock bajo),
+    solicitudes de suscripción con comprobante y suscripciones de las activas.
+    Inserción con COPY en Postgres (executemany en otras bases); un solo hash de password
+    para todas las cuentas. progress(totales) se llama después de cada lote.
+    """
+    rng = random.Random(rng_seed)
+    plan_ids = ensure_base_plans()
+    db.session.commit()
+    invalidate_plan_catalog()
+
+    now = datetime.utcnow()
+    gen = _Generator(
+        rng,
+        run=uuid.uuid4().hex[:6],
+        password=hash_password(password),
+        plan_ids=plan_ids,
+        proofs=proofs,
+        now=now,
+    )
+    totals = {
+        "microempresas": 0,
+        "clientes": 0,
+        "productos": 0,
+        "movimientos": 0,
+        "alertas": 0,
+        "suscripciones": 0,
+        "solicitudes": 0,
+    }
+
+    for start in range(0, microempresas, batch_size):
+        micro_rows = [gen.microempresa(index) for index in range(start, min(start + batch_size, microempresas))]
+        # los tenant_id hacen falta para las tablas hijas: INSERT ... RETURNING (no COPY)
+        tenant_ids = list(
+            db.session.scalars(
+                insert(Microempresa).returning(Microempresa.tenant_id, sort_by_parameter_order=True),
+                micro_rows,
+            )
+        )
+
+        cliente_rows, producto_rows, suscripcion_rows, solicitud_rows = [], [], [], []
+        for tenant_id, micro in zip(tenant_ids, micro_rows):
+            cliente_rows.extend(gen.clientes(tenant_id, clientes))
+            producto_rows.extend(gen.productos(tenant_id, productos))
+            suscripcion, solicitud = gen.suscripcion_y_solicitud(tenant_id, micro["estado"])
+            solicitud_rows.append(solicitud)
+            if suscripcion:
+                suscripcion_rows.append(suscripcion)
+
+        bulk_insert(Cliente, CLIENTE_COLUMNS, cliente_rows)
+        bulk_insert(Producto, PRODUCTO_COLUMNS, producto_rows)
+        movimiento_rows, alerta_rows = gen.stock_inicial(tenant_ids)
+        bulk_insert(MovimientoStock, MOVIMIENTO_COLUMNS, movimiento_rows)
+        bulk_insert(AlertaStock, ALERTA_COLUMNS, alerta_rows)
+        bulk_insert(Suscripcion, SUSCRIPCION_COLUMNS, suscripcion_rows)
+        bulk_insert(SuscripcionSolicitud, SOLICITUD_COLUMNS, solicitud_rows)
+        db.session.commit()
+
+        totals["microempresas"] += len(tenant_ids)
+        totals["clientes"] += len(cliente_rows)
+        totals["productos"] += len(producto_rows)
+        totals["movimientos"] += len(movimiento_rows)
+        totals["alertas"] += len(alerta_rows)
+        totals["suscripciones"] += len(suscripcion_rows)
+        totals["solicitudes"] += len(solicitud_rows)
+        if progress:
+            progress(totals)
+
+    return totals
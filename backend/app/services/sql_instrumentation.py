@@ -0,0 +1,96 @@
+import time
+from collections import Counter
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+DEFAULT_QUERY_BUDGET = 20
+DEFAULT_TIME_BUDGET_MS = 200
+DEFAULT_REPEAT_THRESHOLD = 5
+
+
+class _RequestStats:
+    __slots__ = ("started", "queries", "db_seconds", "statements")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        # texto SQL con parámetros ligados: el mismo SELECT con distinto id cuenta igual
+        self.statements = Counter()
+
+
+def _current_stats():
+    return g.get("_sql_stats") if has_request_context() else None
+
+
+def _before_cursor_execute(conn, _cursor, _statement, _parameters, _context, _executemany):
+    conn.info.setdefault("_sql_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, _cursor, statement, _parameters, _context, _executemany):
+    started = conn.info["_sql_started"].pop()
+    stats = _current_stats()
+    if stats is None:
+        return  # CLI, hilos de fondo
+    stats.queries += 1
+    stats.db_seconds += time.perf_counter() - started
+    stats.statements[statement] += 1
+
+
+def _handle_error(context):
+    # la sentencia falló: after_cursor_execute no se ejecuta, descartar su inicio
+    conn = context.connection
+    if conn is not None and conn.info.get("_sql_started"):
+        conn.info["_sql_started"].pop()
+
+
+def _server_timing(stats, total_ms) -> str:
+    db_ms = stats.db_seconds * 1000
+    return f'db;dur={db_ms:.1f};desc="{stats.queries} queries", app;dur={total_ms:.1f}'
+
+
+def init_sql_instrumentation(app, engine):
+    """
+    Instrumentación por request (opt-in con SQL_INSTRUMENTATION=1):
+    - cuenta queries y tiempo de BD (before/after_cursor_execute)
+    - header Server-Timing (visible en la pestaña Network del navegador)
+    - log de warning si la request pasa SQL_QUERY_BUDGET o SQL_TIME_BUDGET_MS,
+      o si una misma sentencia se repite SQL_REPEAT_THRESHOLD veces (N+1)
+    """
+    query_budget = app.config.get("SQL_QUERY_BUDGET", DEFAULT_QUERY_BUDGET)
+    time_budget_ms = app.config.get("SQL_TIME_BUDGET_MS", DEFAULT_TIME_BUDGET_MS)
+    repeat_threshold = app.config.get("SQL_REPEAT_THRESHOLD", DEFAULT_REPEAT_THRESHOLD)
+
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+    @app.before_request
+    def _start_sql_stats():
+        g._sql_stats = _RequestStats()
+
+    @app.after_request
+    def _report_sql_stats(response):
+        stats = g.pop("_sql_stats", None)
+        if stats is None:
+            return response
+        total_ms = (time.perf_counter() - stats.started) * 1000
+        response.headers["Server-Timing"] = _server_timing(stats, total_ms)
+        if request.headers.get("Origin"):
+            # el frontend corre en otro origen: sin esto el navegador oculta Server-Timing
+            response.headers["Timing-Allow-Origin"] = request.headers["Origin"]
+
+        endpoint = f"{request.method} {request.path}"
+        repeated = [(sql, n) for sql, n in stats.statements.most_common(3) if n >= repeat_threshold]
+        for sql, n in repeated:
+            app.logger.warning("N+1 posible en %s: %d veces -> %s", endpoint, n, " ".join(sql.split())[:300])
+        if stats.queries > query_budget or stats.db_seconds * 1000 > time_budget_ms:
+            app.logger.warning(
+                "Presupuesto SQL excedido en %s: %d queries, %.1f ms en BD, %.1f ms total",
+                endpoint,
+                stats.queries,
+                stats.db_seconds * 1000,
+                total_ms,
+            )
+        return response
@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta
+from itertools import takewhile
+
+from sqlalchemy import insert
+
+from ..models import AlertaStock, Producto, db
+
+DEFAULT_FEED_LIMIT = 100
+MAX_FEED_LIMIT = 500
+DEFAULT_FEED_LAG_SECONDS = 10
+
+
+def _es_bajo(stock, stock_minimo, estado) -> bool:
+    # mismo criterio que el índice parcial ix_producto_stock_bajo
+    return estado == "activo" and stock <= stock_minimo
+
+
+def _emit(ids, estado_antes) -> int:
+    """
+    Una alerta por producto que entró o salió de stock bajo en la transacción actual
+    (sin commit). estado_antes(fila) -> (stock, stock_minimo, estado) previos, o None
+    si el producto es nuevo (solo avisa si nace con stock bajo).
+    """
+    if not ids:
+        return 0
+    productos = db.session.query(
+        Producto.id_producto, Producto.tenant_id, Producto.stock, Producto.stock_minimo, Producto.estado
+    ).filter(Producto.id_producto.in_(list(ids)))
+
+    now = datetime.utcnow()
+    alertas = []
+    for row in productos:
+        antes = estado_antes(row)
+        era_bajo = antes is not None and _es_bajo(*antes)
+        es_bajo = _es_bajo(row.stock, row.stock_minimo, row.estado)
+        if era_bajo == es_bajo:
+            continue
+        alertas.append(
+            {
+                "tenant_id": row.tenant_id,
+                "id_producto": row.id_producto,
+                "tipo": "stock_bajo" if es_bajo else "repuesto",
+                "stock": row.stock,
+                "stock_minimo": row.stock_minimo,
+                "creado_en": now,
+            }
+        )
+
+    if alertas:
+        db.session.execute(insert(AlertaStock), alertas)
+    return len(alertas)
+
+
+def emit_crossings(movimientos) -> int:
+    """
+    Alertas de los productos que cruzaron stock_minimo con estos movimientos.
+    Un SELECT por lote: stock_antes = stock_actual - suma de deltas del lote.
+    """
+    deltas = {}
+    for mov in movimientos:
+        deltas[mov["id_producto"]] = deltas.get(mov["id_producto"], 0) + mov["cantidad"]
+    return _emit(deltas, lambda row: (row.stock - deltas[row.id_producto], row.stock_minimo, row.estado))
+
+
+def emit_changes(antes) -> int:
+    """
+    Alertas por cambios que no pasan por el libro: stock_minimo, estado (alta/baja)
+    o varios a la vez. antes: {id_producto: (stock, stock_minimo, estado)} leídos con
+    la fila bloqueada antes del cambio, o None para productos nuevos.
+    """
+    return _emit(antes, lambda row: antes[row.id_producto])
+
+
+def alert_feed(tenant_id, after=0, limit=DEFAULT_FEED_LIMIT, lag_seconds=DEFAULT_FEED_LAG_SECONDS):
+    """
+    Alertas del tenant con id_alerta > after (orden de llegada).
+    Devuelve (alertas, ultimo): el cliente vuelve a pedir con ?after=ultimo.
+
+    Los ids se asignan antes del commit: una transacción lenta puede hacer visible
+    el id 10 después de que otro cliente ya leyó el 11. Por eso solo se entregan
+    alertas con más de lag_seconds, y la página se corta en la primera más reciente
+    (igual que el desfase de los snapshots de stock).
+    """
+    limit = max(1, min(int(limit), MAX_FEED_LIMIT))
+    corte = datetime.utcnow() - timedelta(seconds=lag_seconds)
+    candidatas = (
+        AlertaStock.query.filter(AlertaStock.tenant_id == tenant_id, AlertaStock.id_alerta > after)
+        .order_by(AlertaStock.id_alerta)
+        .limit(limit)
+        .all()
+    )
+    alertas = list(takewhile(lambda alerta: alerta.creado_en <= corte, candidatas))
+    ultimo = alertas[-1].id_alerta if alertas else after
+    return alertas, ultimo
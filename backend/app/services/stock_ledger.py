@@ -0,0 +1,237 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app
+from sqlalchemy import func, insert, update
+
+from ..models import MovimientoStock, Producto, StockSnapshot, db
+from .stock_alerts import emit_crossings
+
+DEFAULT_SNAPSHOT_LAG_SECONDS = 300
+
+
+class MovimientoError(ValueError):
+    pass
+
+
+def parse_fecha(raw):
+    """ISO 8601 -> datetime UTC naive (como se guarda creado_en). None si no viene."""
+    if not raw:
+        return None
+    try:
+        fecha = datetime.fromisoformat(str(raw).strip().replace("Z", "+00:00"))
+    except ValueError:
+        raise MovimientoError("fecha inválida (usa ISO 8601)")
+    if fecha.tzinfo is not None:
+        fecha = fecha.astimezone(timezone.utc).replace(tzinfo=None)
+    return fecha
+
+
+def record_movements(rows, *, alertas=True) -> None:
+    """
+    Inserta movimientos en la transacción actual (un executemany, sin commit).
+    rows: dicts con tenant_id, id_producto, tipo, cantidad y opcionales id_venta/referencia/nota.
+    Producto.stock ya debe estar actualizado: de aquí salen las alertas de stock bajo.
+    alertas=False: el llamador las emite con emit_changes (altas, cambios de stock_minimo/estado).
+    """
+    if not rows:
+        return
+    now = datetime.utcnow()
+    db.session.execute(
+        insert(MovimientoStock),
+        [
+            {"id_venta": None, "referencia": None, "nota": None, "creado_en": now, **row}
+            for row in rows
+        ],
+    )
+    if alertas:
+        emit_crossings(rows)
+
+
+def _delta_for(tipo, cantidad) -> int:
+    if isinstance(cantidad, bool):
+        raise MovimientoError("cantidad inválida")
+    try:
+        cantidad = int(cantidad)
+    except (TypeError, ValueError):
+        raise MovimientoError("cantidad inválida")
+
+    if tipo == "entrada":
+        if cantidad < 1:
+            raise MovimientoError("cantidad debe ser mayor a 0")
+        return cantidad
+    if tipo == "salida":
+        if cantidad < 1:
+            raise MovimientoError("cantidad debe ser mayor a 0")
+        return -cantidad
+    if tipo == "ajuste":
+        # ajuste lleva signo: +n sobrante encontrado, -n merma
+        if cantidad == 0:
+            raise MovimientoError("cantidad no puede ser 0")
+        return cantidad
+    raise MovimientoError("tipo inválido (entrada, salida, ajuste)")
+
+
+def _apply_delta(tenant_id, id_producto, delta):
+    """UPDATE condicional (nunca deja stock negativo). Devuelve el stock nuevo o None."""
+    stmt = (
+        update(Producto)
+        .where(
+            Producto.id_producto == id_producto,
+            Producto.tenant_id == tenant_id,
+            Producto.stock + delta >= 0,
+        )
+        .values(stock=Producto.stock + delta, updated_at=datetime.utcnow())
+        .returning(Producto.stock)
+        .execution_options(synchronize_session=False)
+    )
+    return db.session.execute(stmt).scalar()
+
+
+def apply_movement(tenant_id, id_producto, tipo, cantidad, *, nota=None) -> int:
+    """Registra un movimiento manual y actualiza Producto.stock en la misma transacción (sin commit)."""
+    delta = _delta_for(tipo, cantidad)
+    stock = _apply_delta(tenant_id, id_producto, delta)
+    if stock is None:
+        raise MovimientoError("Stock insuficiente o producto no encontrado")
+    record_movements(
+        [{"tenant_id": tenant_id, "id_producto": id_producto, "tipo": tipo, "cantidad": delta, "nota": nota}]
+    )
+    return stock
+
+
+def transfer_stock(tenant_id, id_origen, id_destino, cantidad, *, nota=None) -> str:
+    """
+    Mueve stock entre dos productos del tenant (ej. caja -> unidades sueltas).
+    Dos movimientos 'transferencia' con la misma referencia. Sin commit.
+    """
+    if id_origen == id_destino:
+        raise MovimientoError("Origen y destino deben ser distintos")
+    salida = _delta_for("salida", cantidad)
+    referencia = uuid.uuid4().hex
+
+    # siempre en orden de id: dos transferencias cruzadas no se bloquean entre sí
+    for id_producto, delta in sorted(((id_origen, salida), (id_destino, -salida))):
+        if _apply_delta(tenant_id, id_producto, delta) is None:
+            raise MovimientoError("Stock insuficiente o producto no encontrado")
+
+    record_movements(
+        [
+            {"tenant_id": tenant_id, "id_producto": id_origen, "tipo": "transferencia",
+             "cantidad": salida, "referencia": referencia, "nota": nota},
+            {"tenant_id": tenant_id, "id_producto": id_destino, "tipo": "transferencia",
+             "cantidad": -salida, "referencia": referencia, "nota": nota},
+        ]
+    )
+    return referencia
+
+
+def stock_at(tenant_id, fecha=None, id_producto=None) -> dict:
+    """
+    Stock histórico {id_producto: stock} al instante `fecha` (None = ahora):
+    snapshot más cercano <= fecha + suma de movimientos en (snapshot, fecha].
+    Productos sin snapshot ni movimientos no aparecen.
+    """
+    corte_q = db.session.query(func.max(StockSnapshot.tomado_en)).filter(StockSnapshot.tenant_id == tenant_id)
+    if id_producto is not None:
+        corte_q = corte_q.filter(StockSnapshot.id_producto == id_producto)
+    if fecha is not None:
+        corte_q = corte_q.filter(StockSnapshot.tomado_en <= fecha)
+    corte = corte_q.scalar()
+
+    balances = {}
+    if corte is not None:
+        base = db.session.query(StockSnapshot.id_producto, StockSnapshot.stock).filter(
+            StockSnapshot.tenant_id == tenant_id, StockSnapshot.tomado_en == corte
+        )
+        if id_producto is not None:
+            base = base.filter(StockSnapshot.id_producto == id_producto)
+        balances.update(base.all())
+
+    movimientos = db.session.query(
+        MovimientoStock.id_producto, func.sum(MovimientoStock.cantidad)
+    ).filter(MovimientoStock.tenant_id == tenant_id)
+    if id_producto is not None:
+        movimientos = movimientos.filter(MovimientoStock.id_producto == id_producto)
+    if corte is not None:
+        movimientos = movimientos.filter(MovimientoStock.creado_en > corte)
+    if fecha is not None:
+        movimientos = movimientos.filter(MovimientoStock.creado_en <= fecha)
+
+    for pid, delta in movimientos.group_by(MovimientoStock.id_producto):
+        balances[pid] = balances.get(pid, 0) + int(delta or 0)
+    return balances
+
+
+def take_snapshot(tenant_id, corte=None) -> int:
+    """
+    Guarda el stock de todos los productos del tenant al `corte` (sin commit).
+    El corte va STOCK_SNAPSHOT_LAG_SECONDS atrás: un movimiento de una transacción
+    aún abierta no queda fuera del snapshot por haber hecho commit tarde.
+    """
+    if corte is None:
+        lag = float(current_app.config.get("STOCK_SNAPSHOT_LAG_SECONDS", DEFAULT_SNAPSHOT_LAG_SECONDS))
+        corte = datetime.utcnow() - timedelta(seconds=lag)
+
+    ultimo = (
+        db.session.query(func.max(StockSnapshot.tomado_en))
+        .filter(StockSnapshot.tenant_id == tenant_id)
+        .scalar()
+    )
+    if ultimo is not None and ultimo >= corte:
+        return 0
+
+    balances = stock_at(tenant_id, corte)
+    if not balances:
+        return 0
+    db.session.execute(
+        insert(StockSnapshot),
+        [
+            {"tenant_id": tenant_id, "id_producto": pid, "tomado_en": corte, "stock": stock}
+            for pid, stock in balances.items()
+        ],
+    )
+    return len(balances)
+
+
+def tenants_with_movements() -> list[int]:
+    return [tid for (tid,) in db.session.query(MovimientoStock.tenant_id).distinct()]
+
+
+def reconcile_stock(tenant_id, fix=False) -> list[dict]:
+    """
+    Compara Producto.stock con el libro. Devuelve las diferencias.
+    fix=True (sin commit):
+    - productos con movimientos: Producto.stock = saldo del libro
+    - productos sin ningún movimiento (previos al libro): movimiento de apertura
+    """
+    ledger = stock_at(tenant_id)
+    diferencias = [
+        {"id_producto": pid, "stock": stock, "libro": ledger.get(pid)}
+        for pid, stock in db.session.query(Producto.id_producto, Producto.stock).filter(
+            Producto.tenant_id == tenant_id
+        )
+        if ledger.get(pid, 0) != stock
+    ]
+    if not fix:
+        return diferencias
+
+    for item in diferencias:
+        # el bloqueo de la fila ordena la corrección contra ventas/movimientos en curso
+        producto = (
+            Producto.query.filter(Producto.id_producto == item["id_producto"])
+            .with_for_update()
+            .one()
+        )
+        libro = stock_at(tenant_id, id_producto=producto.id_producto).get(producto.id_producto)
+        if libro is None:
+            record_movements(
+                [{"tenant_id": tenant_id, "id_producto": producto.id_producto, "tipo": "ajuste",
+                  "cantidad": producto.stock, "nota": "apertura (reconciliación)"}],
+                # la apertura no cambia el stock real: no es un cruce de stock_minimo
+                alertas=False,
+            )
+        elif libro != producto.stock:
+            producto.stock = libro
+        item["libro"] = libro if libro is not None else producto.stock
+    return diferencias
@@ -1,26 +1,185 @@
+import hashlib
 import os
+import tempfile
+import time
 import uuid
-from werkzeug.utils import secure_filename
+from collections import namedtuple
+
 from flask import current_app
+from werkzeug.utils import secure_filename
 
 ALLOWED_EXTS = {".pdf", ".png", ".jpg", ".jpeg"}
+CHUNK_SIZE = 64 * 1024
+DEFAULT_REPORT_TTL_HOURS = 24
+
+# comprobantes direccionados por contenido: comprobantes/sha256/<2 hex>/<sha256><ext>
+# (con "/" también en Windows: es lo que queda guardado en la BD)
+PROOF_BLOB_DIR = "comprobantes/sha256"
+PROOF_TMP_DIR = "comprobantes/tmp"
+
+# magic bytes -> (extensión, mimetype). El tipo sale del contenido, no del nombre.
+_SIGNATURES = (
+    (b"%PDF-", ".pdf", "application/pdf"),
+    (b"\x89PNG\r\n\x1a\n", ".png", "image/png"),
+    (b"\xff\xd8\xff", ".jpg", "image/jpeg"),
+)
+_MIMETYPES = {ext: mimetype for _magic, ext, mimetype in _SIGNATURES}
+_SNIFF_BYTES = max(len(magic) for magic, _ext, _mimetype in _SIGNATURES)
+
+StoredFile = namedtuple("StoredFile", "path sha256 size ext mimetype created")
+
+
+class StorageError(ValueError):
+    """Archivo rechazado (vacío, formato no permitido)."""
+
+
+def _upload_root() -> str:
+    return current_app.config["UPLOAD_FOLDER"]
+
+
+def _sniff(head: bytes):
+    for magic, ext, mimetype in _SIGNATURES:
+        if head.startswith(magic):
+            return ext, mimetype
+    return None
+
+
+def store_proof_stream(stream) -> StoredFile:
+    """
+    Guarda un comprobante leyendo `stream` por bloques:
+    - escribe a un temporal (mismo filesystem) mientras calcula SHA-256
+    - valida el tipo por magic bytes (PDF/PNG/JPG)
+    - lo publica como comprobantes/sha256/<xx>/<sha256><ext> con rename atómico;
+      si ese contenido ya existe, descarta el temporal (un archivo, muchas referencias)
+    Devuelve StoredFile; `path` es relativo a UPLOAD_FOLDER (lo que se guarda en la BD).
+    """
+    root = _upload_root()
+    tmp_dir = os.path.join(root, PROOF_TMP_DIR)
+    os.makedirs(tmp_dir, exist_ok=True)
+
+    digest = hashlib.sha256()
+    size = 0
+    head = b""
+    fd, tmp_path = tempfile.mkstemp(dir=tmp_dir, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                if len(head) < _SNIFF_BYTES:
+                    head += chunk[: _SNIFF_BYTES - len(head)]
+                digest.update(chunk)
+                out.write(chunk)
+                size += len(chunk)
+
+            if not size:
+                raise StorageError("Archivo vacío")
+            kind = _sniff(head)
+            if kind is None:
+                raise StorageError("Formato no permitido. Usa PDF/JPG/PNG")
+            ext, mimetype = kind
+
+            sha256 = digest.hexdigest()
+            rel_path = f"{PROOF_BLOB_DIR}/{sha256[:2]}/{sha256}{ext}"
+            final_path = os.path.join(root, rel_path)
+            created = not os.path.exists(final_path)
+            if created:
+                # a disco antes del rename: nunca publicar un archivo a medio escribir
+                out.flush()
+                os.fsync(out.fileno())
 
+        if created:
+            os.makedirs(os.path.dirname(final_path), exist_ok=True)
+            # dos subidas simultáneas del mismo archivo publican el mismo contenido: da igual cuál gane
+            os.replace(tmp_path, final_path)
+        return StoredFile(rel_path, sha256, size, ext, mimetype, created)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
 
-def save_comprobante(file_storage, tenant_id: int) -> str:
+
+def save_comprobante(file_storage) -> StoredFile:
+    """Comprobante subido (werkzeug FileStorage): valida nombre y lo guarda con store_proof_stream."""
     if not file_storage or not getattr(file_storage, "filename", ""):
-        raise ValueError("Archivo requerido")
+        raise StorageError("Archivo requerido")
 
-    filename = secure_filename(file_storage.filename)
-    _, ext = os.path.splitext(filename)
-    ext = ext.lower()
+    ext = os.path.splitext(secure_filename(file_storage.filename))[1].lower()
+    if ext and ext not in ALLOWED_EXTS:
+        raise StorageError("Formato no permitido. Usa PDF/JPG/PNG")
+    return store_proof_stream(file_storage.stream)
 
-    if ext not in ALLOWED_EXTS:
-        raise ValueError("Formato no permitido. Usa PDF, PNG, JPG o JPEG")
 
-    base_name = f"{uuid.uuid4().hex}{ext}"
-    folder = os.path.join(current_app.config["UPLOAD_FOLDER"], "suscripciones", str(tenant_id))
-    os.makedirs(folder, exist_ok=True)
+def proof_file(stored_path):
+    """
+    (ruta absoluta, mimetype) de un comprobante guardado, o None si no existe.
+    Acepta las rutas absolutas antiguas (comprobantes/<tenant>/<fecha>_<nombre>).
+    """
+    if not stored_path:
+        return None
+    path = stored_path if os.path.isabs(stored_path) else os.path.join(_upload_root(), stored_path)
+    if not os.path.isfile(path):
+        return None
+    ext = os.path.splitext(path)[1].lower()
+    mimetype = _MIMETYPES.get(".jpg" if ext == ".jpeg" else ext, "application/octet-stream")
+    return path, mimetype
+
+
+def is_content_addressed(stored_path) -> bool:
+    return bool(stored_path) and not os.path.isabs(stored_path) and stored_path.startswith(PROOF_BLOB_DIR + "/")
+
+
+def proof_etag(stored_path):
+    """El nombre del archivo direccionado por contenido ES su hash: ETag fuerte gratis."""
+    if not is_content_addressed(stored_path):
+        return None
+    return os.path.splitext(os.path.basename(stored_path))[0]
+
+
+def import_report_dir(tenant_id: int) -> str:
+    return os.path.join(current_app.config["UPLOAD_FOLDER"], "import_reports", str(tenant_id))
+
 
-    path = os.path.join(folder, base_name)
-    file_storage.save(path)
-    return path
+def import_report_ttl() -> float:
+    return float(current_app.config.get("IMPORT_REPORT_TTL_HOURS", DEFAULT_REPORT_TTL_HOURS)) * 3600
+
+
+def import_report_expired(path) -> bool:
+    return time.time() - os.path.getmtime(path) > import_report_ttl()
+
+
+def purge_import_reports(tenant_id=None) -> int:
+    """Borra los reportes vencidos (IMPORT_REPORT_TTL_HOURS) de un tenant o de todos."""
+    if tenant_id is not None:
+        folders = [import_report_dir(tenant_id)]
+    else:
+        root = os.path.join(current_app.config["UPLOAD_FOLDER"], "import_reports")
+        folders = [entry.path for entry in os.scandir(root) if entry.is_dir()] if os.path.isdir(root) else []
+
+    removed = 0
+    for folder in folders:
+        if not os.path.isdir(folder):
+            continue
+        for entry in os.scandir(folder):
+            try:
+                if entry.name.endswith(".csv") and import_report_expired(entry.path):
+                    os.remove(entry.path)
+                    removed += 1
+            except FileNotFoundError:
+                pass  # otro proceso lo borró primero
+    return removed
+
+
+def save_import_report(tenant_id: int, write_rows) -> str:
+    """
+    Guarda un reporte CSV (write_rows(file) escribe el contenido) y devuelve su token.
+    El token es el nombre del archivo: solo hex, no admite rutas.
+    De paso borra los reportes vencidos de ese tenant.
+    """
+    purge_import_reports(tenant_id)
+    token = uuid.uuid4().hex
+    folder = import_report_dir(tenant_id)
+    os.makedirs(folder, exist_ok=True)
+    with open(os.path.join(folder, f"{token}.csv"), "w", encoding="utf-8", newline="") as fh:
+        write_rows(fh)
+    return token
@@ -0,0 +1,166 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, update
+
+from ..models import IndiceBusqueda, Microempresa, Suscripcion, SuscripcionSolicitud, db
+from .identity_cache import identity_cache
+
+MAX_BULK_REVIEW = 500
+
+SIN_MICROEMPRESA = "Microempresa no encontrada"
+SIN_SOLICITUD = "No hay solicitud en espera"
+SIN_PLAN = "Solicitud sin plan seleccionado"
+
+
+class RevisionError(ValueError):
+    """Lote de revisión inválido (no de un tenant en particular)."""
+
+
+def _tenant_ids(raw, field) -> list:
+    if raw is None:
+        return []
+    if not isinstance(raw, list):
+        raise RevisionError(f"{field} debe ser una lista de tenant_id")
+    try:
+        ids = [int(value) for value in raw]
+    except (TypeError, ValueError):
+        raise RevisionError(f"{field} debe ser una lista de tenant_id") from None
+    return list(dict.fromkeys(ids))  # sin duplicados, mismo orden
+
+
+def parse_review(payload) -> tuple[list, list]:
+    aprobar = _tenant_ids(payload.get("aprobar"), "aprobar")
+    rechazar = _tenant_ids(payload.get("rechazar"), "rechazar")
+    if not aprobar and not rechazar:
+        raise RevisionError("Nada que revisar: envía aprobar y/o rechazar")
+    if set(aprobar) & set(rechazar):
+        raise RevisionError("Un tenant no puede estar en aprobar y rechazar a la vez")
+    if len(aprobar) + len(rechazar) > MAX_BULK_REVIEW:
+        raise RevisionError(f"Máximo {MAX_BULK_REVIEW} microempresas por lote")
+    return aprobar, rechazar
+
+
+def _latest_solicitudes(tenant_ids) -> dict:
+    """{tenant_id: (id_solicitud, estado, id_plan)} de la última solicitud de cada tenant (una consulta)."""
+    latest = (
+        db.session.query(func.max(SuscripcionSolicitud.id_solicitud))
+        .filter(SuscripcionSolicitud.tenant_id.in_(tenant_ids))
+        .group_by(SuscripcionSolicitud.tenant_id)
+    )
+    rows = db.session.query(
+        SuscripcionSolicitud.tenant_id,
+        SuscripcionSolicitud.id_solicitud,
+        SuscripcionSolicitud.estado,
+        SuscripcionSolicitud.id_plan,
+    ).filter(SuscripcionSolicitud.id_solicitud.in_(latest.scalar_subquery()))
+    return {row.tenant_id: (row.id_solicitud, row.estado, row.id_plan) for row in rows}
+
+
+def _close_solicitudes(ids, estado, now, revisor_id, observacion) -> list:
+    """
+    UPDATE condicional (solo las que siguen en_espera) con RETURNING: si otro revisor
+    ganó la carrera, esa solicitud simplemente no vuelve.
+    """
+    if not ids:
+        return []
+    stmt = (
+        update(SuscripcionSolicitud)
+        .where(SuscripcionSolicitud.id_solicitud.in_(ids), SuscripcionSolicitud.estado == "en_espera")
+        .values(estado=estado, revisado_en=now, revisado_por=revisor_id, observacion=observacion)
+        .returning(SuscripcionSolicitud.tenant_id, SuscripcionSolicitud.id_plan)
+        .execution_options(synchronize_session=False)
+    )
+    return db.session.execute(stmt).all()
+
+
+def _set_microempresa_estado(tenant_ids, estado) -> None:
+    if not tenant_ids:
+        return
+    db.session.execute(
+        update(Microempresa)
+        .where(Microempresa.tenant_id.in_(tenant_ids))
+        .values(estado=estado)
+        .execution_options(synchronize_session=False)
+    )
+    # índice global: solo cambia el estado (el resto de la entrada sigue igual)
+    db.session.execute(
+        update(IndiceBusqueda)
+        .where(IndiceBusqueda.tipo == "microempresa", IndiceBusqueda.ref_id.in_(tenant_ids))
+        .values(estado=estado)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def review_signups(aprobar, rechazar, *, revisor_id, observacion=None, days=30) -> dict:
+    """
+    Aprueba y/o rechaza la última solicitud en_espera de cada tenant, por conjuntos (sin commit):
+    - una consulta para las últimas solicitudes de todos los tenants
+    - un UPDATE condicional por decisión (+ microempresa e índice de búsqueda)
+    - un INSERT multi-fila de Suscripcion para las aprobadas
+    Devuelve {"aprobadas": [...], "rechazadas": [...], "omitidas": [{"tenant_id", "error"}]}.
+    """
+    requested = aprobar + rechazar
+    existing = {
+        tenant_id
+        for (tenant_id,) in db.session.query(Microempresa.tenant_id).filter(Microempresa.tenant_id.in_(requested))
+    }
+    latest = _latest_solicitudes(requested)
+
+    rechazar_set = set(rechazar)
+    omitidas = {}
+    to_approve, to_reject = [], []
+    for tenant_id in requested:
+        id_solicitud, estado, id_plan = latest.get(tenant_id, (None, None, None))
+        if tenant_id not in existing:
+            omitidas[tenant_id] = SIN_MICROEMPRESA
+        elif estado != "en_espera":
+            omitidas[tenant_id] = SIN_SOLICITUD
+        elif tenant_id in rechazar_set:
+            to_reject.append(id_solicitud)
+        elif not id_plan:
+            omitidas[tenant_id] = SIN_PLAN
+        else:
+            to_approve.append(id_solicitud)
+
+    now = datetime.utcnow()
+    observacion = (observacion or "").strip() or None
+    approved = _close_solicitudes(to_approve, "aprobado", now, revisor_id, observacion)
+    rejected = _close_solicitudes(to_reject, "rechazado", now, revisor_id, observacion)
+
+    aprobadas = [row.tenant_id for row in approved]
+    rechazadas = [row.tenant_id for row in rejected]
+    for tenant_id in requested:
+        if tenant_id not in omitidas and tenant_id not in aprobadas and tenant_id not in rechazadas:
+            omitidas[tenant_id] = SIN_SOLICITUD  # la revisó otro mientras tanto
+
+    _set_microempresa_estado(aprobadas, "activo")
+    _set_microempresa_estado(rechazadas, "inactivo")
+    if approved:
+        db.session.execute(
+            insert(Suscripcion),
+            [
+                {
+                    "tenant_id": row.tenant_id,
+                    "id_plan": row.id_plan,
+                    "estado": "activa",
+                    "fecha_inicio": now,
+                    "fecha_fin": now + timedelta(days=days),
+                }
+                for row in approved
+            ],
+        )
+
+    return {
+        "aprobadas": aprobadas,
+        "rechazadas": rechazadas,
+        "omitidas": [{"tenant_id": tenant_id, "error": error} for tenant_id, error in omitidas.items()],
+    }
+
+
+def invalidate_reviewed(result) -> None:
+    """
+    Después del commit: el caché de identidades de este worker no debe servir el estado
+    anterior (los demás lo detectan al revalidar: el UPDATE cambió updated_at).
+    """
+    for tenant_id in result["aprobadas"] + result["rechazadas"]:
+        identity_cache.invalidate(f"microempresa:{tenant_id}")
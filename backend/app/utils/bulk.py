@@ -0,0 +1,44 @@
+import csv
+import io
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DBAPIError
+
+from ..extensions import db
+
+
+def copy_rows(table_name, columns, rows) -> None:
+    """
+    COPY ... FROM STDIN en la conexión (y transacción) de la sesión. None -> NULL.
+    Los errores del driver se relanzan como excepciones de SQLAlchemy
+    (ej. UniqueViolation -> IntegrityError), igual que en db.session.execute.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(["" if row[col] is None else row[col] for col in columns])
+    buffer.seek(0)
+
+    statement = f"COPY {table_name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+    dbapi = db.session.get_bind().dialect.dbapi
+    raw = db.session.connection().connection.dbapi_connection
+    try:
+        with raw.cursor() as cursor:
+            cursor.copy_expert(statement, buffer)
+    except dbapi.Error as exc:
+        # copy_expert va directo al driver: SQLAlchemy no envuelve sus errores
+        raise DBAPIError.instance(statement, None, exc, dbapi.Error) from exc
+
+
+def bulk_insert(model, columns, rows) -> None:
+    """
+    Inserta filas ya completas (sin commit, sin eventos del ORM):
+    COPY en Postgres, executemany en otras bases.
+    Las filas deben traer todas las columnas de `columns` (COPY no aplica defaults de Python).
+    """
+    if not rows:
+        return
+    if db.session.get_bind().dialect.name == "postgresql":
+        copy_rows(model.__tablename__, columns, rows)
+    else:
+        db.session.execute(insert(model), rows)
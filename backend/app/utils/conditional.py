@@ -0,0 +1,75 @@
+import hashlib
+from datetime import timezone
+
+from flask import current_app, request
+from flask_login import current_user
+from sqlalchemy import func
+
+# el navegador guarda la respuesta pero revalida siempre (If-None-Match/If-Modified-Since)
+CACHE_CONTROL = "private, no-cache"
+
+
+def _viewer() -> str:
+    # la misma URL devuelve cosas distintas según quién la pide (tenant/rol)
+    if current_user.is_authenticated:
+        return str(current_user.get_id())
+    return "anon"
+
+
+def _as_utc(value):
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.replace(microsecond=0)
+
+
+def _etag(*parts) -> str:
+    raw = "|".join(str(part) for part in parts)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def collection_validators(query, updated_columns):
+    """
+    Validadores de un listado SIN leer ni serializar filas:
+    un solo SELECT count(*), max(updated_at)... sobre el mismo filtro del listado.
+    - una baja lógica o edición sube max(updated_at)
+    - un alta/borrado cambia count
+    Devuelve (etag, last_modified).
+    """
+    aggregates = [func.count()] + [func.max(col) for col in updated_columns]
+    row = query.order_by(None).with_entities(*aggregates).one()
+    count, maxima = row[0], [value for value in row[1:] if value is not None]
+    last_modified = max(maxima) if maxima else None
+
+    etag = _etag(request.full_path, _viewer(), count, *row[1:])
+    return etag, _as_utc(last_modified)
+
+
+def entity_validators(key, updated_at):
+    """Validadores de un detalle: identidad del recurso + su updated_at."""
+    etag = _etag(request.path, _viewer(), key, updated_at)
+    return etag, _as_utc(updated_at)
+
+
+def is_not_modified(etag, last_modified) -> bool:
+    # If-None-Match manda sobre If-Modified-Since (RFC 9110)
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    since = request.if_modified_since
+    if since and last_modified:
+        return last_modified <= since
+    return False
+
+
+def apply_validators(response, etag, last_modified):
+    response.set_etag(etag, weak=True)
+    if last_modified:
+        response.last_modified = last_modified
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    return response
+
+
+def not_modified_response(etag, last_modified):
+    response = current_app.response_class(status=304)
+    return apply_validators(response, etag, last_modified)
@@ -0,0 +1,124 @@
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+
+from flask import Response, request, stream_with_context
+
+EXPORT_BATCH_SIZE = 1000
+# se envía al cliente en bloques de ~64 KB (no una escritura por fila)
+CHUNK_SIZE = 64 * 1024
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+}
+
+# Excel ejecuta celdas que empiezan así (inyección de fórmulas)
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+class ExportError(ValueError):
+    pass
+
+
+def export_args() -> tuple[str, bool]:
+    """?format=csv|ndjson (csv por defecto) y ?gzip=1."""
+    fmt = (request.args.get("format") or "csv").strip().lower()
+    if fmt not in EXPORT_FORMATS:
+        raise ExportError("format inválido (csv, ndjson)")
+    gzip = (request.args.get("gzip") or "").strip().lower() in {"1", "true", "si", "yes"}
+    return fmt, gzip
+
+
+def _json_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _csv_chunks(headers, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # BOM: Excel abre el archivo como UTF-8 (la importación CSV lo ignora)
+    buffer.write("\ufeff")
+    writer.writerow(headers)
+    for row in rows:
+        writer.writerow([_csv_value(value) for value in row])
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _ndjson_chunks(headers, rows):
+    lines, size = [], 0
+    for row in rows:
+        line = json.dumps(
+            {header: _json_value(value) for header, value in zip(headers, row)},
+            ensure_ascii=False,
+            default=str,
+        )
+        lines.append(line)
+        size += len(line) + 1
+        if size >= CHUNK_SIZE:
+            yield "\n".join(lines) + "\n"
+            lines, size = [], 0
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+def _gzipped(chunks):
+    # wbits=31: formato gzip (no zlib crudo), un solo compresor para todo el stream
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_response(name, query, *, fmt="csv", gzip=False, batch_size=EXPORT_BATCH_SIZE):
+    """
+    Exporta una consulta de columnas (ya con .label() y ORDER BY) como descarga en stream.
+    - yield_per -> stream_results: en Postgres usa un cursor del lado del servidor,
+      la memoria del worker no depende del número de filas
+    - las filas son tuplas (no entidades ORM): no se llenan el identity map
+    - gzip=True comprime sobre la marcha y descarga <name>.<ext>.gz
+    """
+    mimetype, ext = EXPORT_FORMATS[fmt]
+    headers = [column["name"] for column in query.column_descriptions]
+    rows = query.yield_per(batch_size)
+
+    def generate():
+        chunks = _csv_chunks(headers, rows) if fmt == "csv" else _ndjson_chunks(headers, rows)
+        encoded = (chunk.encode("utf-8") for chunk in chunks)
+        yield from _gzipped(encoded) if gzip else encoded
+
+    filename = f"{name}.{ext}"
+    if gzip:
+        mimetype, filename = "application/gzip", f"{filename}.gz"
+
+    response = Response(stream_with_context(generate()), mimetype=mimetype)
+    response.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    response.headers["Cache-Control"] = "no-store"
+    # nginx: enviar cada bloque apenas se genera, sin acumular la respuesta
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
@@ -0,0 +1,79 @@
+"""
+Entrega de archivos protegidos (comprobantes, miniaturas, reportes) según FILE_DELIVERY:
+
+- direct:     el worker envía el archivo (send_file: Range/If-Range/206, condicionales,
+              wsgi.file_wrapper -> sendfile() si el servidor WSGI lo soporta)
+- x-sendfile: el worker solo autoriza; Apache (mod_xsendfile) o lighttpd envían el archivo
+- x-accel:    el worker solo autoriza; nginx envía el archivo desde una location interna:
+
+    location /_protected/ {
+        internal;
+        alias /ruta/a/backend/uploads/;   # = UPLOAD_FOLDER
+    }
+
+En los dos modos de proxy el tiempo del worker ya no depende del tamaño del archivo
+ni del ancho de banda de quien descarga (el proxy resuelve Range y el envío).
+"""
+import os
+from urllib.parse import quote
+
+from flask import current_app, request, send_file
+
+DELIVERY_MODES = ("direct", "x-sendfile", "x-accel")
+DEFAULT_ACCEL_PREFIX = "/_protected/"
+
+
+def _x_accel_response(path, *, mimetype, as_attachment, download_name, etag, max_age):
+    root = current_app.config["UPLOAD_FOLDER"]
+    rel = os.path.relpath(os.path.abspath(path), root)
+    if rel == os.curdir or rel.split(os.sep, 1)[0] == os.pardir:
+        return None  # fuera de UPLOAD_FOLDER: nginx no lo conoce, lo envía el worker
+
+    response = current_app.response_class(status=200, mimetype=mimetype)
+    if isinstance(etag, str):
+        response.set_etag(etag)
+        if request.if_none_match.contains(etag):
+            response.status_code = 304
+            return response
+
+    prefix = current_app.config["FILE_DELIVERY_ACCEL_PREFIX"].rstrip("/")
+    response.headers["X-Accel-Redirect"] = f"{prefix}/{quote(rel.replace(os.sep, '/'))}"
+    if as_attachment or download_name:
+        response.headers.set(
+            "Content-Disposition",
+            "attachment" if as_attachment else "inline",
+            filename=download_name or os.path.basename(path),
+        )
+    if max_age is not None:
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+    return response
+
+
+def send_protected_file(path, *, mimetype, as_attachment=False, download_name=None, etag=True, max_age=None):
+    """
+    Envía un archivo ya autorizado según FILE_DELIVERY.
+    etag: str (ETag fuerte propio, ej. el hash del contenido), True (el de werkzeug) o None.
+    """
+    if current_app.config["FILE_DELIVERY"] == "x-accel":
+        response = _x_accel_response(
+            path,
+            mimetype=mimetype,
+            as_attachment=as_attachment,
+            download_name=download_name,
+            etag=etag,
+            max_age=max_age,
+        )
+        if response is not None:
+            return response
+
+    # direct y x-sendfile (USE_X_SENDFILE lo activa dentro de send_file)
+    return send_file(
+        path,
+        mimetype=mimetype,
+        as_attachment=as_attachment,
+        download_name=download_name,
+        etag=etag,
+        conditional=True,
+        max_age=max_age,
+    )
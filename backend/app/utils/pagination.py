@@ -0,0 +1,141 @@
+import base64
+import binascii
+import json
+
+from flask import Response, jsonify, request, stream_with_context
+from sqlalchemy import tuple_
+
+from .conditional import (
+    apply_validators,
+    collection_validators,
+    is_not_modified,
+    not_modified_response,
+)
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+STREAM_BATCH_SIZE = 500
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+
+class PaginationError(ValueError):
+    pass
+
+
+def encode_cursor(values) -> str:
+    raw = json.dumps(list(values), separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(raw: str, size: int) -> list:
+    try:
+        padded = raw + "=" * (-len(raw) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, ValueError, UnicodeError):
+        raise PaginationError("Cursor inválido")
+    if not isinstance(values, list) or len(values) != size:
+        raise PaginationError("Cursor inválido")
+    return values
+
+
+def page_args() -> tuple[int, str | None]:
+    """
+    Lee ?limit= y ?cursor= del request actual.
+    - limit se acota a MAX_PAGE_SIZE
+    - cursor es opaco para el cliente (lo devuelve next_cursor)
+    """
+    raw_limit = (request.args.get("limit") or "").strip()
+    if raw_limit:
+        try:
+            limit = int(raw_limit)
+        except ValueError:
+            raise PaginationError("limit inválido")
+        if limit < 1:
+            raise PaginationError("limit inválido")
+    else:
+        limit = DEFAULT_PAGE_SIZE
+    cursor = (request.args.get("cursor") or "").strip() or None
+    return min(limit, MAX_PAGE_SIZE), cursor
+
+
+def wants_stream() -> bool:
+    if (request.args.get("format") or "").strip().lower() == "ndjson":
+        return True
+    return request.accept_mimetypes.best == NDJSON_MIMETYPE
+
+
+def _row_key(row, columns):
+    return [getattr(row, col.key) for col in columns]
+
+
+def keyset_page(query, columns, serialize, *, limit, cursor=None, descending=False, key=None):
+    """
+    Paginación por keyset: ORDER BY columns + WHERE (columns) > (cursor).
+    Las columnas deben ser únicas en conjunto (terminar en la PK) y estar indexadas.
+    """
+    key = key or (lambda row: _row_key(row, columns))
+
+    if cursor:
+        values = decode_cursor(cursor, len(columns))
+        bound = tuple_(*columns)
+        query = query.filter(bound < tuple_(*values) if descending else bound > tuple_(*values))
+
+    order = [col.desc() if descending else col.asc() for col in columns]
+    rows = query.order_by(*order).limit(limit + 1).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = encode_cursor(key(rows[-1])) if has_more and rows else None
+    return [serialize(row) for row in rows], next_cursor
+
+
+def ndjson_response(query, columns, serialize, *, descending=False):
+    """
+    Exporta todo el resultado como NDJSON (una fila por línea) usando yield_per,
+    así la memoria del worker no depende del tamaño de la tabla.
+    """
+    order = [col.desc() if descending else col.asc() for col in columns]
+    streamed = query.order_by(*order).yield_per(STREAM_BATCH_SIZE)
+
+    def generate():
+        for row in streamed:
+            yield json.dumps(serialize(row), ensure_ascii=False, default=str) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
+
+
+def paginated_response(items_key, query, columns, serialize, *, descending=False, key=None, versioned=None):
+    """
+    Respuesta estándar para listados:
+    - ?format=ndjson (o Accept: application/x-ndjson): stream completo
+    - por defecto: {items_key: [...], "next_cursor": "..."}
+    - versioned: columnas updated_at del listado -> ETag/Last-Modified y 304 si no cambió
+    """
+    validators = None
+    if versioned:
+        validators = collection_validators(query, versioned)
+        if is_not_modified(*validators):
+            return not_modified_response(*validators)
+
+    try:
+        if wants_stream():
+            response = ndjson_response(query, columns, serialize, descending=descending)
+        else:
+            limit, cursor = page_args()
+            items, next_cursor = keyset_page(
+                query,
+                columns,
+                serialize,
+                limit=limit,
+                cursor=cursor,
+                descending=descending,
+                key=key,
+            )
+            response = jsonify({items_key: items, "next_cursor": next_cursor})
+    except PaginationError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    if validators:
+        apply_validators(response, *validators)
+    return response, 200
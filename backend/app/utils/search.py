@@ -0,0 +1,70 @@
+import re
+import unicodedata
+
+from sqlalchemy import case, func, literal, or_
+
+_SPACES_RE = re.compile(r"\s+")
+
+MIN_QUERY_LENGTH = 2
+MAX_TOKENS = 5
+# trigramas: con menos de 3 letras no hay tolerancia a errores, solo "contiene"
+MIN_FUZZY_TOKEN = 3
+
+
+class BusquedaError(ValueError):
+    pass
+
+
+def normalize_search(*parts) -> str:
+    """
+    Texto de búsqueda: minúsculas, sin tildes y con espacios simples.
+    Se aplica igual al guardar y al consultar ("Núñez" encuentra "nunez").
+    """
+    text = " ".join(str(part) for part in parts if part)
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return _SPACES_RE.sub(" ", text).strip().lower()
+
+
+def like_escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def parse_query(q) -> tuple[str, list[str]]:
+    term = normalize_search(q)
+    if len(term) < MIN_QUERY_LENGTH:
+        raise BusquedaError(f"q debe tener al menos {MIN_QUERY_LENGTH} caracteres")
+    return term, term.split()[:MAX_TOKENS]
+
+
+def match_conditions(column, tokens, *, fuzzy) -> list:
+    """
+    Cada palabra debe aparecer (LIKE '%palabra%') o, con fuzzy (pg_trgm), parecerse:
+    column %> palabra  ==  word_similarity(palabra, column) >= umbral.
+    Ambas condiciones las resuelve un índice GIN gin_trgm_ops sobre column.
+    """
+    conditions = []
+    for token in tokens:
+        contains = column.like(f"%{like_escape(token)}%", escape="\\")
+        if fuzzy and len(token) >= MIN_FUZZY_TOKEN:
+            conditions.append(or_(contains, column.op("%>")(token)))
+        else:
+            conditions.append(contains)
+    return conditions
+
+
+def rank_columns(column, term, *, fuzzy) -> tuple:
+    """(coincide al inicio de una palabra, similitud) para ORDER BY ... DESC."""
+    escaped = like_escape(term)
+    prefix = case(
+        (
+            or_(
+                column.like(f"{escaped}%", escape="\\"),
+                column.like(f"% {escaped}%", escape="\\"),
+            ),
+            1,
+        ),
+        else_=0,
+    )
+    score = func.word_similarity(term, column) if fuzzy else literal(0.0)
+    return prefix, score
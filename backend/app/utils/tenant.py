@@ -0,0 +1,30 @@
+from flask import jsonify
+from flask_login import current_user
+
+from ..models import Microempresa, db
+from ..services.auth_service import get_current_role
+
+
+def resolve_tenant_id(raw_tenant_id=None):
+    """
+    tenant_id SIEMPRE desde backend para microempresa (se ignora lo que llegue).
+    super_usuario debe indicar el tenant explícitamente (?tenant_id= o payload.tenant_id).
+    Devuelve (tenant_id, error_response).
+    """
+    if not current_user.is_authenticated:
+        return None, (jsonify({"error": "No autorizado"}), 403)
+
+    role = get_current_role(current_user)
+    if role == "microempresa":
+        return current_user.tenant_id, None
+
+    if role != "super_usuario":
+        return None, (jsonify({"error": "No autorizado"}), 403)
+
+    try:
+        tenant_id = int(raw_tenant_id)
+    except (TypeError, ValueError):
+        return None, (jsonify({"error": "tenant_id requerido para super_usuario"}), 400)
+    if not db.session.get(Microempresa, tenant_id):
+        return None, (jsonify({"error": "Microempresa no encontrada"}), 404)
+    return tenant_id, None
@@ -13,3 +13,10 @@ def cliente_item(cliente):
 
 def cliente_detail(cliente):
     return cliente.to_dict()
+
+
+def cliente_dashboard_item(cliente, microempresa_nombre):
+    item = cliente_item(cliente)
+    item["tenant_id"] = cliente.tenant_id
+    item["microempresa_nombre"] = microempresa_nombre
+    return item
@@ -0,0 +1,14 @@
+def producto_item(producto):
+    return {
+        "id": producto.id_producto,
+        "codigo": producto.codigo,
+        "nombre": producto.nombre,
+        "precio_unitario": float(producto.precio_unitario or 0),
+        "stock": producto.stock,
+        "stock_minimo": producto.stock_minimo,
+        "estado": producto.estado,
+    }
+
+
+def producto_detail(producto):
+    return producto.to_dict()
@@ -0,0 +1,435 @@
+"""
+Benchmark de los endpoints calientes: login, me, dashboard (cada rol), clientes, plans y onboarding.
+
+Arranca create_app() contra la BD de DATABASE_URL (Postgres) o la de --database-url
+(p. ej. sqlite:////tmp/bench.sqlite para una corrida local), siembra --tenants microempresas
+con --clientes clientes cada una y, por escenario, lanza --threads hilos que hacen
+--requests requests cada uno (con su propio test client y su propia sesión).
+
+Uso (desde backend/):
+    python -m benchmarks.endpoints_benchmark --tenants 50 --clientes 200 --threads 8 --requests 100 \
+        --output bench-$(git rev-parse --short HEAD).json
+    python -m benchmarks.endpoints_benchmark --output bench-nuevo.json --baseline bench-anterior.json
+
+El JSON trae commit, backend de BD, parámetros y, por escenario: requests, errores (status >= 400),
+req/s y latencia en ms (min/avg/p50/p90/p95/p99/max). Con --baseline agrega la variación de
+p95 y req/s contra un reporte anterior. Los datos sembrados llevan el tag bench-<tag> y se
+borran al terminar (--keep para conservarlos).
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import threading
+import time
+import uuid
+
+from sqlalchemy import BigInteger, insert
+from sqlalchemy.ext.compiler import compiles
+
+SCENARIOS = (
+    "login",
+    "me",
+    "dashboard_super_usuario",
+    "dashboard_microempresa",
+    "dashboard_cliente",
+    "clientes_super_usuario",
+    "clientes_microempresa",
+    "plans",
+    "onboarding",
+)
+PASSWORD = "bench-password"
+
+
+@compiles(BigInteger, "sqlite")
+def _sqlite_bigint(_type, _compiler, **_kw):
+    # SQLite solo autoincrementa PKs INTEGER (los modelos usan BigInteger para Postgres)
+    return "INTEGER"
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True, timeout=5
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+# ============================
+# Datos sembrados
+# ============================
+def _seed(tag, tenants, clientes_per_tenant):
+    from app.extensions import db
+    from app.models import AdminSu, Cliente, Microempresa, Plan
+    from app.services.auth_service import hash_password
+    from app.services.plan_catalog import bump_catalog_version, invalidate_plan_catalog
+
+    # un solo hash para todas las filas: sembrar no debe costar N scrypt
+    password = hash_password(PASSWORD)
+    admin = AdminSu(
+        nombre="Bench",
+        apellido_paterno="Bench",
+        apellido_materno="Bench",
+        email=f"bench-{tag}-admin@example.com",
+        password=password,
+        estado="activo",
+    )
+    plan = Plan(nombre=f"bench-{tag}", precio=10, estado="activo")
+    db.session.add_all([admin, plan])
+    bump_catalog_version()
+    db.session.flush()
+
+    micro_rows = [
+        {
+            "nombre": f"bench-{tag}-{t}",
+            "direccion": "bench",
+            "horario_atencion": "Atención online",
+            "nombre_propietario": "Bench",
+            "apellido_paterno_propietario": "Bench",
+            "apellido_materno_propietario": "Bench",
+            "email": f"bench-{tag}-m{t}@example.com",
+            "password": password,
+            "estado": "activo",
+        }
+        for t in range(tenants)
+    ]
+    tenant_ids = list(
+        db.session.scalars(insert(Microempresa).returning(Microempresa.tenant_id, sort_by_parameter_order=True), micro_rows)
+    )
+
+    for tenant_id in tenant_ids:
+        rows = []
+        for n in range(clientes_per_tenant):
+            values = {
+                "nombre": f"Cliente{n}",
+                "apellido_paterno": f"Bench{n % 97}",
+                "apellido_materno": "Bench",
+                "razon_social": None,
+                "email": f"bench-{tag}-c{tenant_id}-{n}@example.com",
+            }
+            # insert masivo: no pasa por el before_insert que calcula busqueda
+            rows.append(
+                {
+                    **values,
+                    "tenant_id": tenant_id,
+                    "password": password,
+                    "estado": "activo",
+                    "busqueda": Cliente.search_text(values),
+                }
+            )
+        if rows:
+            db.session.execute(insert(Cliente), rows)
+
+    db.session.commit()
+    invalidate_plan_catalog()
+    return {
+        "admin_email": admin.email,
+        "id_plan": plan.id_plan,
+        "tenants": [
+            {"tenant_id": tenant_id, "email": row["email"]} for tenant_id, row in zip(tenant_ids, micro_rows)
+        ],
+    }
+
+
+def _cleanup(tag):
+    from app.extensions import db
+    from app.models import AdminSu, Cliente, IndiceBusqueda, Microempresa, Plan, SuscripcionSolicitud
+    from app.services.plan_catalog import bump_catalog_version, invalidate_plan_catalog
+    from app.services.storage_service import proof_file
+
+    pattern = f"bench-{tag}-%"
+    tenant_ids = db.session.query(Microempresa.tenant_id).filter(Microempresa.email.like(pattern))
+    tenant_ids = [tenant_id for (tenant_id,) in tenant_ids]
+    admin_ids = [id_su for (id_su,) in db.session.query(AdminSu.id_su).filter(AdminSu.email.like(pattern))]
+
+    if tenant_ids:
+        solicitudes = SuscripcionSolicitud.query.filter(SuscripcionSolicitud.tenant_id.in_(tenant_ids))
+        proofs = {path for (path,) in solicitudes.with_entities(SuscripcionSolicitud.comprobante_path) if path}
+        solicitudes.delete(synchronize_session=False)
+        # almacén por contenido: solo se borra el archivo si nadie más lo referencia
+        shared = {
+            path
+            for (path,) in db.session.query(SuscripcionSolicitud.comprobante_path).filter(
+                SuscripcionSolicitud.comprobante_path.in_(proofs)
+            )
+        }
+        for path in proofs - shared:
+            found = proof_file(path)
+            if found:
+                os.remove(found[0])
+        IndiceBusqueda.query.filter(IndiceBusqueda.tenant_id.in_(tenant_ids)).delete(synchronize_session=False)
+        Cliente.query.filter(Cliente.tenant_id.in_(tenant_ids)).delete(synchronize_session=False)
+        Microempresa.query.filter(Microempresa.tenant_id.in_(tenant_ids)).delete(synchronize_session=False)
+    if admin_ids:
+        IndiceBusqueda.query.filter(
+            IndiceBusqueda.tipo == "admin", IndiceBusqueda.ref_id.in_(admin_ids)
+        ).delete(synchronize_session=False)
+        AdminSu.query.filter(AdminSu.id_su.in_(admin_ids)).delete(synchronize_session=False)
+
+    Plan.query.filter(Plan.nombre == f"bench-{tag}").delete(synchronize_session=False)
+    bump_catalog_version()
+    db.session.commit()
+    invalidate_plan_catalog()
+
+
+# ============================
+# Escenarios
+# ============================
+def _timed(samples, name, call, *args, **kwargs):
+    start = time.perf_counter()
+    response = call(*args, **kwargs)
+    samples.append((name, response.status_code, time.perf_counter() - start))
+    return response
+
+
+def _login(client, email, role):
+    response = client.post("/api/login", json={"email": email, "password": PASSWORD, "role": role})
+    if response.status_code != 200:
+        raise RuntimeError(f"login {role} {email}: {response.status_code} {response.get_data(as_text=True)[:200]}")
+
+
+def _identity(seed, role, worker):
+    """Email con que inicia sesión el hilo `worker` en ese rol (repartidos entre tenants)."""
+    if role == "super_usuario":
+        return seed["admin_email"]
+    tenant = seed["tenants"][worker % len(seed["tenants"])]
+    if role == "microempresa":
+        return tenant["email"]
+    return f"bench-{seed['tag']}-c{tenant['tenant_id']}-0@example.com"
+
+
+def _scenario(name, seed, worker, upload_kb):
+    """Devuelve (rol con sesión previa o None, función(client, i, samples))."""
+    def get(path):
+        return lambda client, _i, samples: _timed(samples, name, client.get, path)
+
+    if name == "login":
+        email = _identity(seed, "microempresa", worker)
+
+        def run(client, _i, samples):
+            _timed(samples, name, client.post, "/api/login", json={"email": email, "password": PASSWORD})
+
+        return None, run
+
+    if name == "me":
+        return "microempresa", get("/api/me")
+    if name.startswith("dashboard_"):
+        return name[len("dashboard_"):], get("/api/dashboard")
+    if name.startswith("clientes_"):
+        return name[len("clientes_"):], get("/api/clientes")
+    if name == "plans":
+        return None, get("/api/plans")
+
+    if name == "onboarding":
+        comprobante = b"%PDF-1.4\n" + os.urandom(max(0, upload_kb * 1024 - 9))
+
+        def run(client, i, samples):
+            key = f"bench-{seed['tag']}-o{worker}-{i}"
+            start = _timed(
+                samples,
+                "onboarding_start",
+                client.post,
+                "/api/onboarding/microempresa/start",
+                json={
+                    "tipo_tienda": "virtual",
+                    "nombre": key,
+                    "nombre_propietario": "Bench",
+                    "apellido_paterno_propietario": "Bench",
+                    "apellido_materno_propietario": "Bench",
+                    "email": f"{key}@example.com",
+                    "password": PASSWORD,
+                },
+            )
+            if start.status_code != 201:
+                return
+            _timed(
+                samples,
+                "onboarding_submit",
+                client.post,
+                "/api/onboarding/microempresa/submit",
+                data={
+                    "signup_id": str(start.get_json()["signup_id"]),
+                    "id_plan": str(seed["id_plan"]),
+                    "file": (io.BytesIO(comprobante), "comprobante.pdf"),
+                },
+                content_type="multipart/form-data",
+            )
+
+        return None, run
+
+    raise ValueError(f"Escenario desconocido: {name}")
+
+
+def _summary(latencies, errors, elapsed):
+    latencies = sorted(latencies)
+    measured = len(latencies)
+
+    def pct(p):
+        return round(latencies[min(measured - 1, int(p * measured))] * 1000, 3)
+
+    if not measured:
+        return {"requests": 0, "errors": errors}
+    return {
+        "requests": measured,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(measured / elapsed, 1) if elapsed else None,
+        "latency_ms": {
+            "min": round(latencies[0] * 1000, 3),
+            "avg": round(sum(latencies) / measured * 1000, 3),
+            "p50": pct(0.50),
+            "p90": pct(0.90),
+            "p95": pct(0.95),
+            "p99": pct(0.99),
+            "max": round(latencies[-1] * 1000, 3),
+        },
+    }
+
+
+def _run(app, name, seed, args):
+    samples = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(args.threads)
+    failures = []
+
+    def worker(index):
+        role, run = _scenario(name, seed, index, args.upload_kb)
+        client = app.test_client()
+        local = []
+        try:
+            if role:
+                _login(client, _identity(seed, role, index), role)
+            for i in range(args.warmup):
+                run(client, f"w{i}", [])
+        except Exception as exc:  # noqa: BLE001 - se reporta en el JSON
+            failures.append(str(exc))
+            barrier.abort()
+            return
+        try:
+            barrier.wait()
+        except threading.BrokenBarrierError:
+            return
+        for i in range(args.requests):
+            run(client, i, local)
+        with lock:
+            samples.extend(local)
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(args.threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    if failures:
+        return {name: {"failed": failures[0]}}
+
+    by_name = {}
+    for sample_name, status, seconds in samples:
+        latencies, errors = by_name.setdefault(sample_name, ([], [0]))
+        latencies.append(seconds)
+        if status >= 400:
+            errors[0] += 1
+    return {
+        sample_name: _summary(latencies, errors[0], elapsed)
+        for sample_name, (latencies, errors) in by_name.items()
+    }
+
+
+def _compare(results, baseline):
+    """Variación relativa (%) de p95 y req/s contra un reporte anterior."""
+    deltas = {}
+    for name, current in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous or "latency_ms" not in previous or "latency_ms" not in current:
+            continue
+
+        def change(new, old):
+            return round((new - old) / old * 100, 1) if old else None
+
+        deltas[name] = {
+            "p95_ms": [previous["latency_ms"]["p95"], current["latency_ms"]["p95"]],
+            "p95_change_pct": change(current["latency_ms"]["p95"], previous["latency_ms"]["p95"]),
+            "rps_change_pct": change(current["requests_per_second"], previous["requests_per_second"]),
+        }
+    return {"commit": baseline.get("commit"), "scenarios": deltas}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--database-url", help="por defecto DATABASE_URL")
+    parser.add_argument("--tenants", type=int, default=20)
+    parser.add_argument("--clientes", type=int, default=100, help="clientes por tenant")
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=50, help="requests por hilo y escenario")
+    parser.add_argument("--warmup", type=int, default=3, help="requests por hilo sin medir")
+    parser.add_argument("--upload-kb", type=int, default=64, help="tamaño del comprobante de onboarding")
+    parser.add_argument(
+        "--scenarios", default=",".join(SCENARIOS), help=f"separados por coma ({', '.join(SCENARIOS)})"
+    )
+    parser.add_argument("--output", help="archivo JSON (por defecto stdout)")
+    parser.add_argument("--baseline", help="reporte JSON anterior para comparar")
+    parser.add_argument("--keep", action="store_true", help="no borrar los datos sembrados")
+    args = parser.parse_args()
+
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = [s for s in scenarios if s not in SCENARIOS]
+    if unknown:
+        parser.error(f"escenarios desconocidos: {', '.join(unknown)}")
+    if args.tenants < 1 or args.clientes < 1:
+        parser.error("--tenants y --clientes deben ser >= 1")
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    # el hilo del outbox de correo no forma parte de lo que se mide
+    os.environ.setdefault("MAIL_OUTBOX_THREAD", "0")
+
+    from app import create_app
+    from app.extensions import db
+
+    app = create_app()
+    tag = uuid.uuid4().hex[:8]
+    with app.app_context():
+        db.create_all()
+        started = time.perf_counter()
+        seed = _seed(tag, args.tenants, args.clientes)
+        seed_seconds = time.perf_counter() - started
+        backend = db.engine.dialect.name
+    seed["tag"] = tag
+
+    report = {
+        "commit": _git_commit(),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "database": backend,
+        "db_profile": app.config["DB_PROFILE"],
+        "python": platform.python_version(),
+        "params": {k: v for k, v in vars(args).items() if k not in ("output", "baseline", "database_url")},
+        "seed_seconds": round(seed_seconds, 3),
+        "results": {},
+    }
+    try:
+        for name in scenarios:
+            report["results"].update(_run(app, name, seed, args))
+    finally:
+        if not args.keep:
+            with app.app_context():
+                _cleanup(tag)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fh:
+            report["baseline"] = _compare(report["results"], json.load(fh))
+
+    body = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            fh.write(body + "\n")
+    print(body)
+
+
+if __name__ == "__main__":
+    main()
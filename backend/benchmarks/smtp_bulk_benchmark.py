@@ -0,0 +1,114 @@
+"""
+Benchmark del envío masivo de correos contra un sink SMTP local (aiosmtpd).
+
+Compara:
+- send_email:  una conexión (connect + EHLO + login) por mensaje
+- send_bulk:   pool de conexiones reutilizadas
+
+Uso (desde backend/):
+    pip install aiosmtpd
+    python -m benchmarks.smtp_bulk_benchmark --messages 500 --connections 3 --handshake-ms 20
+
+--handshake-ms simula la latencia de EHLO de un relay real (un sink local responde en ~0 ms).
+Imprime un JSON con los mensajes/s de cada modo.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+from flask import Flask
+
+from app.services.mail_service import send_bulk, send_email
+
+try:
+    from aiosmtpd.controller import Controller
+except ImportError:  # pragma: no cover - dependencia solo de benchmark
+    sys.exit("Falta aiosmtpd: pip install aiosmtpd")
+
+
+class SinkHandler:
+    def __init__(self, handshake_ms):
+        self.handshake_ms = handshake_ms
+        self.received = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        if self.handshake_ms:
+            await asyncio.sleep(self.handshake_ms / 1000)
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        return "250 OK"
+
+
+def _run(label, fn, count):
+    start = time.perf_counter()
+    results = fn()
+    elapsed = time.perf_counter() - start
+    ok = sum(1 for r in results if r["ok"]) if results else count
+    return {
+        "mode": label,
+        "messages": count,
+        "ok": ok,
+        "seconds": round(elapsed, 3),
+        "messages_per_second": round(count / elapsed, 1) if elapsed else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=300)
+    parser.add_argument("--connections", type=int, default=3)
+    parser.add_argument("--handshake-ms", type=float, default=20)
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--skip-single", action="store_true", help="no medir send_email uno a uno")
+    args = parser.parse_args()
+
+    handler = SinkHandler(args.handshake_ms)
+    controller = Controller(handler, hostname="127.0.0.1", port=args.port)
+    controller.start()
+
+    app = Flask(__name__)
+    app.config.update(
+        MAIL_HOST="127.0.0.1",
+        MAIL_PORT=args.port,
+        MAIL_USE_TLS="0",
+        MAIL_USER=None,
+        MAIL_PASS=None,
+        MAIL_FROM="bench@localhost",
+    )
+    messages = [
+        (f"tenant{i}@example.com", "Aviso de planes", "Cambios en los planes.\n")
+        for i in range(args.messages)
+    ]
+
+    report = {"params": vars(args), "results": []}
+    try:
+        with app.app_context():
+            if not args.skip_single:
+                def single():
+                    for to_email, subject, body in messages:
+                        send_email(to_email, subject, body)
+                    return None
+
+                report["results"].append(_run("send_email", single, len(messages)))
+
+            report["results"].append(
+                _run(
+                    "send_bulk",
+                    lambda: send_bulk(messages, connections=args.connections),
+                    len(messages),
+                )
+            )
+    finally:
+        controller.stop()
+
+    report["sink_received"] = handler.received
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Benchmark de contención de stock: muchos hilos vendiendo el MISMO SKU a la vez.
+
+Compara:
+- read_modify_write:  SELECT stock -> resta en Python -> UPDATE -> commit (lo ingenuo)
+- conditional_update: place_order() -> UPDATE ... WHERE stock >= qty RETURNING
+
+Uso (desde backend/, contra la BD de DATABASE_URL; pensado para Postgres):
+    python -m benchmarks.stock_contention_benchmark --threads 32 --orders 50 --stock 1000
+
+Crea una microempresa y un producto temporales y los borra al terminar.
+Imprime un JSON por modo: ventas aceptadas/rechazadas, stock final, stock esperado
+según las ventas aceptadas (lost_updates > 0 = se vendió de más) y ventas/s.
+"""
+import argparse
+import json
+import threading
+import time
+import uuid
+
+from sqlalchemy import BigInteger
+from sqlalchemy.ext.compiler import compiles
+
+from app import create_app
+from app.extensions import db
+from app.models import (
+    AlertaStock,
+    Microempresa,
+    MovimientoStock,
+    Producto,
+    StockSnapshot,
+    Venta,
+    VentaDetalle,
+)
+from app.services.sales_service import StockInsuficiente, place_order
+
+
+@compiles(BigInteger, "sqlite")
+def _sqlite_bigint(_type, _compiler, **_kw):
+    # SQLite solo autoincrementa PKs INTEGER (los modelos usan BigInteger para Postgres)
+    return "INTEGER"
+
+
+def _setup(stock):
+    tag = uuid.uuid4().hex[:8]
+    micro = Microempresa(
+        nombre=f"bench-{tag}",
+        direccion="bench",
+        horario_atencion="Atención online",
+        nombre_propietario="Bench",
+        apellido_paterno_propietario="Bench",
+        apellido_materno_propietario="Bench",
+        email=f"bench-{tag}@example.com",
+        password="-",
+        estado="activo",
+    )
+    db.session.add(micro)
+    db.session.flush()
+    producto = Producto(
+        tenant_id=micro.tenant_id,
+        codigo="HOT",
+        nombre="SKU caliente",
+        precio_unitario=1,
+        stock=stock,
+    )
+    db.session.add(producto)
+    db.session.commit()
+    return micro.tenant_id, producto.id_producto
+
+
+def _teardown(tenant_id):
+    # primero lo que referencia a venta/producto (libro de stock, snapshots, alertas)
+    AlertaStock.query.filter(AlertaStock.tenant_id == tenant_id).delete(synchronize_session=False)
+    MovimientoStock.query.filter(MovimientoStock.tenant_id == tenant_id).delete(synchronize_session=False)
+    StockSnapshot.query.filter(StockSnapshot.tenant_id == tenant_id).delete(synchronize_session=False)
+    ventas = db.session.query(Venta.id_venta).filter(Venta.tenant_id == tenant_id)
+    VentaDetalle.query.filter(VentaDetalle.id_venta.in_(ventas.scalar_subquery())).delete(synchronize_session=False)
+    Venta.query.filter(Venta.tenant_id == tenant_id).delete(synchronize_session=False)
+    Producto.query.filter(Producto.tenant_id == tenant_id).delete(synchronize_session=False)
+    Microempresa.query.filter(Microempresa.tenant_id == tenant_id).delete(synchronize_session=False)
+    db.session.commit()
+
+
+def _read_modify_write(tenant_id, id_producto, qty):
+    producto = db.session.get(Producto, id_producto)
+    if producto.stock < qty:
+        db.session.rollback()
+        raise StockInsuficiente([])
+    producto.stock = producto.stock - qty
+    db.session.commit()
+
+
+def _conditional_update(tenant_id, id_producto, qty):
+    place_order(tenant_id, [{"id_producto": id_producto, "cantidad": qty}])
+
+
+def _run(app, label, sell, args):
+    with app.app_context():
+        tenant_id, id_producto = _setup(args.stock)
+
+    counters = {"ok": 0, "rejected": 0, "errors": 0}
+    lock = threading.Lock()
+    barrier = threading.Barrier(args.threads)
+
+    def worker():
+        with app.app_context():
+            barrier.wait()
+            for _ in range(args.orders):
+                try:
+                    sell(tenant_id, id_producto, args.qty)
+                    key = "ok"
+                except StockInsuficiente:
+                    key = "rejected"
+                except Exception:
+                    db.session.rollback()
+                    key = "errors"
+                with lock:
+                    counters[key] += 1
+            db.session.remove()
+
+    threads = [threading.Thread(target=worker) for _ in range(args.threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    with app.app_context():
+        final_stock = db.session.get(Producto, id_producto).stock
+        _teardown(tenant_id)
+
+    expected = args.stock - counters["ok"] * args.qty
+    return {
+        "mode": label,
+        "orders": args.threads * args.orders,
+        **counters,
+        "final_stock": final_stock,
+        "expected_stock": expected,
+        "lost_updates": final_stock - expected,
+        "seconds": round(elapsed, 3),
+        "orders_per_second": round(args.threads * args.orders / elapsed, 1) if elapsed else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--orders", type=int, default=50, help="ventas por hilo")
+    parser.add_argument("--qty", type=int, default=1)
+    parser.add_argument("--stock", type=int, default=500)
+    parser.add_argument("--skip-naive", action="store_true", help="no medir read_modify_write")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+
+    report = {"params": vars(args), "results": []}
+    if not args.skip_naive:
+        report["results"].append(_run(app, "read_modify_write", _read_modify_write, args))
+    report["results"].append(_run(app, "conditional_update", _conditional_update, args))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -139,6 +139,7 @@ export default function App() {
       setDashboardData(null);
       return;
     }
+    // ✅ para super_usuario solo trae conteos; cada vista pide su listado paginado
     const { data } = await fetchDashboard();
     setDashboardData(data);
   };
@@ -502,54 +503,60 @@ export default function App() {
     const { response, data } = await deactivateMicroempresa(tenantId);
     if (!response.ok) {
       setMessage(data.error || "Ocurrió un error");
-      return;
+      return false;
     }
     await loadDashboard();
+    return true;
   };
 
   const handleDeactivateCliente = async (clienteId) => {
     const { response, data } = await deactivateCliente(clienteId);
     if (!response.ok) {
       setMessage(data.error || "Ocurrió un error");
-      return;
+      return false;
     }
     await loadDashboard();
+    return true;
   };
 
   const handleDeactivateAdmin = async (adminId) => {
     const { response, data } = await deactivateAdmin(adminId);
     if (!response.ok) {
       setMessage(data.error || "Ocurrió un error");
-      return;
+      return false;
     }
     await loadDashboard();
+    return true;
   };
 
   const handleActivateMicroempresa = async (tenantId) => {
     const { response, data } = await activateMicroempresa(tenantId);
     if (!response.ok) {
       setMessage(data.error || "Ocurrió un error");
-      return;
+      return false;
     }
     await loadDashboard();
+    return true;
   };
 
   const handleActivateCliente = async (clienteId) => {
     const { response, data } = await activateCliente(clienteId);
     if (!response.ok) {
       setMessage(data.error || "Ocurrió un error");
-      return;
+      return false;
     }
     await loadDashboard();
+    return true;
   };
 
   const handleActivateAdmin = async (adminId) => {
     const { response, data } = await activateAdmin(adminId);
     if (!response.ok) {
       setMessage(data.error || "Ocurrió un error");
-      return;
+      return false;
     }
     await loadDashboard();
+    return true;
   };
 
   const dashboardRoutes = () => {
@@ -589,7 +596,6 @@ export default function App() {
             path="/microempresas"
             element={
               <SuperUsuarioMicroempresas
-                items={dashboardData?.microempresas || []}
                 onDeactivate={handleDeactivateMicroempresa}
                 onActivate={handleActivateMicroempresa}
               />
@@ -599,17 +605,16 @@ export default function App() {
             path="/clientes"
             element={
               <SuperUsuarioClientes
-                items={dashboardData?.clientes || []}
-                microempresas={dashboardData?.microempresas || []}
                 onDeactivate={handleDeactivateCliente}
                 onActivate={handleActivateCliente}
                 onUpdate={async (id, payload) => {
                   const { response, data } = await updateCliente(id, payload);
                   if (!response.ok) {
                     setMessage(data.error || "Ocurrió un error");
-                    return;
+                    return false;
                   }
                   await loadDashboard();
+                  return true;
                 }}
               />
             }
@@ -618,7 +623,6 @@ export default function App() {
             path="/superusuarios"
             element={
               <SuperUsuarioAdmins
-                items={dashboardData?.admins || []}
                 onDeactivate={handleDeactivateAdmin}
                 onActivate={handleActivateAdmin}
                 currentAdminId={user?.id_su}
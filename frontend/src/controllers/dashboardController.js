@@ -1,3 +1,5 @@
+import { useCallback, useEffect, useState } from "react";
+
 const API_BASE = process.env.REACT_APP_API_BASE || "";
 
 export const fetchDashboard = async () => {
@@ -6,3 +8,70 @@ export const fetchDashboard = async () => {
   });
   return response.json().then((data) => ({ response, data }));
 };
+
+// Listados del super_usuario (paginados por cursor)
+export const fetchDashboardList = async (lista, { estado, tenant_id, cursor, limit } = {}) => {
+  const params = new URLSearchParams();
+  if (estado) params.set("estado", estado);
+  if (tenant_id) params.set("tenant_id", String(tenant_id));
+  if (cursor) params.set("cursor", cursor);
+  if (limit) params.set("limit", String(limit));
+  const qs = params.toString();
+  const response = await fetch(`${API_BASE}/api/dashboard/${lista}${qs ? `?${qs}` : ""}`, {
+    credentials: "include",
+  });
+  return response.json().then((data) => ({ response, data }));
+};
+
+/*
+  Un listado de /api/dashboard/<lista> por vista: pide la primera página al montar
+  (o al cambiar los filtros) y las siguientes con next_cursor ("Cargar más").
+  reload() vuelve a la primera página (ej. tras activar/inactivar).
+*/
+export const useDashboardList = (lista, { estado, tenantId } = {}) => {
+  const [items, setItems] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loading, setLoading] = useState(false);
+  const [error, setError] = useState("");
+  const [version, setVersion] = useState(0);
+
+  useEffect(() => {
+    let cancelled = false;
+    setLoading(true);
+    setError("");
+    fetchDashboardList(lista, { estado, tenant_id: tenantId }).then(({ response, data }) => {
+      if (cancelled) return;
+      if (!response.ok) {
+        setItems([]);
+        setNextCursor(null);
+        setError(data.error || "No se pudo cargar el listado.");
+      } else {
+        setItems(data[lista] || []);
+        setNextCursor(data.next_cursor || null);
+      }
+      setLoading(false);
+    });
+    return () => {
+      cancelled = true;
+    };
+  }, [lista, estado, tenantId, version]);
+
+  const loadMore = useCallback(async () => {
+    if (!nextCursor) return;
+    const { response, data } = await fetchDashboardList(lista, {
+      estado,
+      tenant_id: tenantId,
+      cursor: nextCursor,
+    });
+    if (!response.ok) {
+      setError(data.error || "No se pudo cargar el listado.");
+      return;
+    }
+    setItems((prev) => [...prev, ...(data[lista] || [])]);
+    setNextCursor(data.next_cursor || null);
+  }, [lista, estado, tenantId, nextCursor]);
+
+  const reload = useCallback(() => setVersion((v) => v + 1), []);
+
+  return { items, nextCursor, loading, error, loadMore, reload };
+};
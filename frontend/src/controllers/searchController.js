@@ -0,0 +1,73 @@
+import { useCallback, useEffect, useState } from "react";
+
+const API_BASE = process.env.REACT_APP_API_BASE || "";
+
+// Búsqueda global del super_usuario (índice en el backend, paginado por cursor)
+export const searchGlobal = async (q, { tipo, estado, tenant_id, cursor, limit } = {}) => {
+  const params = new URLSearchParams({ q });
+  if (tipo) params.set("tipo", tipo);
+  if (estado) params.set("estado", estado);
+  if (tenant_id) params.set("tenant_id", String(tenant_id));
+  if (cursor) params.set("cursor", cursor);
+  if (limit) params.set("limit", String(limit));
+  const response = await fetch(`${API_BASE}/api/buscar?${params.toString()}`, {
+    credentials: "include",
+  });
+  return response.json().then((data) => ({ response, data }));
+};
+
+const SEARCH_PAGE = 50;
+
+const toItems = (data) => (data.resultados || []).map((r) => r.item).filter(Boolean);
+
+/*
+  Typeahead sobre /api/buscar para un tipo (microempresa, cliente, admin).
+  results es null mientras no hay búsqueda (la vista muestra su listado normal)
+  o la lista de items (mismo formato que /api/dashboard/<lista>); loadMore pide
+  la siguiente página del ranking (nextCursor).
+  tenantId filtra en el backend; `version` fuerza a repetir la búsqueda
+  (ej. tras editar un resultado).
+*/
+export const useGlobalSearch = (tipo, q, { version = 0, tenantId } = {}) => {
+  const [results, setResults] = useState(null);
+  const [nextCursor, setNextCursor] = useState(null);
+  const query = (q || "").trim();
+
+  useEffect(() => {
+    if (query.length < 2) {
+      setResults(null);
+      setNextCursor(null);
+      return undefined;
+    }
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      const { response, data } = await searchGlobal(query, {
+        tipo,
+        tenant_id: tenantId,
+        limit: SEARCH_PAGE,
+      });
+      if (cancelled) return;
+      setResults(response.ok ? toItems(data) : []);
+      setNextCursor(response.ok ? data.next_cursor || null : null);
+    }, 250);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [tipo, query, tenantId, version]);
+
+  const loadMore = useCallback(async () => {
+    if (!nextCursor) return;
+    const { response, data } = await searchGlobal(query, {
+      tipo,
+      tenant_id: tenantId,
+      cursor: nextCursor,
+      limit: SEARCH_PAGE,
+    });
+    if (!response.ok) return;
+    setResults((prev) => [...(prev || []), ...toItems(data)]);
+    setNextCursor(data.next_cursor || null);
+  }, [tipo, query, tenantId, nextCursor]);
+
+  return { results, nextCursor, loadMore };
+};
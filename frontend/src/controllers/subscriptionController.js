@@ -65,14 +65,28 @@ export const getOnboardingStatus = async (signup_id) => {
 // ==============================
 // SUPER USUARIO: pendientes
 // ==============================
-export const fetchPendingMicroempresas = async () => {
-  const response = await fetch(`${API_BASE}/api/onboarding/microempresa/pending`, {
+// Paginado por cursor: la siguiente página se pide con el next_cursor de la anterior
+export const fetchPendingMicroempresas = async ({ cursor } = {}) => {
+  const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : "";
+  const response = await fetch(`${API_BASE}/api/onboarding/microempresa/pending${query}`, {
     credentials: "include",
   });
   const data = await safeJson(response);
   return { response, data };
 };
 
+// Revisión en lote: { aprobar: [tenant_id...], rechazar: [tenant_id...], observacion }
+export const reviewPendingMicroempresas = async ({ aprobar = [], rechazar = [], observacion } = {}) => {
+  const response = await fetch(`${API_BASE}/api/onboarding/microempresa/review`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    credentials: "include",
+    body: JSON.stringify({ aprobar, rechazar, observacion }),
+  });
+  const data = await safeJson(response);
+  return { response, data };
+};
+
 export const approvePendingMicroempresa = async (tenant_id) => {
   const response = await fetch(
     `${API_BASE}/api/onboarding/microempresa/${encodeURIComponent(String(tenant_id))}/approve`,
@@ -100,8 +114,10 @@ export const rejectPendingMicroempresa = async (tenant_id) => {
 // ==============================
 // SUPER USUARIO: CRUD PLANES
 // ==============================
-export const fetchAllPlansAdmin = async () => {
-  const response = await fetch(`${API_BASE}/api/admin/plans`, {
+// Paginado por cursor, igual que pendientes
+export const fetchAllPlansAdmin = async ({ cursor } = {}) => {
+  const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : "";
+  const response = await fetch(`${API_BASE}/api/admin/plans${query}`, {
     credentials: "include",
   });
   const data = await safeJson(response);
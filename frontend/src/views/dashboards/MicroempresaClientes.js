@@ -5,11 +5,12 @@ import SectionCard from "../SectionCard";
 /*
   MicroempresaClientes
   - Tabla con columnas (similar a superusuario).
-  - Búsqueda por nombre/email/razón social.
+  - Búsqueda por nombre/email/razón social en el backend (/api/clientes/buscar, tolera errores de tipeo).
   - Checkbox "Mostrar todos" incluye inactivos.
   - Registrar cliente: pide password SOLO aquí (backend lo hashea).
   - Editar cliente inline en tabla: NO pide password.
   - Cambiar estado (PATCH activate/deactivate) con colores y botones Activar/Inactivar.
+  - Listado paginado por cursor: "Cargar más" pide la siguiente página (next_cursor).
 */
 
 async function apiGet(path) {
@@ -75,9 +76,13 @@ export default function MicroempresaClientes() {
   const [clientes, setClientes] = useState([]);
   const [loading, setLoading] = useState(true);
   const [message, setMessage] = useState("");
+  const [nextCursor, setNextCursor] = useState(null);
 
   const [showAll, setShowAll] = useState(false);
   const [q, setQ] = useState("");
+  // resultados del backend mientras hay búsqueda (null = listado normal)
+  const [searchResults, setSearchResults] = useState(null);
+  const [searchVersion, setSearchVersion] = useState(0);
 
   // Formulario SOLO para registro
   const [showRegister, setShowRegister] = useState(false);
@@ -110,49 +115,74 @@ export default function MicroempresaClientes() {
 
   const normalize = (v) => (v || "").toString().toLowerCase().trim();
 
+  const normalizeClientes = (raw) =>
+    (raw || []).map((c) => ({
+      ...c,
+      id_cliente: c.id_cliente ?? c.id,
+    }));
+
   const loadClientes = async () => {
     setLoading(true);
     setMessage("");
+    setSearchVersion((v) => v + 1); // tras registrar/editar, la búsqueda activa se repite
     try {
       const data = await apiGet("/api/clientes");
-      const raw = data.clientes || [];
-      const normalized = raw.map((c) => ({
-        ...c,
-        id_cliente: c.id_cliente ?? c.id,
-      }));
-      setClientes(normalized);
+      setClientes(normalizeClientes(data.clientes));
+      setNextCursor(data.next_cursor || null);
     } catch (e) {
       setMessage(e.message);
       setClientes([]);
+      setNextCursor(null);
     } finally {
       setLoading(false);
     }
   };
 
+  const loadMoreClientes = async () => {
+    if (!nextCursor) return;
+    setMessage("");
+    try {
+      const data = await apiGet(`/api/clientes?cursor=${encodeURIComponent(nextCursor)}`);
+      setClientes((prev) => [...prev, ...normalizeClientes(data.clientes)]);
+      setNextCursor(data.next_cursor || null);
+    } catch (e) {
+      setMessage(e.message);
+    }
+  };
+
   useEffect(() => {
     loadClientes();
   }, []);
 
-  const filteredClientes = useMemo(() => {
-    const query = normalize(q);
-
-    return (clientes || [])
-      .filter((c) => (showAll ? true : normalize(c.estado) === "activo"))
-      .filter((c) => {
-        if (!query) return true;
-        const haystack = [
-          c.nombre,
-          c.apellido_paterno,
-          c.apellido_materno,
-          c.email,
-          c.razon_social,
-        ]
-          .filter(Boolean)
-          .map(normalize)
-          .join(" ");
-        return haystack.includes(query);
-      });
-  }, [clientes, showAll, q]);
+  // typeahead: espera a que el usuario deje de escribir y descarta respuestas viejas
+  useEffect(() => {
+    const query = q.trim();
+    if (query.length < 2) {
+      setSearchResults(null);
+      return undefined;
+    }
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      try {
+        const data = await apiGet(`/api/clientes/buscar?q=${encodeURIComponent(query)}&limit=50`);
+        if (!cancelled) setSearchResults(normalizeClientes(data.clientes));
+      } catch (e) {
+        if (!cancelled) setMessage(e.message);
+      }
+    }, 250);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [q, searchVersion]);
+
+  const filteredClientes = useMemo(
+    () =>
+      (searchResults ?? clientes ?? []).filter((c) =>
+        showAll ? true : normalize(c.estado) === "activo"
+      ),
+    [clientes, searchResults, showAll]
+  );
 
   const onToggleShowAll = (e) => setShowAll(e.target.checked);
 
@@ -588,6 +618,14 @@ export default function MicroempresaClientes() {
             </table>
           </div>
         )}
+
+        {!loading && nextCursor && searchResults === null && (
+          <div style={{ marginTop: 12, textAlign: "center" }}>
+            <button type="button" className="ghost-button" onClick={loadMoreClientes}>
+              Cargar más
+            </button>
+          </div>
+        )}
       </div>
     </SectionCard>
   );
@@ -26,6 +26,10 @@ const MicroempresaDashboard = ({ displayName, dashboardData }) => (
           <span>Productos</span>
           <strong>{dashboardData?.counts?.productos ?? 0}</strong>
         </div>
+        <div className="summary-card">
+          <span>Stock bajo</span>
+          <strong>{dashboardData?.counts?.stock_bajo ?? 0}</strong>
+        </div>
       </div>
     </SectionCard>
     <SectionCard title="Mi empresa">
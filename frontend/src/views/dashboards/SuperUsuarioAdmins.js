@@ -1,45 +1,84 @@
+import { useState } from "react";
 import SectionCard from "../SectionCard";
+import { useDashboardList } from "../../controllers/dashboardController";
+import { useGlobalSearch } from "../../controllers/searchController";
 
 const buildFullName = (item) =>
   [item?.nombre, item?.apellido_paterno, item?.apellido_materno]
     .filter(Boolean)
     .join(" ");
 
-const SuperUsuarioAdmins = ({ items, onDeactivate, onActivate, currentAdminId }) => (
-  <SectionCard title="Superusuarios">
-    <div className="data-list">
-      {items.length === 0 && <p className="muted">Sin superusuarios registrados.</p>}
-      {items.map((item) => (
-        <div className="data-row" key={item.id_su}>
-          <div>
-            <div>{buildFullName(item)}</div>
-            <div className="muted">{item.email}</div>
-          </div>
-          <div className="row-actions">
-            <span className="muted">{item.estado}</span>
-            {item.estado === "activo" && item.id_su !== currentAdminId && (
-              <button
-                type="button"
-                className="danger-button"
-                onClick={() => onDeactivate(item.id_su)}
-              >
-                Inactivar
-              </button>
-            )}
-            {item.estado === "inactivo" && (
-              <button
-                type="button"
-                className="ghost-button"
-                onClick={() => onActivate(item.id_su)}
-              >
-                Activar
-              </button>
-            )}
+const SuperUsuarioAdmins = ({ onDeactivate, onActivate, currentAdminId }) => {
+  const [q, setQ] = useState("");
+  const { items, nextCursor, loading, error, loadMore, reload } = useDashboardList("admins");
+  const {
+    results: searchResults,
+    nextCursor: searchCursor,
+    loadMore: loadMoreResults,
+  } = useGlobalSearch("admin", q, { version: items });
+  const shown = searchResults ?? items;
+
+  const changeEstado = async (action, id) => {
+    if (await action(id)) reload();
+  };
+
+  return (
+    <SectionCard title="Superusuarios">
+      <input
+        placeholder="Buscar por nombre o email"
+        value={q}
+        onChange={(e) => setQ(e.target.value)}
+        style={{ minWidth: 260, marginBottom: 12 }}
+      />
+      {error && <p className="error">{error}</p>}
+      <div className="data-list">
+        {!loading && shown.length === 0 && (
+          <p className="muted">{searchResults ? "Sin resultados." : "Sin superusuarios registrados."}</p>
+        )}
+        {shown.map((item) => (
+          <div className="data-row" key={item.id_su}>
+            <div>
+              <div>{buildFullName(item)}</div>
+              <div className="muted">{item.email}</div>
+            </div>
+            <div className="row-actions">
+              <span className="muted">{item.estado}</span>
+              {item.estado === "activo" && item.id_su !== currentAdminId && (
+                <button
+                  type="button"
+                  className="danger-button"
+                  onClick={() => changeEstado(onDeactivate, item.id_su)}
+                >
+                  Inactivar
+                </button>
+              )}
+              {item.estado === "inactivo" && (
+                <button
+                  type="button"
+                  className="ghost-button"
+                  onClick={() => changeEstado(onActivate, item.id_su)}
+                >
+                  Activar
+                </button>
+              )}
+            </div>
           </div>
+        ))}
+      </div>
+
+      {!loading && (searchResults === null ? nextCursor : searchCursor) && (
+        <div style={{ marginTop: 12, textAlign: "center" }}>
+          <button
+            type="button"
+            className="ghost-button"
+            onClick={searchResults === null ? loadMore : loadMoreResults}
+          >
+            Cargar más
+          </button>
         </div>
-      ))}
-    </div>
-  </SectionCard>
-);
+      )}
+    </SectionCard>
+  );
+};
 
 export default SuperUsuarioAdmins;
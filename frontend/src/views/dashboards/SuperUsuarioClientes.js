@@ -1,5 +1,7 @@
 import React, { useMemo, useState } from "react";
 import SectionCard from "../SectionCard";
+import { useDashboardList } from "../../controllers/dashboardController";
+import { useGlobalSearch } from "../../controllers/searchController";
 
 const buildFullName = (item) =>
   [item?.nombre, item?.apellido_paterno, item?.apellido_materno]
@@ -24,16 +26,20 @@ const headCell = {
   borderBottom: "1px solid rgba(0,0,0,0.14)",
 };
 
-const SuperUsuarioClientes = ({
-  items,
-  microempresas,
-  onDeactivate,
-  onActivate,
-  onUpdate,
-}) => {
+const SuperUsuarioClientes = ({ onDeactivate, onActivate, onUpdate }) => {
   const [q, setQ] = useState("");
   const [tenantFilter, setTenantFilter] = useState("");
 
+  // el filtro por microempresa va al backend: no se filtra solo la página cargada
+  const { items, nextCursor, loading, error, loadMore, reload } = useDashboardList("clientes", {
+    tenantId: tenantFilter,
+  });
+  const {
+    items: microempresas,
+    nextCursor: microempresasCursor,
+    loadMore: loadMoreMicroempresas,
+  } = useDashboardList("microempresas");
+
   const [editingId, setEditingId] = useState(null);
   const [form, setForm] = useState({
     nombre: "",
@@ -43,33 +49,16 @@ const SuperUsuarioClientes = ({
     razon_social: "",
   });
 
-  const normalize = (v) => (v || "").toString().toLowerCase().trim();
-
-  const filtered = useMemo(() => {
-    const query = normalize(q);
-
-    return (items || [])
-      .filter((c) => {
-        if (!tenantFilter) return true;
-        return String(c.tenant_id ?? "") === String(tenantFilter);
-      })
-      .filter((c) => {
-        if (!query) return true;
-
-        const haystack = [
-          buildFullName(c),
-          c.email,
-          c.razon_social,
-          String(c.tenant_id ?? ""),
-          c.microempresa_nombre,
-        ]
-          .filter(Boolean)
-          .map(normalize)
-          .join(" ");
-
-        return haystack.includes(query);
-      });
-  }, [items, q, tenantFilter]);
+  // con texto, busca en el índice del backend (no solo en la página cargada)
+  // la microempresa elegida también acota la búsqueda en el backend
+  const {
+    results: searchResults,
+    nextCursor: searchCursor,
+    loadMore: loadMoreResults,
+  } = useGlobalSearch("cliente", q, { version: items, tenantId: tenantFilter });
+
+  const shown = searchResults ?? items;
+  const shownCursor = searchResults === null ? nextCursor : searchCursor;
 
   const tenantNameById = useMemo(() => {
     const map = new Map();
@@ -118,10 +107,14 @@ const SuperUsuarioClientes = ({
       email: (form.email || "").trim(),
     };
 
-    await onUpdate(id, payload);
+    if (await onUpdate(id, payload)) reload();
     cancelEdit();
   };
 
+  const changeEstado = async (action, id) => {
+    if (await action(id)) reload();
+  };
+
   return (
     <SectionCard title="Clientes">
       <div
@@ -150,12 +143,24 @@ const SuperUsuarioClientes = ({
               </option>
             ))}
           </select>
+          {microempresasCursor && (
+            <button type="button" className="ghost-button" onClick={loadMoreMicroempresas}>
+              Más microempresas
+            </button>
+          )}
         </div>
 
-        <div className="muted">{filtered.length} cliente(s)</div>
+        <div className="muted">
+          {shown.length}
+          {shownCursor ? "+" : ""} cliente(s)
+        </div>
       </div>
 
-      {filtered.length === 0 ? (
+      {error && <p className="error">{error}</p>}
+
+      {loading ? (
+        <p className="muted">Cargando...</p>
+      ) : shown.length === 0 ? (
         <p className="muted">Sin clientes registrados.</p>
       ) : (
         <div style={{ overflowX: "auto" }}>
@@ -172,7 +177,7 @@ const SuperUsuarioClientes = ({
             </thead>
 
             <tbody>
-              {filtered.map((item) => {
+              {shown.map((item) => {
                 const id = item.id ?? item.id_cliente;
                 const tenantId = item.tenant_id;
 
@@ -206,7 +211,7 @@ const SuperUsuarioClientes = ({
                               <button
                                 type="button"
                                 className="danger-button"
-                                onClick={() => onDeactivate(id)}
+                                onClick={() => changeEstado(onDeactivate, id)}
                               >
                                 Inactivar
                               </button>
@@ -214,7 +219,7 @@ const SuperUsuarioClientes = ({
                               <button
                                 type="button"
                                 className="ghost-button"
-                                onClick={() => onActivate(id)}
+                                onClick={() => changeEstado(onActivate, id)}
                               >
                                 Activar
                               </button>
@@ -294,6 +299,18 @@ const SuperUsuarioClientes = ({
           </table>
         </div>
       )}
+
+      {!loading && shownCursor && (
+        <div style={{ marginTop: 12, textAlign: "center" }}>
+          <button
+            type="button"
+            className="ghost-button"
+            onClick={searchResults === null ? loadMore : loadMoreResults}
+          >
+            Cargar más
+          </button>
+        </div>
+      )}
     </SectionCard>
   );
 };
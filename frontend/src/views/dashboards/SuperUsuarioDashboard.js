@@ -1,3 +1,6 @@
+import React from "react";
+
+import { useDashboardList } from "../../controllers/dashboardController";
 import DataList from "../DataList";
 import SectionCard from "../SectionCard";
 
@@ -6,17 +9,30 @@ const buildFullName = (item) =>
     .filter(Boolean)
     .join(" ");
 
-const filterInactive = (items = []) => items.filter((item) => item.estado === "inactivo");
+// ✅ "En espera" = microempresas que no están activas (desde el GROUP BY del backend)
+const countPending = (porEstado = {}) =>
+  Object.entries(porEstado)
+    .filter(([estado]) => estado && estado !== "activo")
+    .reduce((acc, [, total]) => acc + total, 0);
 
-const countPending = (items = []) =>
-  items.filter((m) => m.estado && m.estado !== "activo").length;
+const LoadMore = ({ list }) =>
+  list.nextCursor ? (
+    <div style={{ marginTop: 12, textAlign: "center" }}>
+      <button type="button" className="ghost-button" onClick={list.loadMore}>
+        Cargar más
+      </button>
+    </div>
+  ) : null;
 
 const SuperUsuarioDashboard = ({ displayName, dashboardData }) => {
-  const inactiveAdmins = filterInactive(dashboardData?.admins);
-  const inactiveMicroempresas = filterInactive(dashboardData?.microempresas);
-  const inactiveClientes = filterInactive(dashboardData?.clientes);
+  // los inactivos se piden filtrados al backend, página a página
+  const inactiveAdmins = useDashboardList("admins", { estado: "inactivo" });
+  const inactiveMicroempresas = useDashboardList("microempresas", { estado: "inactivo" });
+  const inactiveClientes = useDashboardList("clientes", { estado: "inactivo" });
 
-  const pendingMicroempresas = countPending(dashboardData?.microempresas || []);
+  const pendingMicroempresas = countPending(
+    dashboardData?.breakdowns?.microempresas_por_estado
+  );
 
   return (
     <>
@@ -44,35 +60,38 @@ const SuperUsuarioDashboard = ({ displayName, dashboardData }) => {
 
       <SectionCard title="Superusuarios inactivos">
         <DataList
-          items={inactiveAdmins.map((item) => ({
+          items={inactiveAdmins.items.map((item) => ({
             id: item.id_su,
             label: buildFullName(item) || item.email,
             meta: item.email,
           }))}
           emptyLabel="No hay superusuarios inactivos."
         />
+        <LoadMore list={inactiveAdmins} />
       </SectionCard>
 
       <SectionCard title="Microempresas inactivas">
         <DataList
-          items={inactiveMicroempresas.map((item) => ({
+          items={inactiveMicroempresas.items.map((item) => ({
             id: item.tenant_id,
             label: item.nombre,
             meta: item.email,
           }))}
           emptyLabel="No hay microempresas inactivas."
         />
+        <LoadMore list={inactiveMicroempresas} />
       </SectionCard>
 
       <SectionCard title="Clientes inactivos">
         <DataList
-          items={inactiveClientes.map((item) => ({
+          items={inactiveClientes.items.map((item) => ({
             id: item.id,
             label: buildFullName(item) || item.email,
             meta: item.email,
           }))}
           emptyLabel="No hay clientes inactivos."
         />
+        <LoadMore list={inactiveClientes} />
       </SectionCard>
     </>
   );
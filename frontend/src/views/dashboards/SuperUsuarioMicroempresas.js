@@ -1,4 +1,7 @@
+import { useState } from "react";
 import SectionCard from "../SectionCard";
+import { useDashboardList } from "../../controllers/dashboardController";
+import { useGlobalSearch } from "../../controllers/searchController";
 
 const prettyTipo = (t) => {
   const v = String(t || "").toLowerCase();
@@ -21,52 +24,88 @@ const prettyDireccion = (d) => {
   return v;
 };
 
-const SuperUsuarioMicroempresas = ({ items, onDeactivate, onActivate }) => (
-  <SectionCard title="Microempresas">
-    <div className="data-list">
-      {items.length === 0 && <p className="muted">Sin microempresas registradas.</p>}
+const SuperUsuarioMicroempresas = ({ onDeactivate, onActivate }) => {
+  const [q, setQ] = useState("");
+  const { items, nextCursor, loading, error, loadMore, reload } = useDashboardList("microempresas");
+  const {
+    results: searchResults,
+    nextCursor: searchCursor,
+    loadMore: loadMoreResults,
+  } = useGlobalSearch("microempresa", q, { version: items });
+  const shown = searchResults ?? items;
 
-      {items.map((item) => (
-        <div className="data-row" key={item.tenant_id}>
-          <div>
-            <div style={{ fontWeight: 700 }}>{item.nombre}</div>
-            <div className="muted">{item.email}</div>
+  const changeEstado = async (action, tenantId) => {
+    if (await action(tenantId)) reload();
+  };
 
-            {/* ✅ NUEVO */}
-            <div className="muted">Tipo: {prettyTipo(item.tipo_tienda)}</div>
+  return (
+    <SectionCard title="Microempresas">
+      <input
+        placeholder="Buscar por nombre, propietario o email"
+        value={q}
+        onChange={(e) => setQ(e.target.value)}
+        style={{ minWidth: 260, marginBottom: 12 }}
+      />
+      {error && <p className="error">{error}</p>}
+      <div className="data-list">
+        {!loading && shown.length === 0 && (
+          <p className="muted">{searchResults ? "Sin resultados." : "Sin microempresas registradas."}</p>
+        )}
 
-            {/* opcional */}
-            <div className="muted">Dirección: {prettyDireccion(item.direccion)}</div>
-            <div className="muted">Horario: {prettyHorario(item.horario_atencion)}</div>
-          </div>
+        {shown.map((item) => (
+          <div className="data-row" key={item.tenant_id}>
+            <div>
+              <div style={{ fontWeight: 700 }}>{item.nombre}</div>
+              <div className="muted">{item.email}</div>
+
+              {/* ✅ NUEVO */}
+              <div className="muted">Tipo: {prettyTipo(item.tipo_tienda)}</div>
+
+              {/* opcional */}
+              <div className="muted">Dirección: {prettyDireccion(item.direccion)}</div>
+              <div className="muted">Horario: {prettyHorario(item.horario_atencion)}</div>
+            </div>
 
-          <div className="row-actions">
-            <span className="muted">{item.estado}</span>
+            <div className="row-actions">
+              <span className="muted">{item.estado}</span>
 
-            {item.estado === "activo" && (
-              <button
-                type="button"
-                className="danger-button"
-                onClick={() => onDeactivate(item.tenant_id)}
-              >
-                Inactivar
-              </button>
-            )}
+              {item.estado === "activo" && (
+                <button
+                  type="button"
+                  className="danger-button"
+                  onClick={() => changeEstado(onDeactivate, item.tenant_id)}
+                >
+                  Inactivar
+                </button>
+              )}
 
-            {item.estado === "inactivo" && (
-              <button
-                type="button"
-                className="ghost-button"
-                onClick={() => onActivate(item.tenant_id)}
-              >
-                Activar
-              </button>
-            )}
+              {item.estado === "inactivo" && (
+                <button
+                  type="button"
+                  className="ghost-button"
+                  onClick={() => changeEstado(onActivate, item.tenant_id)}
+                >
+                  Activar
+                </button>
+              )}
+            </div>
           </div>
+        ))}
+      </div>
+
+      {!loading && (searchResults === null ? nextCursor : searchCursor) && (
+        <div style={{ marginTop: 12, textAlign: "center" }}>
+          <button
+            type="button"
+            className="ghost-button"
+            onClick={searchResults === null ? loadMore : loadMoreResults}
+          >
+            Cargar más
+          </button>
         </div>
-      ))}
-    </div>
-  </SectionCard>
-);
+      )}
+    </SectionCard>
+  );
+};
 
 export default SuperUsuarioMicroempresas;
@@ -4,12 +4,15 @@ import {
   fetchPendingMicroempresas,
   approvePendingMicroempresa,
   rejectPendingMicroempresa,
+  reviewPendingMicroempresas,
 } from "../../controllers/subscriptionController";
 
 export default function SuperUsuarioPendientes({ reloadDashboard }) {
   const [items, setItems] = useState([]);
   const [loading, setLoading] = useState(false);
   const [message, setMessage] = useState("");
+  const [nextCursor, setNextCursor] = useState(null);
+  const [selected, setSelected] = useState([]);
 
   // Construye link absoluto al backend para abrir comprobante
   const buildProofLink = (proofUrlOrPath) => {
@@ -42,17 +45,67 @@ export default function SuperUsuarioPendientes({ reloadDashboard }) {
 
       if (!response.ok) {
         setItems([]);
+        setNextCursor(null);
         setMessage(data.error || "No se pudo cargar la lista de pendientes.");
         return;
       }
 
-      // backend esperado: { pendientes: [...] }
+      // backend esperado: { pendientes: [...], next_cursor }
       setItems(data.pendientes || []);
+      setNextCursor(data.next_cursor || null);
+      setSelected([]);
     } finally {
       setLoading(false);
     }
   };
 
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    setMessage("");
+    const { response, data } = await fetchPendingMicroempresas({ cursor: nextCursor });
+
+    if (!response.ok) {
+      setMessage(data.error || "No se pudo cargar la lista de pendientes.");
+      return;
+    }
+
+    setItems((prev) => [...prev, ...(data.pendientes || [])]);
+    setNextCursor(data.next_cursor || null);
+  };
+
+  const toggleSelected = (tenantId) => {
+    setSelected((prev) =>
+      prev.includes(tenantId) ? prev.filter((id) => id !== tenantId) : [...prev, tenantId]
+    );
+  };
+
+  const allSelected = items.length > 0 && selected.length === items.length;
+
+  const toggleAll = () => {
+    setSelected(allSelected ? [] : items.map((it) => it.tenant_id));
+  };
+
+  // una sola petición para todo el lote; las omitidas (ya revisadas, sin plan) se informan
+  const reviewSelected = async (decision) => {
+    if (selected.length === 0) return;
+    setMessage("");
+    const { response, data } = await reviewPendingMicroempresas({ [decision]: selected });
+
+    if (!response.ok) {
+      setMessage(data.error || "No se pudo revisar el lote.");
+      return;
+    }
+
+    const hechas = (data.aprobadas || []).length + (data.rechazadas || []).length;
+    const omitidas = data.omitidas || [];
+    setMessage(
+      `${decision === "aprobar" ? "Aprobadas" : "Rechazadas"}: ${hechas}.` +
+        (omitidas.length ? ` ${omitidas.length} no se pudieron revisar (${omitidas[0].error}).` : "")
+    );
+    await load();
+    if (reloadDashboard) await reloadDashboard();
+  };
+
   useEffect(() => {
     load();
   }, []);
@@ -100,6 +153,30 @@ export default function SuperUsuarioPendientes({ reloadDashboard }) {
           >
             {loading ? "Cargando..." : "Recargar"}
           </button>
+          {items.length > 0 && (
+            <>
+              <label className="muted" style={{ display: "flex", alignItems: "center", gap: 6 }}>
+                <input type="checkbox" checked={allSelected} onChange={toggleAll} />
+                Seleccionar todo
+              </label>
+              <button
+                type="button"
+                className="ghost-button"
+                onClick={() => reviewSelected("aprobar")}
+                disabled={selected.length === 0}
+              >
+                Aprobar seleccionadas ({selected.length})
+              </button>
+              <button
+                type="button"
+                className="danger-button"
+                onClick={() => reviewSelected("rechazar")}
+                disabled={selected.length === 0}
+              >
+                Rechazar seleccionadas
+              </button>
+            </>
+          )}
         </div>
 
         {message && (
@@ -124,11 +201,20 @@ export default function SuperUsuarioPendientes({ reloadDashboard }) {
                   null
               );
 
+              // miniatura cacheada (URL versionada): no descarga el comprobante completo
+              const previewSrc = buildProofLink(it.preview_url || null);
+
               return (
                 <div
                   className="data-row"
                   key={it.suscripcion_id || it.tenant_id}
                 >
+                  <input
+                    type="checkbox"
+                    aria-label={`Seleccionar ${micro.nombre || "microempresa"}`}
+                    checked={selected.includes(it.tenant_id)}
+                    onChange={() => toggleSelected(it.tenant_id)}
+                  />
                   <div>
                     <div style={{ fontWeight: 600 }}>
                       {micro.nombre || "Microempresa"}
@@ -147,6 +233,24 @@ export default function SuperUsuarioPendientes({ reloadDashboard }) {
 
                     {proofHref ? (
                       <div style={{ marginTop: 8 }}>
+                        {previewSrc && (
+                          <a href={proofHref} target="_blank" rel="noreferrer">
+                            <img
+                              src={previewSrc}
+                              alt={`Comprobante de ${micro.nombre || "la microempresa"}`}
+                              loading="lazy"
+                              decoding="async"
+                              style={{
+                                display: "block",
+                                maxWidth: 160,
+                                maxHeight: 160,
+                                marginBottom: 6,
+                                borderRadius: 6,
+                                border: "1px solid #ddd",
+                              }}
+                            />
+                          </a>
+                        )}
                         <a href={proofHref} target="_blank" rel="noreferrer">
                           Ver comprobante
                         </a>
@@ -179,6 +283,14 @@ export default function SuperUsuarioPendientes({ reloadDashboard }) {
             })}
           </div>
         )}
+
+        {!loading && nextCursor && (
+          <div style={{ marginTop: 12, textAlign: "center" }}>
+            <button type="button" className="ghost-button" onClick={loadMore}>
+              Cargar más
+            </button>
+          </div>
+        )}
       </div>
     </SectionCard>
   );
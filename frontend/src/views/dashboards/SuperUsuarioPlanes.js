@@ -14,6 +14,7 @@ export default function SuperUsuarioPlanes() {
   const [plans, setPlans] = useState([]);
   const [loading, setLoading] = useState(false);
   const [msg, setMsg] = useState(location.state?.flash || "");
+  const [nextCursor, setNextCursor] = useState(null);
 
   const [editingId, setEditingId] = useState(null);
   const [editForm, setEditForm] = useState({
@@ -30,14 +31,27 @@ export default function SuperUsuarioPlanes() {
       if (!response.ok) {
         setMsg(data.error || "No se pudo cargar planes.");
         setPlans([]);
+        setNextCursor(null);
         return;
       }
       setPlans(data.plans || []);
+      setNextCursor(data.next_cursor || null);
     } finally {
       setLoading(false);
     }
   };
 
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    const { response, data } = await fetchAllPlansAdmin({ cursor: nextCursor });
+    if (!response.ok) {
+      setMsg(data.error || "No se pudo cargar planes.");
+      return;
+    }
+    setPlans((prev) => [...prev, ...(data.plans || [])]);
+    setNextCursor(data.next_cursor || null);
+  };
+
   useEffect(() => {
     load();
     // limpia flash al volver
@@ -275,6 +289,14 @@ export default function SuperUsuarioPlanes() {
             })}
           </div>
         )}
+
+        {!loading && nextCursor && (
+          <div style={{ marginTop: 12, textAlign: "center" }}>
+            <button type="button" className="ghost-button" onClick={loadMore}>
+              Cargar más
+            </button>
+          </div>
+        )}
       </div>
     </SectionCard>
   );